@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+# Synthetic data and a route benchmark harness: python -m benchmarks --help
@@ -0,0 +1,120 @@
+# benchmarks/harness.py
+import json
+import statistics
+import time
+import tracemalloc
+
+from sqlalchemy import event
+
+from extensions import db
+
+# name -> URL driven through the test client
+ROUTES = {
+    "dashboard": "/dashboard",
+    "api summary": "/api/v1/summary",
+    "api summary/monthly": "/api/v1/summary/monthly",
+    "api summary/categories": "/api/v1/summary/categories",
+    "transactions_page": "/transactions",
+    "transactions_page (month)": "/transactions?filter_by=month",
+    "budgets": "/budgets",
+    "export_transactions": "/export_transactions",
+}
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _drain(response):
+    """Consume a response chunk by chunk, as a client socket would."""
+    for _ in response.response:
+        pass
+    response.close()
+
+
+def _log_in(client, user_id):
+    """Leave the session the login view would: Flask-Login's user id plus our own."""
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+        session['user_id'] = user_id
+
+
+def run(app, user_ids, iterations=20, routes=None):
+    """Drive each route `iterations` times, rotating through `user_ids`.
+
+    Returns {route: {"p50_ms", "p95_ms", "queries", "peak_kib"}}. Peak
+    memory comes from one extra traced request per route, so tracing does
+    not skew the latency numbers.
+    """
+    routes = routes or ROUTES
+    client = app.test_client()
+    queries = [0]
+
+    def count(*args):
+        queries[0] += 1
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", count)
+    results = {}
+    try:
+        for name, url in routes.items():
+            timings, counts = [], []
+            _log_in(client, user_ids[0])
+            _drain(client.get(url, buffered=False))  # warm-up: template compile, caches
+            for i in range(iterations):
+                _log_in(client, user_ids[i % len(user_ids)])
+                queries[0] = 0
+                started = time.perf_counter()
+                response = client.get(url, buffered=False)
+                _drain(response)
+                timings.append((time.perf_counter() - started) * 1000)
+                counts.append(queries[0])
+                if response.status_code != 200:
+                    raise RuntimeError(f"{url} returned {response.status_code}")
+
+            tracemalloc.start()
+            _drain(client.get(url, buffered=False))
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            results[name] = {
+                "p50_ms": round(statistics.median(timings), 2),
+                "p95_ms": round(_percentile(timings, 95), 2),
+                "queries": max(counts),
+                "peak_kib": round(peak / 1024, 1),
+            }
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return results
+
+
+def compare(results, baseline, tolerance=0.25):
+    """Return regressions against a saved baseline as readable strings.
+
+    Latency and memory may grow by `tolerance` before failing; query counts
+    are deterministic, so any increase fails.
+    """
+    regressions = []
+    for name, now in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if now["queries"] > before["queries"]:
+            regressions.append(f"{name}: queries/request {before['queries']} -> {now['queries']}")
+        for metric in ("p95_ms", "peak_kib"):
+            if now[metric] > before[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {before[metric]} -> {now[metric]}")
+    return regressions
+
+
+def save_baseline(results, path):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,125 @@
+# benchmarks/synthetic.py
+import random
+from datetime import date, datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models import Budget, Category, Investment, Transaction, User
+from services.alerts import rebuild_budget_spend
+from services.ledger import rebuild_ledger
+from services.rollup import rebuild_rollups
+from services.search import rebuild_search_index
+
+DEFAULT_CATEGORIES = [("Salary", "income"), ("Food", "expense"), ("Rent", "expense"),
+                      ("Travel", "expense"), ("Other", "expense")]
+EXTRA_CATEGORIES = [("Freelance", "income"), ("Groceries", "expense"),
+                    ("Utilities", "expense"), ("Fun", "expense")]
+NOTES = ["coffee", "lunch", "bus fare", "groceries", "movie", "electricity bill",
+         "salary", "client invoice", "rent", "gift", "", ""]
+
+
+def generate(users=10, transactions=10000, seed=42, years=3, today=None, batch_size=5000):
+    """Fill the database with `users` users of `transactions` rows each.
+
+    Output depends only on the arguments, so two runs with the same seed
+    produce the same data. Each user also gets a few categories of their
+    own, budgets, recurring templates and investments. The derived tables
+    (rollups, ledger, search index, budget spend) are rebuilt at the end. Returns the list of generated user ids.
+    """
+    rng = random.Random(seed)
+    today = today or date(2026, 1, 1)
+    first_day = today - timedelta(days=365 * years)
+    password = generate_password_hash("benchmark")
+
+    globals_ = {}
+    for name, c_type in DEFAULT_CATEGORIES:
+        category = Category.query.filter_by(name=name, type=c_type, user_id=None).first()
+        if category is None:
+            category = Category(name=name, type=c_type, user_id=None)
+            db.session.add(category)
+            db.session.flush()
+        globals_[name] = (category.id, c_type)
+
+    user_ids = []
+    for u in range(users):
+        user = User(username=f"bench{seed}_{u}", email=f"bench{seed}_{u}@gmail.com",
+                    password=password, role="user")
+        db.session.add(user)
+        db.session.flush()
+        user_ids.append(user.id)
+
+        categories = dict(globals_)
+        for name, c_type in EXTRA_CATEGORIES:
+            category = Category(name=name, type=c_type, user_id=user.id)
+            db.session.add(category)
+            db.session.flush()
+            categories[name] = (category.id, c_type)
+        income = [cid for cid, t in categories.values() if t == "income"]
+        expense = [cid for cid, t in categories.values() if t == "expense"]
+
+        rows = []
+        for i in range(transactions):
+            is_income = rng.random() < 0.2
+            when = datetime.combine(first_day, datetime.min.time()) + timedelta(
+                seconds=rng.randrange((today - first_day).days * 86400))
+            rows.append({
+                "amount": round(rng.uniform(500, 80000) if is_income else rng.uniform(10, 5000), 2),
+                "type": "income" if is_income else "expense",
+                "note": rng.choice(NOTES) or None,
+                "date": when,
+                "user_id": user.id,
+                "category_id": rng.choice(income if is_income else expense),
+                "is_recurring": False,
+                "frequency": None,
+                "next_date": None,
+            })
+            if len(rows) >= batch_size:
+                db.session.execute(Transaction.__table__.insert(), rows)
+                rows = []
+
+        # A few recurring templates, due some time in the next month
+        for frequency in ("daily", "weekly", "monthly"):
+            start = datetime.combine(today, datetime.min.time()) - timedelta(days=rng.randrange(1, 60))
+            rows.append({
+                "amount": round(rng.uniform(10, 2000), 2),
+                "type": "expense",
+                "note": f"{frequency} subscription",
+                "date": start,
+                "user_id": user.id,
+                "category_id": rng.choice(expense),
+                "is_recurring": True,
+                "frequency": frequency,
+                "next_date": datetime.combine(today, datetime.min.time()) + timedelta(days=rng.randrange(1, 30)),
+            })
+        if rows:
+            db.session.execute(Transaction.__table__.insert(), rows)
+
+        for name, period in (("Food budget", "monthly"), ("Travel budget", "yearly"),
+                             ("Fun budget", "weekly"), ("Rent budget", "monthly")):
+            category_name = name.split()[0]
+            db.session.add(Budget(name=name, amount=round(rng.uniform(1000, 50000), 2), period=period,
+                                  start_date=first_day, user_id=user.id,
+                                  category_id=categories[category_name][0]))
+
+        for k in range(rng.randrange(3, 8)):
+            inv_type = rng.choice(["fixed_deposit", "mutual_fund", "share"])
+            value = round(rng.uniform(10000, 500000), 2)
+            db.session.add(Investment(
+                user_id=user.id, name=f"{inv_type.replace('_', ' ').title()} {k + 1}",
+                investment_type=inv_type, amount=value,
+                units=None if inv_type == "fixed_deposit" else round(rng.uniform(10, 1000), 2),
+                purchase_price=None if inv_type == "fixed_deposit" else round(rng.uniform(100, 2000), 2),
+                current_value=None if inv_type == "fixed_deposit" else value,
+                interest_rate=round(rng.uniform(5, 11), 2) if inv_type == "fixed_deposit" else None,
+                purchase_date=first_day + timedelta(days=rng.randrange(365)),
+                maturity_date=today + timedelta(days=rng.randrange(30, 1500)) if inv_type == "fixed_deposit" else None,
+                ticker_or_isin=None if inv_type == "fixed_deposit" else f"TICK{rng.randrange(100)}",
+            ))
+        db.session.commit()
+
+    rebuild_rollups()
+    rebuild_ledger()
+    rebuild_search_index()
+    rebuild_budget_spend()
+    return user_ids
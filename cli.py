@@ -0,0 +1,242 @@
+# cli.py
+# Flask CLI commands, registered by create_app(). Service modules are imported
+# inside each command so they only load for the command being run.
+import time
+
+import click
+from flask.cli import with_appcontext
+
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Create the tables, indexes and default categories."""
+    from migrations import init_db
+
+    created = init_db()
+    click.echo(f"Database initialised ({len(created)} index(es) created).")
+
+
+@click.command('upgrade-db')
+@with_appcontext
+def upgrade_db_command():
+    """Create missing tables and indexes on an existing database."""
+    from migrations import upgrade
+
+    created = upgrade()
+    click.echo(f"Schema up to date ({len(created)} index(es) created).")
+
+
+@click.command('post-recurring')
+@click.option('--interval', type=int, default=0,
+              help='Keep running and post again every N seconds.')
+@with_appcontext
+def post_recurring_command(interval):
+    """Post all due recurring transactions (run from cron or a scheduler)."""
+    from services.recurring import post_due_recurring
+
+    while True:
+        posted = post_due_recurring()
+        click.echo(f"Posted {len(posted)} recurring transaction(s).")
+        if not interval:
+            break
+        time.sleep(interval)
+
+
+@click.command('rebuild-rollups')
+@click.option('--user-id', type=int, default=None,
+              help='Only rebuild this user\'s rollups.')
+@with_appcontext
+def rebuild_rollups_command(user_id):
+    """Recompute the monthly rollup table from the transaction table."""
+    from services.rollup import rebuild_rollups
+
+    rebuild_rollups(user_id)
+    click.echo("Monthly rollups rebuilt.")
+
+
+@click.command('rebuild-ledger')
+@click.option('--user-id', type=int, default=None,
+              help='Only rebuild this user\'s ledger.')
+@with_appcontext
+def rebuild_ledger_command(user_id):
+    """Recompute the daily running-balance ledger from the transaction table."""
+    from services.ledger import rebuild_ledger
+
+    days = rebuild_ledger(user_id)
+    click.echo(f"Ledger rebuilt ({days} day(s)).")
+
+
+@click.command('rebuild-search-index')
+@click.option('--user-id', type=int, default=None,
+              help='Only rebuild this user\'s postings.')
+@with_appcontext
+def rebuild_search_index_command(user_id):
+    """Recompute the transaction search index from the transaction table."""
+    from services.search import rebuild_search_index
+
+    postings = rebuild_search_index(user_id)
+    click.echo(f"Search index rebuilt ({postings} term(s)).")
+
+
+@click.command('import-transactions')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--user-id', type=int, required=True)
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ofx', 'qfx', 'qif']), default=None,
+              help='File format; defaults to the file extension.')
+@with_appcontext
+def import_transactions_command(path, user_id, fmt):
+    """Bulk import a CSV, OFX or QIF statement for a user."""
+    from services.importer import import_transactions
+
+    fmt = fmt or path.rsplit('.', 1)[-1]
+    started = time.perf_counter()
+
+    def progress(report):
+        click.echo(f"  {report.rows_read} rows read, {report.inserted} imported...")
+
+    with open(path, encoding='utf-8-sig', errors='replace', newline='') as stream:
+        report = import_transactions(stream, user_id, fmt, progress=progress)
+
+    click.echo(f"{report.summary()} in {time.perf_counter() - started:.1f}s.")
+    for line, message in report.errors:
+        click.echo(f"  line {line}: {message}")
+
+
+@click.command('explain-queries')
+@click.option('--user-id', type=int, default=1)
+@click.option('--verbose', is_flag=True, help='Print every query plan.')
+@with_appcontext
+def explain_queries_command(user_id, verbose):
+    """Fail if any hot-path query does a full table scan."""
+    from services.query_plans import check_hot_queries
+
+    failures = 0
+    for name, statement, full_scans, plan in check_hot_queries(user_id):
+        status = "FULL SCAN" if full_scans else "ok"
+        click.echo(f"[{status}] {name}")
+        if full_scans or verbose:
+            click.echo("    " + " ".join(statement.split()))
+            for line in plan:
+                click.echo(f"      {line}")
+        failures += bool(full_scans)
+    if failures:
+        raise SystemExit(f"{failures} hot query(ies) not served by an index.")
+
+
+@click.command('refresh-prices')
+@click.option('--date', 'as_of', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='Fetch quotes up to this day (default: today).')
+@with_appcontext
+def refresh_prices_command(as_of):
+    """Pull fund and share prices from the configured price source."""
+    from flask import current_app
+    from services.prices import price_source, refresh_prices
+
+    written = refresh_prices(price_source(current_app.config), as_of and as_of.date())
+    click.echo(f"Stored {written} price(s).")
+
+
+@click.command('snapshot-portfolios')
+@click.option('--date', 'as_of', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='Value portfolios on this day (default: today).')
+@with_appcontext
+def snapshot_portfolios_command(as_of):
+    """Record today's portfolio value for every user (run daily, after refresh-prices)."""
+    from services.investments import record_snapshots
+
+    count = record_snapshots(as_of and as_of.date())
+    click.echo(f"Recorded portfolio snapshots for {count} user(s).")
+
+
+@click.command('load-fx-rates')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False), required=False)
+@with_appcontext
+def load_fx_rates_command(path):
+    """Load exchange rates (currency,date,rate in NPR) from a CSV; defaults to FX_RATE_FILE."""
+    from flask import current_app
+    from services.fx import load_rates
+
+    path = path or current_app.config['FX_RATE_FILE']
+    with open(path, encoding='utf-8-sig', newline='') as stream:
+        try:
+            written = load_rates(stream)
+        except ValueError as exc:
+            raise click.ClickException(str(exc))
+    click.echo(f"Stored {written} exchange rate(s).")
+
+
+@click.command('archive-transactions')
+@click.option('--keep-years', type=int, default=None,
+              help='Closed years to keep in the transaction table (default: ARCHIVE_KEEP_YEARS).')
+@click.option('--user-id', type=int, default=None,
+              help='Only archive this user\'s transactions.')
+@with_appcontext
+def archive_transactions_command(keep_years, user_id):
+    """Move transactions from older closed years into the archive table."""
+    from flask import current_app
+    from services.archive import archive_transactions
+
+    if keep_years is None:
+        keep_years = current_app.config['ARCHIVE_KEEP_YEARS']
+    if keep_years < 0:
+        raise click.BadParameter('must be 0 or more', param_hint='--keep-years')
+    moved = archive_transactions(keep_years, user_id)
+    click.echo(f"Archived {moved} transaction(s).")
+
+
+@click.command('run-worker')
+@click.option('--concurrency', type=int, default=None,
+              help='Jobs to run at once (default: JOB_CONCURRENCY).')
+@click.option('--kind', 'kinds', multiple=True, help='Only run jobs of this kind (repeatable).')
+@click.option('--burst', is_flag=True, help='Exit once the queue is empty.')
+@with_appcontext
+def run_worker_command(concurrency, kinds, burst):
+    """Run queued background jobs (imports, exports, rebuilds, price refreshes...)."""
+    from flask import current_app
+    from services.jobs import run_worker
+
+    app = current_app._get_current_object()
+    ran = run_worker(app, concurrency or app.config['JOB_CONCURRENCY'],
+                     app.config['JOB_POLL_SECONDS'], burst, kinds, echo=click.echo)
+    click.echo(f"Ran {ran} job(s).")
+
+
+@click.command('enqueue-job')
+@click.argument('kind')
+@click.option('--payload', default='{}', help='Handler arguments as a JSON object.')
+@click.option('--priority', type=int, default=None, help='Higher runs first.')
+@with_appcontext
+def enqueue_job_command(kind, payload, priority):
+    """Queue a background job for `flask run-worker` (e.g. from cron)."""
+    import json
+    from services.jobs import enqueue
+
+    try:
+        job = enqueue(kind, json.loads(payload), priority=priority)
+    except ValueError as exc:
+        raise click.ClickException(str(exc))
+    click.echo(f"Queued job {job.id} ({job.kind}).")
+
+
+COMMANDS = [
+    init_db_command,
+    upgrade_db_command,
+    post_recurring_command,
+    rebuild_rollups_command,
+    rebuild_ledger_command,
+    rebuild_search_index_command,
+    import_transactions_command,
+    explain_queries_command,
+    refresh_prices_command,
+    snapshot_portfolios_command,
+    load_fx_rates_command,
+    archive_transactions_command,
+    run_worker_command,
+    enqueue_job_command,
+]
+
+
+def register_commands(app):
+    for command in COMMANDS:
+        app.cli.add_command(command)
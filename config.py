@@ -0,0 +1,108 @@
+# config.py
+# Settings read from the environment (and .env), applied with app.config.update().
+import os
+
+from sqlalchemy.engine import make_url
+
+
+def _int(env, name, default):
+    return int(env.get(name, default))
+
+
+def database_url(env):
+    """DATABASE_URL if set, else the MySQL URL built from DB_USER/DB_PASSWORD/DB_HOST/DB_NAME."""
+    if env.get('DATABASE_URL'):
+        return env['DATABASE_URL']
+    return (f"mysql+pymysql://{env.get('DB_USER')}:{env.get('DB_PASSWORD')}"
+            f"@{env.get('DB_HOST', 'localhost')}/{env.get('DB_NAME')}")
+
+
+def engine_options(url, env):
+    """Pool and timeout settings for an engine, limited to what the backend supports."""
+    url = make_url(url)
+    options = {}
+    in_memory = url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+    if not in_memory:
+        # SQLite memory databases use a single shared connection, not a QueuePool
+        options.update(
+            pool_size=_int(env, 'DB_POOL_SIZE', 5),
+            max_overflow=_int(env, 'DB_MAX_OVERFLOW', 10),
+            pool_timeout=_int(env, 'DB_POOL_TIMEOUT', 30),
+            pool_recycle=_int(env, 'DB_POOL_RECYCLE', 1800),
+            pool_pre_ping=env.get('DB_POOL_PRE_PING', '1') == '1',
+        )
+
+    timeout_ms = _int(env, 'DB_STATEMENT_TIMEOUT_MS', 0)
+    if timeout_ms and url.get_backend_name() == 'mysql':
+        # Aborts SELECTs that run longer than the limit (MySQL 5.7.8+)
+        options['connect_args'] = {'init_command': f"SET SESSION max_execution_time={timeout_ms}"}
+    elif url.get_backend_name() == 'sqlite':
+        # No statement timeout in SQLite; wait this long for a locked database instead
+        options['connect_args'] = {'timeout': (timeout_ms or 5000) / 1000}
+    return options
+
+
+def settings_from_env(env=None):
+    """Build the Flask config dict from environment variables."""
+    env = os.environ if env is None else env
+    url = database_url(env)
+    settings = {
+        'SECRET_KEY': env.get('SECRET_KEY'),
+        'SQLALCHEMY_DATABASE_URI': url,
+        'SQLALCHEMY_ENGINE_OPTIONS': engine_options(url, env),
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        'SQLALCHEMY_BINDS': {},
+
+        # Seconds after a write during which the writer's reads stay on the primary
+        'REPLICA_STICKY_SECONDS': _int(env, 'REPLICA_STICKY_SECONDS', 5),
+
+        'TRANSACTIONS_PAGE_SIZE': _int(env, 'TRANSACTIONS_PAGE_SIZE', 50),
+        'TRANSACTIONS_MAX_PAGE_SIZE': _int(env, 'TRANSACTIONS_MAX_PAGE_SIZE', 200),
+        'ADMIN_PAGE_SIZE': _int(env, 'ADMIN_PAGE_SIZE', 25),
+
+        # Closed years kept in the transaction table by `flask archive-transactions`
+        'ARCHIVE_KEEP_YEARS': _int(env, 'ARCHIVE_KEEP_YEARS', 2),
+
+        'AGGREGATE_CACHE_BACKEND': env.get('AGGREGATE_CACHE_BACKEND', 'local'),  # local, shared or none
+        'AGGREGATE_CACHE_URL': env.get('AGGREGATE_CACHE_URL'),
+        'AGGREGATE_CACHE_TTL': _int(env, 'AGGREGATE_CACHE_TTL', 300),
+
+        # Seconds a worker trusts its cached copy of a user's id, name, role and currency
+        'IDENTITY_CACHE_TTL': _int(env, 'IDENTITY_CACHE_TTL', 60),
+
+        'SQL_PROFILING': env.get('SQL_PROFILING', '0') == '1',
+        'SQL_SLOW_QUERY_MS': float(env.get('SQL_SLOW_QUERY_MS', 100)),
+
+        # Where `flask refresh-prices` gets quotes: a 'module:Class' price source
+        'PRICE_SOURCE': env.get('PRICE_SOURCE', 'services.prices:FilePriceSource'),
+        'PRICE_FILE': env.get('PRICE_FILE', 'prices.csv'),
+
+        # `flask load-fx-rates` reads this CSV (currency,date,rate in NPR) by default
+        'FX_RATE_FILE': env.get('FX_RATE_FILE', 'fx_rates.csv'),
+        # Seconds a process keeps its in-memory copy of the rate table
+        'FX_CACHE_TTL': _int(env, 'FX_CACHE_TTL', 3600),
+
+        # Percentages of a budget at which its owner is notified, once per period
+        'BUDGET_ALERT_THRESHOLDS': tuple(
+            int(p) for p in env.get('BUDGET_ALERT_THRESHOLDS', '50,80,100').split(',') if p.strip()),
+
+        # Background jobs (`flask run-worker`): threads per worker, seconds between
+        # polls of an empty queue, runs per job, first retry delay (doubling after)
+        'JOB_CONCURRENCY': _int(env, 'JOB_CONCURRENCY', 4),
+        'JOB_POLL_SECONDS': float(env.get('JOB_POLL_SECONDS', 1)),
+        'JOB_MAX_ATTEMPTS': _int(env, 'JOB_MAX_ATTEMPTS', 3),
+        'JOB_RETRY_DELAY': _int(env, 'JOB_RETRY_DELAY', 30),
+        # Seconds without progress after which a running job counts as abandoned
+        'JOB_TIMEOUT': _int(env, 'JOB_TIMEOUT', 3600),
+        # Uploads waiting to be imported and finished exports; shared by web and workers
+        'JOB_SPOOL_DIR': env.get('JOB_SPOOL_DIR', 'job_files'),
+        # Seconds spooled files are kept before workers delete them (exports expire then)
+        'JOB_FILE_RETENTION': _int(env, 'JOB_FILE_RETENTION', 7 * 24 * 3600),
+    }
+
+    replica_url = env.get('DATABASE_REPLICA_URL')
+    if replica_url:
+        settings['SQLALCHEMY_BINDS']['replica'] = {
+            'url': replica_url, **engine_options(replica_url, env)}
+    return settings
@@ -1,10 +1,89 @@
 # extensions.py
-# from flask_sqlalchemy import SQLAlchemy
+import time
+from functools import wraps
 
-# db = SQLAlchemy()
-# extensions.py
-from flask_sqlalchemy import SQLAlchemy
+from flask import current_app, g, has_app_context, request, session
 from flask_login import LoginManager
+from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql import Select
+
+
+class RoutingSession(Session):
+    """Session that sends reads from @replica_reads views to the 'replica' bind.
+
+    Only plain SELECTs are routed; flushes and UPDATE/INSERT/DELETE
+    statements always go to the primary. Without a configured replica every
+    query uses the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing and has_app_context()
+                and g.get('use_replica') and 'replica' in self._db.engines
+                and (clause is None or isinstance(clause, Select))):
+            return self._db.engines['replica']
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def replica_reads(f):
+    """Serve a read-only view from the replica, unless this user wrote recently."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        g.use_replica = session.get('primary_until', 0) < time.time()
+        return f(*args, **kwargs)
+    return decorated_function
 
-db = SQLAlchemy()
+
+def stick_to_primary_after_write(response):
+    """Keep a user's reads on the primary briefly after they write, so replica lag
+    never hides the change they just made."""
+    if 'replica' in current_app.config['SQLALCHEMY_BINDS'] and request.method == 'POST' and 'user_id' in session:
+        session['primary_until'] = time.time() + current_app.config['REPLICA_STICKY_SECONDS']
+    return response
+
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 login_manager = LoginManager()
+
+
+def upsert(table, keys, rows, on_conflict, source=None):
+    """Insert `rows` (mappings) into `table`, or update the row already holding their `keys`.
+
+    `keys` must be the columns of a unique constraint. `on_conflict(incoming)`
+    returns [(column name, expression)] to set on the existing row, where
+    `incoming[name]` is the value the clashing row would have inserted. MySQL
+    applies the assignments in order, each seeing the ones before it, so list a
+    column before any that its expression reads. The database settles each
+    conflict itself, so concurrent writers of a new key can't both insert it.
+    Runs in the session's transaction; the caller commits.
+
+    With `source`, a SELECT of bound parameters labelled with column names,
+    the inserted values are computed in SQL and `rows` hold its parameters.
+    """
+    if not rows:
+        return
+    dialect = db.engine.dialect.name
+    if source is not None:
+        from sqlalchemy import true
+        # SQLite needs a WHERE on an upsert's SELECT to tell its ON CONFLICT from a join's ON
+        source = source.where(true())
+
+    def insert_into(insert):
+        statement = insert(table)
+        if source is None:
+            return statement
+        return statement.from_select([c.name for c in source.selected_columns], source)
+
+    if dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert
+        statement = insert_into(insert)
+        statement = statement.on_duplicate_key_update(on_conflict(statement.inserted))
+    elif dialect in ('sqlite', 'postgresql'):
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        statement = insert_into(sqlite_insert if dialect == 'sqlite' else pg_insert)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(keys), set_=dict(on_conflict(statement.excluded)))
+    else:
+        raise NotImplementedError(f"No upsert for {dialect}")
+    db.session.execute(statement, rows)
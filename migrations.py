@@ -0,0 +1,204 @@
+# migrations.py
+# Schema setup, run explicitly with `flask init-db` / `flask upgrade-db`;
+# the app never creates tables on its own.
+from importlib import import_module
+
+from sqlalchemy import Integer, inspect
+from sqlalchemy.schema import CreateColumn
+
+from extensions import db
+from money import MINOR_UNITS, Money
+
+# Indexes that newer composite indexes have replaced
+SUPERSEDED_INDEXES = {
+    'transaction': ['ix_transaction_next_date'],
+}
+
+# Tables derived from `transaction` (and its archive), and the function that refills each one
+DERIVED_TABLES = {
+    'monthly_rollup': 'services.rollup:rebuild_rollups',
+    'daily_balance': 'services.ledger:rebuild_ledger',
+    'search_term': 'services.search:rebuild_search_index',
+    'yearly_summary': 'services.archive:rebuild_summaries',
+    'budget_spend': 'services.alerts:rebuild_budget_spend',
+}
+
+
+def _drop_index(table_name, index_name):
+    if db.engine.dialect.name == 'mysql':
+        db.session.execute(db.text(f"DROP INDEX {index_name} ON `{table_name}`"))
+    else:
+        db.session.execute(db.text(f"DROP INDEX {index_name}"))
+
+
+def ensure_indexes():
+    """Create any index declared on the models that the database is missing.
+
+    `create_all` only creates indexes together with a new table, so tables
+    that already exist need their indexes added one by one.
+    """
+    inspector = inspect(db.engine)
+    created = []
+    for table in db.metadata.sorted_tables:
+        existing = {ix['name'] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=db.engine)
+                created.append(index.name)
+
+        for name in SUPERSEDED_INDEXES.get(table.name, []):
+            if name in existing:
+                _drop_index(table.name, name)
+    db.session.commit()
+    return created
+
+
+def _missing_columns(inspector, table):
+    stored = {c['name'] for c in inspector.get_columns(table.name)}
+    return [c for c in table.columns if c.name not in stored]
+
+
+def drop_stale_derived_tables():
+    """Drop derived tables whose shape changed, so create_all rebuilds them.
+
+    Their rows can always be recomputed from `transaction`, which is cheaper
+    and safer than reshaping keys in place. Returns the dropped tables.
+    """
+    inspector = inspect(db.engine)
+    existing = set(inspector.get_table_names())
+    dropped = []
+    for name in DERIVED_TABLES:
+        table = db.metadata.tables[name]
+        if name in existing and _missing_columns(inspector, table):
+            table.drop(bind=db.session.connection())
+            dropped.append(name)
+    db.session.commit()
+    return dropped
+
+
+def add_missing_columns():
+    """ALTER TABLE ADD COLUMN for model columns an existing table lacks.
+
+    New NOT NULL columns need a server default to fill the existing rows.
+    Returns the added columns as 'table.column'.
+    """
+    inspector = inspect(db.engine)
+    existing = set(inspector.get_table_names())
+    quote = db.engine.dialect.identifier_preparer.quote
+    added = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        for column in _missing_columns(inspector, table):
+            ddl = CreateColumn(column).compile(dialect=db.engine.dialect)
+            db.session.execute(db.text(f"ALTER TABLE {quote(table.name)} ADD COLUMN {ddl}"))
+            added.append(f"{table.name}.{column.name}")
+    db.session.commit()
+    return added
+
+
+def _convert_in_place(table, columns):
+    """MySQL: FLOAT -> exact DECIMAL, scale to paisa, then BIGINT."""
+    quote = db.engine.dialect.identifier_preparer.quote
+    name = quote(table.name)
+
+    def modify(type_):
+        return ", ".join(f"MODIFY {quote(c.name)} {type_} {'NULL' if c.nullable else 'NOT NULL'}"
+                         for c in columns)
+
+    db.session.execute(db.text(f"ALTER TABLE {name} {modify('DECIMAL(20, 2)')}"))
+    db.session.execute(db.text(f"UPDATE {name} SET " + ", ".join(
+        f"{quote(c.name)} = {quote(c.name)} * {MINOR_UNITS}" for c in columns)))
+    db.session.execute(db.text(f"ALTER TABLE {name} {modify('BIGINT')}"))
+
+
+def _convert_by_copy(table, columns):
+    """SQLite can't change a column's type: copy into a new table and swap it in.
+
+    The old table's indexes go with it; ensure_indexes recreates them.
+    """
+    quote = db.engine.dialect.identifier_preparer.quote
+    stale = {c.name for c in columns}
+    copy = table.to_metadata(db.metadata, name=f"{table.name}_new")
+    copy.indexes.clear()
+    try:
+        copy.create(bind=db.session.connection())
+        names = [quote(c.name) for c in table.columns]
+        values = [f"CAST(ROUND({quote(c.name)} * {MINOR_UNITS}) AS INTEGER)"
+                  if c.name in stale else quote(c.name) for c in table.columns]
+        db.session.execute(db.text(
+            f"INSERT INTO {quote(copy.name)} ({', '.join(names)}) "
+            f"SELECT {', '.join(values)} FROM {quote(table.name)}"))
+        db.session.execute(db.text(f"DROP TABLE {quote(table.name)}"))
+        db.session.execute(db.text(
+            f"ALTER TABLE {quote(copy.name)} RENAME TO {quote(table.name)}"))
+    finally:
+        db.metadata.remove(copy)
+
+
+def convert_money_columns():
+    """Move amount columns still stored as floats to integer paisa (see money.py).
+
+    Values are multiplied by 100 and rounded. Returns the converted tables.
+    """
+    inspector = inspect(db.engine)
+    existing = set(inspector.get_table_names())
+    converted = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        stored = {c['name']: c['type'] for c in inspector.get_columns(table.name)}
+        columns = [c for c in table.columns if isinstance(c.type, Money)
+                   and c.name in stored and not isinstance(stored[c.name], Integer)]
+        if not columns:
+            continue
+        if db.engine.dialect.name == 'mysql':
+            _convert_in_place(table, columns)
+        else:
+            _convert_by_copy(table, columns)
+        converted.append(table.name)
+    db.session.commit()
+    return converted
+
+
+def upgrade():
+    """Bring an existing database up to the current models."""
+    import models  # noqa: F401  registers every table on db.metadata
+    existing = set(inspect(db.engine).get_table_names())
+    dropped = drop_stale_derived_tables()
+    # The primary only: a read replica gets its schema through replication
+    db.create_all(bind_key=None)
+    add_missing_columns()
+    convert_money_columns()
+    created = ensure_indexes()
+
+    for name, rebuild in DERIVED_TABLES.items():
+        if name not in existing or name in dropped:
+            # New or reshaped derived table: fill it from the existing transactions
+            module, _, function = rebuild.partition(':')
+            getattr(import_module(module), function)()
+    return created
+
+
+def seed_default_categories():
+    from models import Category
+
+    defaults = [
+        {"name": "Salary", "type": "income"},
+        {"name": "Food", "type": "expense"},
+        {"name": "Rent", "type": "expense"},
+        {"name": "Travel", "type": "expense"},
+        {"name": "Other", "type": "expense"},
+    ]
+    for cat in defaults:
+        exists = Category.query.filter_by(name=cat["name"], type=cat["type"], user_id=None).first()
+        if not exists:
+            db.session.add(Category(name=cat["name"], type=cat["type"], user_id=None))
+    db.session.commit()
+
+
+def init_db():
+    """Create the schema and the shared default categories."""
+    created = upgrade()
+    seed_default_categories()
+    return created
@@ -1,10 +1,15 @@
-from flask_sqlalchemy import SQLAlchemy
-
-db = SQLAlchemy()
-
 from .user import User
 from .category import Category
 from .transaction import Transaction
-from .budget import Budget
+from .budget import Budget, BudgetSpend
 from .investment import Investment 
 from .contact import ContactMessage  
+from .rollup import MonthlyRollup
+from .price import Price
+from .portfolio_snapshot import PortfolioSnapshot
+from .ledger import DailyBalance
+from .search import SearchTerm
+from .fx_rate import FxRate
+from .archive import ArchivedTransaction, YearlySummary
+from .job import Job
+from .notification import Notification
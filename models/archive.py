@@ -0,0 +1,51 @@
+# models/archive.py
+from extensions import db
+from money import DEFAULT_CURRENCY, Money
+
+
+class ArchivedTransaction(db.Model):
+    """A transaction from a closed year, moved out of `transaction` by `flask archive-transactions`.
+
+    Rows keep their ids and are never edited. On MySQL the table is range
+    partitioned by year, which needs `date` in the primary key and rules out
+    foreign keys, so user and category ids are plain indexed columns.
+    """
+    __tablename__ = 'transaction_archive'
+    __table_args__ = (
+        db.Index('ix_transaction_archive_user_date', 'user_id', 'date'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    date = db.Column(db.DateTime, primary_key=True)
+    amount = db.Column(Money, nullable=False)
+    currency = db.Column(db.String(3), nullable=False, default=DEFAULT_CURRENCY)
+    type = db.Column(db.String(10), nullable=False)
+    note = db.Column(db.Text, nullable=True)
+
+    user_id = db.Column(db.Integer, nullable=False)
+    category_id = db.Column(db.Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<ArchivedTransaction {self.type} {self.amount}>"
+
+
+class YearlySummary(db.Model):
+    """Per-user yearly totals of the archived transactions, for all-time figures."""
+    __tablename__ = 'yearly_summary'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'year', 'category_id', 'type', 'currency',
+                            name='uq_yearly_summary_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    year = db.Column(db.Integer, nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=False)
+    type = db.Column(db.String(10), nullable=False)  # "income" or "expense"
+    currency = db.Column(db.String(3), nullable=False, default=DEFAULT_CURRENCY)
+
+    total = db.Column(Money, nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<YearlySummary {self.user_id} {self.year} {self.type} {self.total}>"
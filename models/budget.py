@@ -1,11 +1,18 @@
 # models/budget.py
 from extensions import db
+from money import DEFAULT_CURRENCY, Money
 from datetime import datetime
 
 class Budget(db.Model):
+    __table_args__ = (
+        db.Index('ix_budget_user', 'user_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100))
-    amount = db.Column(db.Float)
+    amount = db.Column(Money)
+    currency = db.Column(db.String(3), nullable=False, default=DEFAULT_CURRENCY,
+                         server_default=DEFAULT_CURRENCY)
     period = db.Column(db.String(50))  # Monthly, Weekly, etc.
     start_date = db.Column(db.Date)
     end_date = db.Column(db.Date)
@@ -13,3 +20,21 @@ class Budget(db.Model):
 
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=False)
+
+
+class BudgetSpend(db.Model):
+    """Running spend of a budget's current period, per currency, kept up to date on write."""
+    __tablename__ = 'budget_spend'
+    __table_args__ = (
+        db.UniqueConstraint('budget_id', 'currency', name='uq_budget_spend_budget_currency'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    budget_id = db.Column(db.Integer, db.ForeignKey('budget.id'), nullable=False)
+    currency = db.Column(db.String(3), nullable=False, default=DEFAULT_CURRENCY)
+    # Start of the period `spent` belongs to; an older one means nothing spent yet this period
+    window_start = db.Column(db.Date, nullable=False)
+    spent = db.Column(Money, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<BudgetSpend {self.budget_id} {self.window_start} {self.spent} {self.currency}>"
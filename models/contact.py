@@ -3,6 +3,11 @@ from datetime import datetime
 from extensions import db
 
 class ContactMessage(db.Model):
+    __table_args__ = (
+        # The admin inbox lists newest first
+        db.Index('ix_contact_message_date_sent', 'date_sent'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
     email = db.Column(db.String(120), nullable=False)
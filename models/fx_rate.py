@@ -0,0 +1,18 @@
+# models/fx_rate.py
+from extensions import db
+
+
+class FxRate(db.Model):
+    """NPR value of one unit of `currency` on a day, loaded by `flask load-fx-rates`."""
+    __tablename__ = 'fx_rate'
+    __table_args__ = (
+        db.UniqueConstraint('currency', 'date', name='uq_fx_rate_currency_date'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    currency = db.Column(db.String(3), nullable=False)  # ISO 4217 code
+    date = db.Column(db.Date, nullable=False)
+    rate = db.Column(db.Float, nullable=False)
+
+    def __repr__(self):
+        return f"<FxRate {self.currency} {self.date} {self.rate}>"
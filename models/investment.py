@@ -1,19 +1,25 @@
 from datetime import datetime
 from extensions import db
+from money import DEFAULT_CURRENCY, Money
 
 class Investment(db.Model):
     __tablename__ = 'investment'
+    __table_args__ = (
+        db.Index('ix_investment_user', 'user_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
 
     name = db.Column(db.String(120), nullable=False)
     investment_type = db.Column(db.String(50), nullable=False)  # mutual_fund, fixed_deposit, share
-    amount = db.Column(db.Float, nullable=False)
+    amount = db.Column(Money, nullable=False)
+    currency = db.Column(db.String(3), nullable=False, default=DEFAULT_CURRENCY,
+                         server_default=DEFAULT_CURRENCY)
 
     units = db.Column(db.Float, nullable=True)
     purchase_price = db.Column(db.Float, nullable=True)
-    current_value = db.Column(db.Float, nullable=True)
+    current_value = db.Column(Money, nullable=True)
 
     purchase_date = db.Column(db.Date, nullable=True)
     maturity_date = db.Column(db.Date, nullable=True)
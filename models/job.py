@@ -0,0 +1,42 @@
+# models/job.py
+from datetime import datetime
+
+from extensions import db
+
+
+class Job(db.Model):
+    """A unit of background work, queued in the database and run by `flask run-worker`."""
+    __tablename__ = 'job'
+    __table_args__ = (
+        # workers claim the most urgent queued job that is due
+        db.Index('ix_job_status_priority', 'status', 'priority', 'run_after'),
+        # a user's recent jobs, newest first
+        db.Index('ix_job_user_id', 'user_id', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.JSON, nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+
+    status = db.Column(db.String(10), nullable=False, default='queued')  # queued, running, done, failed
+    priority = db.Column(db.Integer, nullable=False, default=0)  # higher runs first
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # Progress as reported by the running job: `done` of `total` items (total may be unknown)
+    done = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=True)
+    message = db.Column(db.String(255), nullable=True)
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+
+    worker = db.Column(db.String(100), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<Job {self.id} {self.kind} {self.status}>"
@@ -0,0 +1,23 @@
+# models/ledger.py
+from extensions import db
+from money import DEFAULT_CURRENCY, Money
+
+
+class DailyBalance(db.Model):
+    """One row per user, currency and day with activity: the day's totals and closing balance."""
+    __tablename__ = 'daily_balance'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'currency', 'day', name='uq_daily_balance_user_currency_day'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    currency = db.Column(db.String(3), nullable=False, default=DEFAULT_CURRENCY)
+    day = db.Column(db.Date, nullable=False)
+
+    income = db.Column(Money, nullable=False, default=0)
+    expense = db.Column(Money, nullable=False, default=0)
+    balance = db.Column(Money, nullable=False, default=0)  # running balance at end of day
+
+    def __repr__(self):
+        return f"<DailyBalance {self.user_id} {self.day} {self.balance}>"
@@ -0,0 +1,30 @@
+# models/notification.py
+from datetime import datetime
+
+from extensions import db
+
+
+class Notification(db.Model):
+    """A message for one user, e.g. a budget passing one of its alert thresholds."""
+    __tablename__ = 'notification'
+    __table_args__ = (
+        # polling for a user's unseen notifications
+        db.Index('ix_notification_user_seen', 'user_id', 'seen', 'id'),
+        # each threshold fires once per budget period
+        db.UniqueConstraint('budget_id', 'window_start', 'threshold',
+                            name='uq_notification_budget_window_threshold'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    kind = db.Column(db.String(30), nullable=False, default='budget_threshold')
+    message = db.Column(db.String(255), nullable=False)
+    seen = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    budget_id = db.Column(db.Integer, db.ForeignKey('budget.id'), nullable=True)
+    window_start = db.Column(db.Date, nullable=True)
+    threshold = db.Column(db.Integer, nullable=True)  # percent of the budget
+
+    def __repr__(self):
+        return f"<Notification {self.user_id} {self.kind} {self.threshold}>"
@@ -0,0 +1,27 @@
+# models/portfolio_snapshot.py
+from datetime import datetime
+
+from extensions import db
+from money import Money
+
+
+class PortfolioSnapshot(db.Model):
+    """A user's portfolio value on one day, recorded by `flask snapshot-portfolios`."""
+    __tablename__ = 'portfolio_snapshot'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'date', name='uq_portfolio_snapshot_user_date'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+
+    fixed_deposit = db.Column(Money, nullable=False, default=0)
+    mutual_fund = db.Column(Money, nullable=False, default=0)
+    share = db.Column(Money, nullable=False, default=0)
+    total = db.Column(Money, nullable=False, default=0)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<PortfolioSnapshot {self.user_id} {self.date} {self.total}>"
@@ -0,0 +1,18 @@
+# models/price.py
+from extensions import db
+
+
+class Price(db.Model):
+    """Closing price (or fund NAV) per ticker/ISIN and day, filled by `flask refresh-prices`."""
+    __tablename__ = 'price'
+    __table_args__ = (
+        db.UniqueConstraint('ticker', 'date', name='uq_price_ticker_date'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    ticker = db.Column(db.String(50), nullable=False)  # matches Investment.ticker_or_isin
+    date = db.Column(db.Date, nullable=False)
+    close = db.Column(db.Float, nullable=False)
+
+    def __repr__(self):
+        return f"<Price {self.ticker} {self.date} {self.close}>"
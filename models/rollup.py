@@ -0,0 +1,26 @@
+# models/rollup.py
+from extensions import db
+from money import DEFAULT_CURRENCY, Money
+
+
+class MonthlyRollup(db.Model):
+    """Per-user monthly totals, maintained on write and read by the dashboard."""
+    __tablename__ = 'monthly_rollup'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'year', 'month', 'category_id', 'type', 'currency',
+                            name='uq_monthly_rollup_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    year = db.Column(db.Integer, nullable=False)
+    month = db.Column(db.Integer, nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=False)
+    type = db.Column(db.String(10), nullable=False)  # "income" or "expense"
+    currency = db.Column(db.String(3), nullable=False, default=DEFAULT_CURRENCY)
+
+    total = db.Column(Money, nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<MonthlyRollup {self.user_id} {self.year}-{self.month:02d} {self.type} {self.total}>"
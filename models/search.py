@@ -0,0 +1,21 @@
+# models/search.py
+from extensions import db
+
+
+class SearchTerm(db.Model):
+    """One word of a transaction's note: the postings of the transaction search index."""
+    __tablename__ = 'search_term'
+    __table_args__ = (
+        # prefix lookups: a range scan over one user's terms
+        db.Index('ix_search_term_user_term', 'user_id', 'term', 'transaction_id'),
+        # re-indexing / removing one transaction's postings
+        db.Index('ix_search_term_transaction', 'transaction_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    transaction_id = db.Column(db.Integer, db.ForeignKey('transaction.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    term = db.Column(db.String(64), nullable=False)  # lowercased word
+
+    def __repr__(self):
+        return f"<SearchTerm {self.user_id} {self.term} {self.transaction_id}>"
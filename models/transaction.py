@@ -1,10 +1,22 @@
 
 from extensions import db
+from money import DEFAULT_CURRENCY, Money
 from datetime import datetime
 
 class Transaction(db.Model):
+    __table_args__ = (
+        # transactions page, feed, export, dashboard totals
+        db.Index('ix_transaction_user_date', 'user_id', 'date'),
+        # per-type / per-category sums (pie chart, budgets)
+        db.Index('ix_transaction_user_type_category', 'user_id', 'type', 'category_id', 'date'),
+        # recurring engine: due templates across all users
+        db.Index('ix_transaction_recurring_next_date', 'is_recurring', 'next_date'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    amount = db.Column(db.Float, nullable=False)
+    amount = db.Column(Money, nullable=False)
+    currency = db.Column(db.String(3), nullable=False, default=DEFAULT_CURRENCY,
+                         server_default=DEFAULT_CURRENCY)
     type = db.Column(db.String(10), nullable=False)  
     note = db.Column(db.Text, nullable=True)
     date = db.Column(db.DateTime, default=datetime.utcnow)
@@ -12,7 +24,7 @@ class Transaction(db.Model):
     # 🔹 Recurring fields
     is_recurring = db.Column(db.Boolean, default=False)   
     frequency = db.Column(db.String(20), nullable=True)   
-    next_date = db.Column(db.DateTime, nullable=True)     
+    next_date = db.Column(db.DateTime, nullable=True)
 
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=False)
@@ -1,5 +1,6 @@
 # models/user.py
 from extensions import db
+from money import DEFAULT_CURRENCY
 
 
 class User(db.Model):
@@ -10,5 +11,8 @@ class User(db.Model):
     email = db.Column(db.String(150), unique=True, nullable=False)
     password = db.Column(db.String(200), nullable=False)
     role = db.Column(db.String(50), default="user") 
+    # Currency that totals, balances and charts are shown in
+    base_currency = db.Column(db.String(3), nullable=False, default=DEFAULT_CURRENCY,
+                              server_default=DEFAULT_CURRENCY)
     transactions = db.relationship('Transaction', backref='user', lazy=True)
     budgets = db.relationship('Budget', backref='user', lazy=True)
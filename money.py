@@ -0,0 +1,94 @@
+# money.py
+"""Money amounts: stored as integer paisa, handled in Python as Decimal rupees.
+
+Every amount column is a `Money` column (BIGINT paisa), so SQL SUMs are exact
+integer sums on every backend. Values come back as Decimals with two places;
+anything written is rounded half-up to the paisa first. Floats are taken at
+their shortest repr, so 0.1 is 0.10 and not 0.1000000000000000055...
+
+Amounts are in the currency of the row they belong to (a `currency` column
+next to them); services.fx converts between currencies.
+"""
+import re
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy.types import BigInteger, TypeDecorator
+
+MINOR_UNITS = 100  # paisa per rupee
+PAISA = Decimal('0.01')
+ZERO = Decimal('0.00')
+
+# New users' base currency, the default for new rows, and what FX rates are quoted in
+DEFAULT_CURRENCY = 'NPR'
+CURRENCY_SYMBOLS = {'NPR': 'Rs.'}
+_CURRENCY_CODE = re.compile(r'[A-Z]{3}')
+
+
+def to_money(value):
+    """A Decimal rounded to the paisa. Raises ValueError for junk, NaN or infinity."""
+    if isinstance(value, Decimal):
+        amount = value
+    else:
+        if isinstance(value, str):
+            value = value.strip().replace(',', '')
+        elif isinstance(value, float):
+            value = repr(value)
+        try:
+            amount = Decimal(value)
+        except (InvalidOperation, TypeError):
+            raise ValueError(f"Not an amount: {value!r}") from None
+    if not amount.is_finite():
+        raise ValueError(f"Not an amount: {value!r}")
+    return amount.quantize(PAISA, rounding=ROUND_HALF_UP)
+
+
+def to_minor(value):
+    """Integer paisa for an amount."""
+    return int(to_money(value).scaleb(2))
+
+
+def from_minor(value):
+    """Decimal rupees for integer paisa (or a SUM of them)."""
+    return Decimal(value).scaleb(-2).quantize(PAISA)
+
+
+def to_currency(code):
+    """A normalized ISO 4217 code ('usd ' -> 'USD'). Raises ValueError otherwise."""
+    code = (code or '').strip().upper()
+    if not _CURRENCY_CODE.fullmatch(code):
+        raise ValueError(f"Not a currency code: {code!r}")
+    return code
+
+
+def format_money(value, currency=None):
+    """'1,234.50', or 'Rs. 1,234.50' / 'USD 12.00' with a currency; blank for None."""
+    if value is None:
+        return ''
+    amount = f"{to_money(value):,.2f}"
+    if currency is None:
+        return amount
+    return f"{CURRENCY_SYMBOLS.get(currency, currency)} {amount}"
+
+
+class Money(TypeDecorator):
+    """Column of rupee amounts stored as integer paisa."""
+
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else to_minor(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else from_minor(value)
+
+
+class MoneyJSONProvider(DefaultJSONProvider):
+    """JSON provider that sends Decimal amounts as numbers instead of strings."""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, Decimal):
+            return float(o)
+        return DefaultJSONProvider.default(o)
@@ -0,0 +1,2 @@
+# services/__init__.py
+# Background and aggregate engines that sit between the models and the views.
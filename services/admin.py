@@ -0,0 +1,121 @@
+# services/admin.py
+"""Queries behind the admin pages: site counters and paginated, sortable tables.
+
+Per-user stats come from one grouped subquery over `monthly_rollup` (already
+kept per user, month, category, type and currency), so listing users never
+scans the transaction table; last activity is an index seek on
+(user_id, date) per listed user.
+"""
+from sqlalchemy import case, func, select, type_coerce
+
+from extensions import db
+from models import ContactMessage, FxRate, MonthlyRollup, Transaction, User
+from money import DEFAULT_CURRENCY, Money
+
+def site_counters():
+    """(total users, admins, contact messages) in one aggregate query."""
+    messages = select(func.count(ContactMessage.id)).scalar_subquery()
+    total_users, total_admins, total_messages = db.session.query(
+        func.count(User.id),
+        func.coalesce(func.sum(case((User.role == "admin", 1), else_=0)), 0),
+        messages,
+    ).one()
+    return total_users, total_admins, total_messages
+
+
+def _latest_rate(currency):
+    """NPR per unit of `currency` at its most recent rate, as a correlated subquery."""
+    return (select(FxRate.rate).where(FxRate.currency == currency)
+            .order_by(FxRate.date.desc()).limit(1).scalar_subquery())
+
+
+def _user_stats(users=None):
+    """Subquery of (user_id, transactions, volume) from the rollup, one row per user.
+
+    `users`, a subquery with an `id` column, limits it to those users.
+    Volume is income plus expense in NPR, foreign amounts at their latest
+    rate; it measures activity, not a balance.
+    """
+    in_npr = case(
+        (MonthlyRollup.currency == DEFAULT_CURRENCY, MonthlyRollup.total),
+        else_=MonthlyRollup.total * _latest_rate(MonthlyRollup.currency),
+    )
+    # Grouping on the listed ids lets the planner seek the rollup per user
+    # instead of walking all of it; a join because MySQL has no LIMIT in IN
+    user_id = MonthlyRollup.user_id if users is None else users.c.id
+    query = db.session.query(
+        user_id.label("user_id"),
+        func.sum(MonthlyRollup.count).label("transactions"),
+        type_coerce(func.round(func.sum(in_npr)), Money).label("volume"),
+    )
+    if users is not None:
+        query = query.select_from(users).join(MonthlyRollup, MonthlyRollup.user_id == users.c.id)
+    return query.group_by(user_id).subquery()
+
+
+def _order(column, direction, tiebreak):
+    columns = (column,) if column is tiebreak else (column, tiebreak)
+    return [c.desc() if direction == "desc" else c.asc() for c in columns]
+
+
+USER_COLUMNS = {"id": User.id, "username": User.username, "email": User.email,
+                "role": User.role}
+
+
+def users_page(q="", sort="id", direction="asc", page=1, per_page=25):
+    """One page of users with their stats, filtered by `q` on username or email.
+
+    Items are (User, transactions, volume, last_active); unknown sort keys
+    fall back to id. Sorted by a user column, only the listed users' stats
+    are aggregated; sorting by a stat aggregates everyone's.
+    """
+    q = (q or "").strip()
+    matches = [User.username.icontains(q, autoescape=True)
+               | User.email.icontains(q, autoescape=True)] if q else []
+    users = db.session.query(User.id).filter(*matches)
+
+    last_active = (select(func.max(Transaction.date))
+                   .where(Transaction.user_id == User.id)
+                   .correlate(User).scalar_subquery())
+    if sort not in ("transactions", "volume", "last_active"):
+        order = _order(USER_COLUMNS.get(sort, User.id), direction, User.id)
+        listed = (users.order_by(*order).limit(per_page)
+                  .offset((max(page, 1) - 1) * per_page).subquery())
+        stats = _user_stats(listed)
+    else:
+        stats = _user_stats()
+        column = {"transactions": func.coalesce(stats.c.transactions, 0),
+                  "volume": func.coalesce(stats.c.volume, 0),
+                  "last_active": last_active}[sort]
+        order = _order(column, direction, User.id)
+
+    query = (
+        db.session.query(User, func.coalesce(stats.c.transactions, 0),
+                         type_coerce(func.coalesce(stats.c.volume, 0), Money),
+                         last_active.label("last_active"))
+        .outerjoin(stats, stats.c.user_id == User.id)
+        .filter(*matches)
+        .order_by(*order)
+    )
+    pagination = query.paginate(page=page, per_page=per_page, error_out=False, count=False)
+    # Counting the plain user filter skips the stats join
+    pagination.total = users.count()
+    return pagination
+
+
+def messages_page(q="", sort="date_sent", direction="desc", page=1, per_page=25):
+    """One page of contact messages, filtered by `q` on name, email or text."""
+    columns = {
+        "date_sent": ContactMessage.date_sent,
+        "name": ContactMessage.name,
+        "email": ContactMessage.email,
+    }
+    query = ContactMessage.query
+    q = (q or "").strip()
+    if q:
+        query = query.filter(ContactMessage.name.icontains(q, autoescape=True)
+                             | ContactMessage.email.icontains(q, autoescape=True)
+                             | ContactMessage.message.icontains(q, autoescape=True))
+    query = query.order_by(*_order(columns.get(sort, ContactMessage.date_sent), direction,
+                                   ContactMessage.id))
+    return query.paginate(page=page, per_page=per_page, error_out=False)
@@ -0,0 +1,198 @@
+# services/alerts.py
+"""Budget alerts, evaluated as expenses are written.
+
+`budget_spend` keeps each budget's spending in its current period, one row
+per currency. Every expense write adds its amount to the matching rows
+(one upsert per touched budget and currency), then compares the touched
+budgets' totals, converted at today's rates, with BUDGET_ALERT_THRESHOLDS.
+Each threshold reached fires one `notification` per budget period; the
+unique key on (budget, period, threshold) keeps concurrent writers from
+firing it twice.
+
+A row whose period has ended is reset by the next expense in the new one.
+Changes that can take spending away (bulk edits and deletes, budget edits)
+recount the user's budgets from the transactions instead.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import case, select
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db, upsert
+from models import Budget, BudgetSpend, Notification
+from money import DEFAULT_CURRENCY, ZERO, to_money
+from services.budgets import current_window, spent_in_windows
+from services.fx import convert_sums
+
+
+def _get(row, name):
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+def _currency(row):
+    # Rows that don't name a currency are written with the column default
+    currency = row.get('currency') if isinstance(row, dict) else row.currency
+    return currency or DEFAULT_CURRENCY
+
+
+def _today():
+    return (datetime.utcnow() + timedelta(hours=5, minutes=45)).date()
+
+
+def _day(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def thresholds():
+    """Alert thresholds in percent of a budget, ascending."""
+    return sorted(current_app.config.get('BUDGET_ALERT_THRESHOLDS', (50, 80, 100)))
+
+
+def record_expenses(rows, today=None):
+    """Add written transaction rows to their budgets' running spend and fire alerts.
+
+    `rows` may be Transaction objects or mappings; only expenses inside a
+    budget's current period count. Runs inside the caller's transaction;
+    the caller commits.
+    """
+    expenses = [row for row in rows if _get(row, 'type') == 'expense']
+    if not expenses:
+        return
+    today = today or _today()
+    budgets = Budget.query.filter(
+        Budget.user_id.in_({_get(row, 'user_id') for row in expenses}),
+        Budget.category_id.in_({_get(row, 'category_id') for row in expenses}),
+    ).all()
+    if not budgets:
+        return
+
+    windows = {b.id: current_window(b, today) for b in budgets}
+    by_key = defaultdict(list)
+    for b in budgets:
+        by_key[b.user_id, b.category_id].append(b)
+    deltas = defaultdict(lambda: ZERO)
+    for row in expenses:
+        day = _day(_get(row, 'date'))
+        for b in by_key.get((_get(row, 'user_id'), _get(row, 'category_id')), ()):
+            start, end = windows[b.id]
+            if start <= day < end:
+                deltas[b.id, _currency(row)] += to_money(_get(row, 'amount') or 0)
+    if not deltas:
+        return
+
+    spent = _add_spend(deltas, windows)
+    touched = {budget_id for budget_id, _ in deltas}
+    _fire_alerts([b for b in budgets if b.id in touched], windows, spent, today)
+
+
+def _add_spend(deltas, windows):
+    """Fold {(budget_id, currency): amount} into budget_spend for the current periods.
+
+    Returns the touched budgets' new (budget_id, currency, spent) rows.
+    """
+    table = BudgetSpend.__table__
+    # One upsert per row: the database adds to a row of the current period,
+    # resets one left over from an earlier period and inserts a missing one,
+    # so concurrent writers neither lose increments nor clash on a new key.
+    # `spent` goes first: MySQL evaluates it against the old window_start.
+    upsert(table, ("budget_id", "currency"),
+           [{"budget_id": budget_id, "currency": currency,
+             "window_start": windows[budget_id][0], "spent": amount}
+            for (budget_id, currency), amount in deltas.items()],
+           lambda incoming: [
+               ("spent", case((table.c.window_start == incoming["window_start"],
+                               table.c.spent + incoming["spent"]),
+                              else_=incoming["spent"])),
+               ("window_start", incoming["window_start"]),
+           ])
+    rows = db.session.execute(
+        select(table.c.budget_id, table.c.currency, table.c.window_start, table.c.spent)
+        .where(table.c.budget_id.in_({budget_id for budget_id, _ in deltas}))
+    )
+    return [(budget_id, currency, spent) for budget_id, currency, start, spent in rows
+            if start == windows[budget_id][0]]
+
+
+def _fire_alerts(budgets, windows, spent, today):
+    """Notify each budget's thresholds reached this period that have not fired yet.
+
+    `spent` holds (budget_id, currency, amount) rows of the current periods.
+    """
+    currencies = {b.id: b.currency for b in budgets if b.amount}
+    totals = convert_sums(((budget_id, currency, today, amount)
+                           for budget_id, currency, amount in spent if budget_id in currencies),
+                          currencies)
+    budgets = [b for b in budgets if b.id in currencies]
+    percents = {b.id: totals.get(b.id, ZERO) / b.amount * 100 for b in budgets}
+    levels = thresholds()
+    reached = [b for b in budgets if levels and percents[b.id] >= levels[0]]
+    if not reached:
+        return
+
+    starts = {b.id: windows[b.id][0] for b in reached}
+    fired = {
+        tuple(row) for row in
+        db.session.query(Notification.budget_id, Notification.window_start, Notification.threshold)
+        .filter(Notification.budget_id.in_(list(starts)))
+    }
+    for b in reached:
+        for threshold in levels:
+            if percents[b.id] >= threshold and (b.id, starts[b.id], threshold) not in fired:
+                _notify(b, starts[b.id], threshold, percents[b.id])
+
+
+def _notify(budget, start, threshold, percent):
+    notification = Notification(
+        user_id=budget.user_id, kind='budget_threshold', budget_id=budget.id,
+        window_start=start, threshold=threshold,
+        message=(f"{budget.name or 'Budget'} has reached {threshold}% of its "
+                 f"{budget.amount:,.2f} {budget.currency} for this period "
+                 f"({int(percent)}% spent)."),
+    )
+    try:
+        with db.session.begin_nested():
+            db.session.add(notification)
+    except IntegrityError:
+        pass  # a concurrent write fired it first
+
+
+def refresh_budgets(user_id, budgets=None, notify=True, today=None):
+    """Recount the running spend of a user's budgets (default: all) from the transactions.
+
+    Fires the thresholds the recount reaches unless `notify` is false.
+    Runs inside the caller's transaction; the caller commits.
+    """
+    today = today or _today()
+    if budgets is None:
+        budgets = Budget.query.filter_by(user_id=user_id).all()
+    if not budgets:
+        return
+    windows = {b.id: current_window(b, today) for b in budgets}
+    BudgetSpend.query.filter(BudgetSpend.budget_id.in_(list(windows))).delete(
+        synchronize_session=False)
+    spent = spent_in_windows(user_id, budgets, windows)
+    if spent:
+        db.session.execute(BudgetSpend.__table__.insert(), [
+            {"budget_id": budget_id, "currency": currency,
+             "window_start": windows[budget_id][0], "spent": amount}
+            for budget_id, currency, amount in spent])
+    if notify:
+        _fire_alerts(budgets, windows, spent, today)
+
+
+def rebuild_budget_spend(user_id=None):
+    """Recount every budget's running spend without notifying. Commits."""
+    query = db.session.query(Budget.user_id).distinct()
+    if user_id is not None:
+        query = query.filter(Budget.user_id == user_id)
+    for (uid,) in query.all():
+        refresh_budgets(uid, notify=False)
+    db.session.commit()
+
+
+def forget_budget(budget_id):
+    """Drop a budget's running spend and notifications, before the budget itself."""
+    BudgetSpend.query.filter_by(budget_id=budget_id).delete(synchronize_session=False)
+    Notification.query.filter_by(budget_id=budget_id).delete(synchronize_session=False)
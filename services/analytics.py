@@ -0,0 +1,266 @@
+# services/analytics.py
+"""Spending trends and cash-flow forecasts over NumPy columns.
+
+A user's transactions are fetched once into a TransactionFrame (one array per
+column). Every series, rolling average, delta and forecast below is an array
+operation over those columns, so 100k+ rows cost one query and a few passes in
+C rather than a Python loop per row.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import BigInteger, func, select, type_coerce
+
+from extensions import db
+from models import Category, Transaction
+from money import DEFAULT_CURRENCY, MINOR_UNITS
+from services.cache import aggregate_cache
+from services.fx import base_currency, fx_rates
+
+FREQUENCIES = ('day', 'week', 'month')
+# Buckets returned when the caller does not ask for a specific number
+DEFAULT_PERIODS = {'day': 90, 'week': 26, 'month': 12}
+FORECAST_METHODS = ('linear', 'smoothing')
+UNCATEGORIZED = 'Uncategorized'
+
+_STEPS = {
+    'day': np.timedelta64(1, 'D'),
+    'week': np.timedelta64(7, 'D'),
+    'month': np.timedelta64(1, 'M'),
+}
+
+
+class TransactionFrame:
+    """Columnar view of one user's transactions.
+
+    `day` is datetime64[D], `amount` int64 hundredths of `currency`,
+    `is_expense` bool, and `category` an int code into `category_names`.
+    Sums stay in whole hundredths and are only divided out for output.
+    """
+
+    def __init__(self, day, amount, is_expense, category, category_names,
+                 currency=DEFAULT_CURRENCY):
+        self.day = day
+        self.amount = amount
+        self.is_expense = is_expense
+        self.category = category
+        self.category_names = category_names
+        self.currency = currency
+
+    @classmethod
+    def empty(cls, currency=DEFAULT_CURRENCY):
+        return cls(np.array([], dtype='datetime64[D]'), np.array([], dtype=np.int64),
+                   np.array([], dtype=bool), np.array([], dtype=np.int64), [], currency)
+
+    def __len__(self):
+        return len(self.day)
+
+
+def load_frame(user_id):
+    """Fetch a user's transactions as a TransactionFrame in one query.
+
+    Amounts are converted into the user's base currency at the month-end
+    rate of their month, the same rates the rollup totals use.
+    """
+    base = base_currency(user_id)
+    # Only the calendar day is needed; DATE() skips parsing full datetimes row
+    # by row, running on the connection skips ORM row processing, and amounts
+    # come back as raw hundredths rather than one Decimal per row
+    rows = db.session.connection().execute(
+        select(func.date(Transaction.date), type_coerce(Transaction.amount, BigInteger),
+               Transaction.type, Category.name, Transaction.currency)
+        .outerjoin(Category, Transaction.category_id == Category.id)
+        .where(Transaction.user_id == user_id, Transaction.date.isnot(None))
+    ).all()
+    if not rows:
+        return TransactionFrame.empty(base)
+
+    dates, amounts, types, names, currencies = zip(*rows)
+    day = np.array(dates, dtype='datetime64[D]')
+    amount = np.array(amounts, dtype=np.int64)
+    currencies = np.array(currencies, dtype=object)
+    if (currencies != base).any():
+        month_ends = (day.astype('datetime64[M]') + 1).astype('datetime64[D]') - 1
+        amount = fx_rates.convert(amount, currencies, month_ends, base)
+    names = np.array(names, dtype=object)
+    names[np.equal(names, None)] = UNCATEGORIZED
+    category_names, category = np.unique(names.astype(str), return_inverse=True)
+    return TransactionFrame(
+        day=day,
+        amount=amount,
+        is_expense=np.array(types) == 'expense',
+        category=category.astype(np.int64),
+        category_names=category_names.tolist(),
+        currency=base,
+    )
+
+
+def bucket(days, freq):
+    """Start of the day/week (Monday)/month each datetime64[D] falls in."""
+    if freq == 'month':
+        return days.astype('datetime64[M]')
+    if freq == 'week':
+        # 1970-01-01 was a Thursday, so +3 makes Monday weekday 0
+        return days - ((days.astype(np.int64) + 3) % 7).astype('timedelta64[D]')
+    return days
+
+
+def series(frame, freq, today):
+    """Income, expense, net and running balance per bucket.
+
+    Buckets run contiguously from the first transaction through the bucket
+    containing `today`; empty buckets are zero and rows dated after today are
+    left out. Returns (starts, income, expense, net, balance) arrays.
+    """
+    step = _STEPS[freq]
+    last = bucket(np.array([today], dtype='datetime64[D]'), freq)[0]
+    buckets = bucket(frame.day, freq)
+    first = min(buckets.min(), last) if len(frame) else last
+    starts = np.arange(first, last + step, step)
+
+    pos = ((buckets - first) // step).astype(np.int64)
+    in_range = pos < len(starts)
+    income_rows = in_range & ~frame.is_expense
+    expense_rows = in_range & frame.is_expense
+    # Whole-paisa sums are exact in float64 up to 2**53 paisa
+    income = np.bincount(pos[income_rows], weights=frame.amount[income_rows],
+                         minlength=len(starts)) / MINOR_UNITS
+    expense = np.bincount(pos[expense_rows], weights=frame.amount[expense_rows],
+                          minlength=len(starts)) / MINOR_UNITS
+    net = income - expense
+    return starts, income, expense, net, np.cumsum(net)
+
+
+def rolling_mean(values, window):
+    """Trailing mean over `window` buckets; the first buckets average what exists."""
+    csum = np.concatenate(([0.0], np.cumsum(values)))
+    counts = np.minimum(np.arange(1, len(values) + 1), window)
+    ends = np.arange(1, len(values) + 1)
+    return (csum[ends] - csum[ends - counts]) / counts
+
+
+def period_over_period(values):
+    """Change from the previous bucket, absolute and in percent (NaN where undefined)."""
+    previous = np.concatenate(([np.nan], values[:-1]))
+    delta = values - previous
+    pct = np.full(len(values), np.nan)
+    np.divide(delta * 100, np.abs(previous), out=pct,
+              where=~np.isnan(previous) & (previous != 0))
+    return delta, pct
+
+
+def top_categories(frame, n=5, since=None, until=None):
+    """The `n` categories with the most spending from `since` through `until` (datetime64[D])."""
+    mask = frame.is_expense.copy()
+    if since is not None:
+        mask &= frame.day >= since
+    if until is not None:
+        mask &= frame.day <= until
+    totals = np.bincount(frame.category[mask], weights=frame.amount[mask],
+                         minlength=len(frame.category_names)) / MINOR_UNITS
+    order = np.argsort(totals, kind='stable')[::-1][:n]
+    order = order[totals[order] > 0]
+    overall = totals.sum()
+    return [{"name": frame.category_names[i],
+             "total": round(float(totals[i]), 2),
+             "share": round(float(totals[i] * 100 / overall), 1)} for i in order]
+
+
+def forecast(values, horizon=3, method='linear', alpha=0.5):
+    """Project the next `horizon` values of a series.
+
+    'linear' extends a least-squares trend line. 'smoothing' is simple
+    exponential smoothing: its final level is a weighted sum of the history
+    (weights alpha*(1-alpha)^k, seeded with the first value), computed as one
+    dot product instead of a recursive loop, and projected flat.
+    """
+    n = len(values)
+    if n == 0:
+        return np.zeros(horizon)
+    if method == 'linear':
+        if n == 1:
+            return np.full(horizon, float(values[0]))
+        slope, intercept = np.polyfit(np.arange(n), values, 1)
+        return intercept + slope * np.arange(n, n + horizon)
+    weights = alpha * (1 - alpha) ** np.arange(n - 1, -1, -1)
+    weights[0] = (1 - alpha) ** (n - 1)
+    return np.full(horizon, float(weights @ values))
+
+
+def _labels(starts):
+    return np.datetime_as_string(starts.astype('datetime64[D]')).tolist()
+
+
+def _floats(values):
+    """Round for JSON, with NaN as null."""
+    rounded = np.round(values, 2)
+    return np.where(np.isnan(rounded), None, rounded).tolist()
+
+
+@aggregate_cache.memoize('spending_analytics', daily=True)
+def spending_analytics(user_id, freq='month', periods=None, window=3, top=5,
+                       horizon=3, method='linear', lookback=12, today=None):
+    """Chart-ready trend, delta, category and forecast data for one user.
+
+    `periods` limits how many of the latest buckets are returned (the rolling
+    averages still see the full history). The forecast is fitted on the net
+    cash flow of the last `lookback` complete months and projects `horizon`
+    months starting with the current one.
+    """
+    if freq not in FREQUENCIES:
+        raise ValueError(f"freq must be one of {', '.join(FREQUENCIES)}")
+    if method not in FORECAST_METHODS:
+        raise ValueError(f"method must be one of {', '.join(FORECAST_METHODS)}")
+    periods = periods or DEFAULT_PERIODS[freq]
+    if not (1 <= periods <= 3660 and 1 <= window <= 366 and 1 <= top <= 50
+            and 1 <= horizon <= 24 and 2 <= lookback <= 120):
+        raise ValueError("periods, window, top, horizon or lookback out of range")
+    if today is None:
+        today = (datetime.utcnow() + timedelta(hours=5, minutes=45)).date()
+
+    frame = load_frame(user_id)
+
+    starts, income, expense, net, balance = series(frame, freq, today)
+    expense_avg = rolling_mean(expense, window)
+    net_avg = rolling_mean(net, window)
+    shown = slice(max(0, len(starts) - periods), None)
+
+    months, m_income, m_expense, m_net, m_balance = (
+        (starts, income, expense, net, balance) if freq == 'month'
+        else series(frame, 'month', today))
+    income_delta, income_pct = period_over_period(m_income)
+    expense_delta, expense_pct = period_over_period(m_expense)
+
+    # Fit on complete months only; the current month is still filling up
+    history = m_net[:-1][-lookback:]
+    projected = forecast(history, horizon, method)
+    opening = m_balance[-2] if len(m_balance) > 1 else 0.0
+    forecast_starts = months[-1] + np.arange(horizon).astype('timedelta64[M]')
+
+    return {
+        "freq": freq,
+        "currency": frame.currency,
+        "transactions": len(frame),
+        "labels": _labels(starts[shown]),
+        "income": _floats(income[shown]),
+        "expense": _floats(expense[shown]),
+        "net": _floats(net[shown]),
+        "balance": _floats(balance[shown]),
+        "expense_rolling_avg": _floats(expense_avg[shown]),
+        "net_rolling_avg": _floats(net_avg[shown]),
+        "month_over_month": {
+            "labels": _labels(months[-12:]),
+            "income_delta": _floats(income_delta[-12:]),
+            "income_pct": _floats(income_pct[-12:]),
+            "expense_delta": _floats(expense_delta[-12:]),
+            "expense_pct": _floats(expense_pct[-12:]),
+        },
+        "top_categories": top_categories(frame, top, since=starts[shown][0].astype('datetime64[D]'),
+                                         until=np.datetime64(today, 'D')),
+        "forecast": {
+            "method": method,
+            "labels": _labels(forecast_starts),
+            "net": _floats(projected),
+            "balance": _floats(opening + np.cumsum(projected)),
+        },
+    }
@@ -0,0 +1,201 @@
+# services/archive.py
+"""Closed years of transactions, moved out of the hot `transaction` table.
+
+`flask archive-transactions` moves every transaction dated before the last
+ARCHIVE_KEEP_YEARS closed years into `transaction_archive` (range partitioned
+by year on MySQL, a plain table elsewhere) and adds them to `yearly_summary`.
+Recurring templates stay where the recurring engine looks for them.
+
+The monthly rollup and the ledger are left as they are, so dashboard totals,
+charts and balances do not change. Rebuilding those, the import de-duplication
+and the CSV export read both tables through `with_archive`; the transactions
+page, search, bulk edits and analytics only see the hot rows, and the page's
+all-time totals add the archived years from their summary rows.
+"""
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import and_, extract, func, insert, or_, select, union_all
+from sqlalchemy.exc import DBAPIError
+
+from extensions import db, upsert
+from money import ZERO, to_money
+from models import ArchivedTransaction, Transaction, YearlySummary
+from services.cache import aggregate_cache, TRANSACTION_AGGREGATES
+from services.fx import convert_sums
+from services.search import unindex_transactions
+
+CHUNK_SIZE = 1000
+COLUMNS = ("id", "date", "amount", "currency", "type", "note", "user_id", "category_id")
+SUMMARY_KEY = ("user_id", "year", "category_id", "type", "currency")
+
+
+def with_archive(select_for):
+    """UNION ALL of `select_for(Transaction)` and `select_for(ArchivedTransaction)`, as a subquery.
+
+    `select_for` builds the same select against either model, so filters on
+    (user_id, date) reach each table's own index.
+    """
+    return union_all(select_for(Transaction), select_for(ArchivedTransaction)).subquery()
+
+
+def archive_horizon(keep_years):
+    """First day kept in the hot table: January 1st, `keep_years` closed years back."""
+    today = (datetime.utcnow() + timedelta(hours=5, minutes=45)).date()
+    return datetime(today.year - keep_years, 1, 1)
+
+
+def _partition_years():
+    """Years with their own archive partition, or None if the table isn't partitioned."""
+    rows = db.session.execute(db.text(
+        "SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'transaction_archive'"
+    )).all()
+    if not rows or rows[0][0] is None:
+        return None
+    return {int(bound) - 1 for _, bound in rows if bound != 'MAXVALUE'}
+
+
+def ensure_partitions(years):
+    """MySQL: partition the archive by year, adding one partition per year in `years`.
+
+    New years are split off the trailing MAXVALUE partition, so only years
+    after the newest partitioned one get their own; earlier rows land in the
+    oldest partition. A server without partitioning keeps the plain table.
+    Other backends have nothing to do. Returns the years added.
+    """
+    if db.engine.dialect.name != 'mysql' or not years:
+        return []
+
+    def partitions(new_years):
+        return ", ".join([*(f"PARTITION p{year} VALUES LESS THAN ({year + 1})"
+                            for year in new_years),
+                          "PARTITION pmax VALUES LESS THAN MAXVALUE"])
+
+    existing = _partition_years()
+    if existing is None:
+        added = sorted(set(years))
+        ddl = f"PARTITION BY RANGE (YEAR(`date`)) ({partitions(added)})"
+    else:
+        added = sorted(year for year in set(years) if year > max(existing, default=0))
+        if not added:
+            return []
+        ddl = f"REORGANIZE PARTITION pmax INTO ({partitions(added)})"
+    try:
+        db.session.execute(db.text(f"ALTER TABLE transaction_archive {ddl}"))
+    except DBAPIError as exc:
+        db.session.rollback()
+        current_app.logger.warning("Archive table left unpartitioned: %s", exc.orig)
+        return []
+    db.session.commit()
+    return added
+
+
+def _archivable(horizon, user_id=None):
+    conditions = [Transaction.date < horizon,
+                  or_(Transaction.is_recurring == False, Transaction.is_recurring == None)]
+    if user_id is not None:
+        conditions.append(Transaction.user_id == user_id)
+    return and_(*conditions)
+
+
+def _add_to_summary(rows):
+    """Fold (user_id, year, category_id, type, currency, total, count) rows into yearly_summary."""
+    table = YearlySummary.__table__
+    upsert(table, SUMMARY_KEY,
+           [dict(zip(SUMMARY_KEY, (user_id, int(year), *key)), total=to_money(total), count=count)
+            for user_id, year, *key, total, count in rows],
+           lambda incoming: [("total", table.c.total + incoming["total"]),
+                             ("count", table.c.count + incoming["count"])])
+
+
+def _archive_user(user_id, horizon):
+    """Move one user's archivable transactions in a single database transaction."""
+    ids = [t_id for (t_id,) in db.session.query(Transaction.id)
+           .filter(_archivable(horizon, user_id)).with_for_update()]
+    if not ids:
+        db.session.rollback()
+        return 0
+    # Rows written meanwhile have higher ids and wait for the next run
+    condition = and_(_archivable(horizon, user_id), Transaction.id <= max(ids))
+
+    year = extract('year', Transaction.date)
+    summary = (
+        db.session.query(Transaction.user_id, year, Transaction.category_id, Transaction.type,
+                         Transaction.currency, func.sum(Transaction.amount),
+                         func.count(Transaction.id))
+        .filter(condition)
+        .group_by(Transaction.user_id, year, Transaction.category_id, Transaction.type,
+                  Transaction.currency)
+        .all()
+    )
+    db.session.execute(insert(ArchivedTransaction).from_select(
+        COLUMNS, select(*(getattr(Transaction, name) for name in COLUMNS)).where(condition)))
+    # Postings reference the transactions, so they go before the rows do
+    for start in range(0, len(ids), CHUNK_SIZE):
+        unindex_transactions(ids[start:start + CHUNK_SIZE])
+    Transaction.query.filter(condition).delete(synchronize_session=False)
+    _add_to_summary(summary)
+    db.session.commit()
+    aggregate_cache.invalidate(user_id, TRANSACTION_AGGREGATES)
+    return len(ids)
+
+
+def archive_transactions(keep_years, user_id=None):
+    """Archive transactions older than the last `keep_years` closed years. Commits per user.
+
+    Running it again moves only what has aged past the horizon (or was
+    back-dated there) since. Returns the number of transactions moved.
+    """
+    horizon = archive_horizon(keep_years)
+    oldest = db.session.query(func.min(Transaction.date)).filter(
+        _archivable(horizon, user_id)).scalar()
+    if oldest is None:
+        return 0
+    ensure_partitions(range(oldest.year, horizon.year))
+
+    user_ids = [user_id] if user_id is not None else [
+        uid for (uid,) in db.session.query(Transaction.user_id)
+        .filter(_archivable(horizon)).distinct()]
+    return sum(_archive_user(uid, horizon) for uid in user_ids)
+
+
+def archived_totals(user_id, currency):
+    """(income, expense) of every archived transaction, in `currency`, from the summary rows.
+
+    Foreign-currency years are converted at their year-end rates.
+    """
+    rows = (
+        db.session.query(YearlySummary.type, YearlySummary.currency, YearlySummary.year,
+                         func.sum(YearlySummary.total))
+        .filter(YearlySummary.user_id == user_id)
+        .group_by(YearlySummary.type, YearlySummary.currency, YearlySummary.year)
+        .all()
+    )
+    totals = convert_sums(((t_type, code, date(year, 12, 31), total)
+                           for t_type, code, year, total in rows), currency)
+    return totals.get('income', ZERO), totals.get('expense', ZERO)
+
+
+def rebuild_summaries(user_id=None):
+    """Recompute `yearly_summary` from the archive table, for one user or everyone. Commits."""
+    stale = YearlySummary.query
+    source = db.session.query(ArchivedTransaction)
+    if user_id is not None:
+        stale = stale.filter_by(user_id=user_id)
+        source = source.filter(ArchivedTransaction.user_id == user_id)
+    stale.delete(synchronize_session=False)
+
+    year = extract('year', ArchivedTransaction.date)
+    grouped = (
+        source
+        .with_entities(ArchivedTransaction.user_id, year, ArchivedTransaction.category_id,
+                       ArchivedTransaction.type, ArchivedTransaction.currency,
+                       func.sum(ArchivedTransaction.amount),
+                       func.count(ArchivedTransaction.id))
+        .group_by(ArchivedTransaction.user_id, year, ArchivedTransaction.category_id,
+                  ArchivedTransaction.type, ArchivedTransaction.currency)
+    )
+    db.session.execute(insert(YearlySummary).from_select(
+        [*SUMMARY_KEY, 'total', 'count'], grouped.statement))
+    db.session.commit()
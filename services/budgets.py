@@ -0,0 +1,165 @@
+# services/budgets.py
+from calendar import monthrange
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import DateTime, Integer, and_, func, literal, select, union_all
+
+from extensions import db
+from models import ArchivedTransaction, BudgetSpend, Transaction
+from money import ZERO
+from services.cache import aggregate_cache
+from services.fx import base_currency, convert_sums
+
+# Bounds for budgets without a period or dates
+EARLIEST = date(1900, 1, 1)
+LATEST = date(9999, 12, 31)
+
+
+def _add_months(d, months):
+    year, month = divmod(d.month - 1 + months, 12)
+    year += d.year
+    return date(year, month + 1, min(d.day, monthrange(year, month + 1)[1]))
+
+
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def current_window(budget, today):
+    """Return the [start, end) dates of the budget's period containing `today`.
+
+    Weekly/monthly/yearly budgets roll forward from their start date (or from
+    the calendar week/month/year when they have none). Other budgets cover
+    start_date..end_date. The window never extends past end_date.
+    """
+    period = (budget.period or '').lower()
+    # Dates set on an unflushed budget may still be datetimes
+    anchor = _as_date(budget.start_date)
+    end_date = _as_date(budget.end_date)
+
+    if period == 'weekly':
+        anchor = anchor or today - timedelta(days=today.weekday())
+        weeks = max((today - anchor).days // 7, 0)
+        start = anchor + timedelta(weeks=weeks)
+        end = start + timedelta(weeks=1)
+    elif period in ('monthly', 'yearly'):
+        step = 1 if period == 'monthly' else 12
+        if anchor is None:
+            anchor = date(today.year, today.month if period == 'monthly' else 1, 1)
+        steps = ((today.year - anchor.year) * 12 + today.month - anchor.month) // step
+        if steps > 0 and _add_months(anchor, steps * step) > today:
+            steps -= 1
+        steps = max(steps, 0)
+        start = _add_months(anchor, steps * step)
+        end = _add_months(anchor, (steps + 1) * step)
+    else:
+        start, end = anchor or EARLIEST, LATEST
+
+    if end_date:
+        end = min(end, end_date + timedelta(days=1))
+    return start, end
+
+
+def spent_by_budget(user_id, budgets, today):
+    """Return ({budget id: spent}, {budget id: (start, end)}) from the running totals.
+
+    `budget_spend` holds each budget's spend in its current period per
+    currency, kept up to date as expenses are written (see services.alerts).
+    Spending is in the budget's own currency, converted at `today`'s rates.
+    """
+    windows = {b.id: current_window(b, today) for b in budgets}
+    if not windows:
+        return {}, windows
+    keys = tuple((b.id, windows[b.id][0]) for b in budgets)
+    currencies = tuple((b.id, b.currency) for b in budgets)
+    return _tracked_spend(user_id, keys, currencies, today), windows
+
+
+@aggregate_cache.memoize('budget_spent')
+def _tracked_spend(user_id, keys, currencies, today):
+    starts = dict(keys)
+    rows = (
+        db.session.query(BudgetSpend.budget_id, BudgetSpend.currency, BudgetSpend.window_start,
+                         BudgetSpend.spent)
+        .filter(BudgetSpend.budget_id.in_(list(starts)))
+        .all()
+    )
+    # A row from an earlier period means nothing has been spent in this one yet
+    return convert_sums(((budget_id, currency, today, spent)
+                         for budget_id, currency, start, spent in rows
+                         if start == starts[budget_id]), dict(currencies))
+
+
+def spent_in_windows(user_id, budgets, windows):
+    """[(budget id, currency, spent)] of each budget's window, counted from the transactions.
+
+    Each window is sent as a derived table and joined to the user's
+    expenses on category and date range, once for the hot and once for the
+    archived transactions.
+    """
+    as_dt = lambda d: datetime.combine(d, datetime.min.time())
+    derived = union_all(*[
+        select(
+            literal(b.id, Integer).label('budget_id'),
+            literal(b.category_id, Integer).label('category_id'),
+            literal(as_dt(windows[b.id][0]), DateTime).label('starts'),
+            literal(as_dt(windows[b.id][1]), DateTime).label('ends'),
+        )
+        for b in budgets
+    ]).subquery('budget_window')
+
+    spent = defaultdict(lambda: ZERO)
+    for model in (Transaction, ArchivedTransaction):
+        rows = (
+            db.session.query(derived.c.budget_id, model.currency, func.sum(model.amount))
+            .select_from(derived)
+            .join(model, and_(
+                model.user_id == user_id,
+                model.type == "expense",
+                model.category_id == derived.c.category_id,
+                model.date >= derived.c.starts,
+                model.date < derived.c.ends,
+            ))
+            .group_by(derived.c.budget_id, model.currency)
+        )
+        for budget_id, currency, total in rows:
+            spent[budget_id, currency] += total
+    return [(budget_id, currency, total) for (budget_id, currency), total in spent.items()]
+
+
+def budget_progress(user_id, budgets, today=None):
+    """Build the rows shown on the budgets page for the current periods.
+
+    Reads the running totals, so nothing is summed from the transactions here.
+    """
+    if today is None:
+        today = (datetime.utcnow() + timedelta(hours=5, minutes=45)).date()
+    spent, windows = spent_by_budget(user_id, budgets, today)
+
+    progress = []
+    for b in budgets:
+        amount_spent = spent.get(b.id, ZERO)
+        start, end = windows[b.id]
+        progress.append({
+            "budget": b,
+            "spent": amount_spent,
+            "progress": int((amount_spent / b.amount) * 100) if b.amount else 0,
+            "exceeded": amount_spent > b.amount,
+            "window_start": start if start != EARLIEST else None,
+            "window_end": end - timedelta(days=1) if end != LATEST else None,
+        })
+    return progress
+
+
+def budget_totals(user_id, progress, today=None):
+    """(total budgeted, total spent) over `budget_progress` rows, in the user's base currency."""
+    if today is None:
+        today = (datetime.utcnow() + timedelta(hours=5, minutes=45)).date()
+    rows = []
+    for item in progress:
+        currency = item["budget"].currency
+        rows.append(("budget", currency, today, item["budget"].amount))
+        rows.append(("spent", currency, today, item["spent"]))
+    totals = convert_sums(rows, base_currency(user_id))
+    return totals.get("budget", ZERO), totals.get("spent", ZERO)
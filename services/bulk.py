@@ -0,0 +1,198 @@
+# services/bulk.py
+"""Batch edits and deletes of a user's transactions.
+
+A selection is either explicit ids or a filter (date range, category, type,
+note substring). Each change runs as one set-based UPDATE or DELETE whose
+WHERE clause always includes the owner, so ids belonging to someone else
+are skipped rather than touched. The affected rows are read once (locked
+where the backend supports it) to keep the derived tables in step within
+the same database transaction: rollup deltas come from the old and new
+values, the ledger is repaired from the earliest changed day, and search
+postings are rewritten when a note or category changes.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_
+
+from extensions import db
+from models import Category, MonthlyRollup, Transaction
+from services.alerts import refresh_budgets
+from services.cache import aggregate_cache, TRANSACTION_AGGREGATES
+from services.ledger import repair_ledger
+from services.rollup import apply_to_rollup
+from services.search import index_transactions, unindex_transactions
+
+MAX_IDS = 5000
+CHUNK_SIZE = 1000
+FILTER_KEYS = ("start_date", "end_date", "category_id", "type", "note")
+TYPES = ("income", "expense")
+
+
+def _date(value, name):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a YYYY-MM-DD date") from None
+
+
+def _int(value, name):
+    if isinstance(value, bool):
+        raise ValueError(f"{name} must be an integer")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer") from None
+
+
+def selection_condition(user_id, selection):
+    """WHERE clause for the transactions of `user_id` picked by a `selection` dict.
+
+    It holds `ids` (at most MAX_IDS) or at least one of FILTER_KEYS; an
+    empty selection is refused rather than taken to mean everything.
+    """
+    filters = dict(selection)
+    ids = filters.pop('ids', None)
+    unknown = set(filters) - set(FILTER_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown filter: {', '.join(sorted(unknown))}")
+    filters = {key: value for key, value in filters.items() if value not in (None, '')}
+    if ids is None and not filters:
+        raise ValueError("Select transactions by ids or by at least one filter")
+
+    conditions = [Transaction.user_id == user_id]
+    if ids is not None:
+        if not isinstance(ids, (list, tuple)) or not ids:
+            raise ValueError("ids must be a non-empty list")
+        if len(ids) > MAX_IDS:
+            raise ValueError(f"At most {MAX_IDS} ids per request")
+        conditions.append(Transaction.id.in_(sorted({_int(t_id, "ids") for t_id in ids})))
+    if 'start_date' in filters:
+        conditions.append(Transaction.date >= _date(filters['start_date'], "start_date"))
+    if 'end_date' in filters:
+        end = _date(filters['end_date'], "end_date") + timedelta(days=1)
+        conditions.append(Transaction.date < end)
+    if 'category_id' in filters:
+        conditions.append(Transaction.category_id == _int(filters['category_id'], "category_id"))
+    if 'type' in filters:
+        if filters['type'] not in TYPES:
+            raise ValueError("type must be income or expense")
+        conditions.append(Transaction.type == filters['type'])
+    if 'note' in filters:
+        conditions.append(Transaction.note.icontains(str(filters['note']), autoescape=True))
+    return and_(*conditions)
+
+
+def _changes(user_id, changes):
+    """Validate a {category_id, type, note} dict of new values."""
+    unknown = set(changes) - {"category_id", "type", "note"}
+    if unknown:
+        raise ValueError(f"Cannot change: {', '.join(sorted(unknown))}")
+    if not changes:
+        raise ValueError("Nothing to change")
+    values = {}
+    if 'category_id' in changes:
+        category_id = _int(changes['category_id'], "category_id")
+        visible = (db.session.query(Category.id)
+                   .filter(Category.id == category_id,
+                           or_(Category.user_id == None, Category.user_id == user_id))
+                   .first())
+        if visible is None:
+            raise ValueError("Unknown category")
+        values['category_id'] = category_id
+    if 'type' in changes:
+        if changes['type'] not in TYPES:
+            raise ValueError("type must be income or expense")
+        values['type'] = changes['type']
+    if 'note' in changes:
+        note = changes['note']
+        if note is not None and not isinstance(note, str):
+            raise ValueError("note must be a string")
+        values['note'] = (note or '').strip() or None
+    return values
+
+
+def _affected(condition):
+    """The selected rows' rollup and ledger keys, locked until the caller commits."""
+    return (
+        db.session.query(Transaction.id, Transaction.user_id, Transaction.date,
+                         Transaction.category_id, Transaction.type, Transaction.currency,
+                         Transaction.amount)
+        .filter(condition)
+        .with_for_update()
+        .all()
+    )
+
+
+def _chunks(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), CHUNK_SIZE):
+        yield ids[start:start + CHUNK_SIZE]
+
+
+def _repair_ledgers(user_id, rows):
+    """Re-derive each touched currency's ledger from its earliest changed day."""
+    since = {}
+    for row in rows:
+        day = row.date.date()
+        since[row.currency] = min(day, since.get(row.currency, day))
+    for currency, day in since.items():
+        repair_ledger(user_id, day, currency)
+
+
+def _prune_rollup(user_id):
+    # Months and categories emptied by the change would otherwise linger as zero rows
+    MonthlyRollup.query.filter(MonthlyRollup.user_id == user_id,
+                               MonthlyRollup.count == 0).delete(synchronize_session=False)
+
+
+def bulk_update(user_id, selection, changes):
+    """Set category, type and/or note on the selected transactions. Commits.
+
+    `selection` holds `ids` or filter keys (see selection_condition).
+    Returns the number of transactions updated.
+    """
+    condition = selection_condition(user_id, selection)
+    values = _changes(user_id, changes)
+    rows = _affected(condition)
+    if not rows:
+        return 0
+
+    updated = (Transaction.query.filter(condition)
+               .update(values, synchronize_session=False))
+
+    if 'category_id' in values or 'type' in values:
+        apply_to_rollup(rows, sign=-1)
+        apply_to_rollup([dict(row._mapping, **values) for row in rows])
+        _prune_rollup(user_id)
+    if 'type' in values:
+        _repair_ledgers(user_id, rows)
+    if 'category_id' in values or 'type' in values:
+        refresh_budgets(user_id)
+    if 'note' in values or 'category_id' in values:
+        for ids in _chunks(row.id for row in rows):
+            unindex_transactions(ids)
+            index_transactions(ids)
+    db.session.commit()
+    aggregate_cache.invalidate(user_id, TRANSACTION_AGGREGATES)
+    return updated
+
+
+def bulk_delete(user_id, selection):
+    """Delete the selected transactions. Commits. Returns the number deleted."""
+    condition = selection_condition(user_id, selection)
+    rows = _affected(condition)
+    if not rows:
+        return 0
+
+    # Postings reference the transactions, so they go first
+    for ids in _chunks(row.id for row in rows):
+        unindex_transactions(ids)
+    deleted = Transaction.query.filter(condition).delete(synchronize_session=False)
+
+    apply_to_rollup(rows, sign=-1)
+    _prune_rollup(user_id)
+    _repair_ledgers(user_id, rows)
+    refresh_budgets(user_id)
+    db.session.commit()
+    aggregate_cache.invalidate(user_id, TRANSACTION_AGGREGATES)
+    return deleted
@@ -0,0 +1,187 @@
+# services/cache.py
+import pickle
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+from functools import wraps
+
+# Aggregates derived from a user's transactions
+TRANSACTION_AGGREGATES = ('totals_by_type', 'monthly_series', 'expenses_by_category',
+                          'transaction_totals', 'budget_spent', 'spending_analytics',
+                          'search_vocabulary')
+CATEGORY_AGGREGATES = ('category_choices', 'expenses_by_category')
+BUDGET_AGGREGATES = ('budget_spent',)
+
+_MISSING = object()
+
+
+class LocalBackend:
+    """In-process LRU cache with a per-entry TTL.
+
+    Generation counters are kept apart from the cached values and are never
+    evicted: one that restarted from 0 would bring back entries it had
+    orphaned.
+    """
+
+    def __init__(self, maxsize=10000, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISSING
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+
+
+class SharedBackend:
+    """Cache shared between processes through a Redis-style client.
+
+    The client needs get(key), setex(key, seconds, value) and incr(key);
+    redis.Redis fits, and DictClient stands in for it in tests.
+    """
+
+    def __init__(self, client, ttl=300, prefix='moneymuse:agg:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return _MISSING if raw is None else pickle.loads(raw)
+
+    def set(self, key, value):
+        self.client.setex(self.prefix + key, self.ttl, pickle.dumps(value))
+
+    def counter(self, key):
+        return int(self.client.get(self.prefix + key) or 0)
+
+    def incr(self, key):
+        self.client.incr(self.prefix + key)
+
+
+class DictClient:
+    """In-memory stand-in for a Redis client (get/setex/incr only)."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or (entry[0] is not None and entry[0] < time.monotonic()):
+                return None
+            return entry[1]
+
+    def setex(self, key, seconds, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + seconds, value)
+
+    def incr(self, key):
+        with self._lock:
+            _, value = self._data.get(key, (None, b'0'))
+            value = str(int(value) + 1).encode()
+            self._data[key] = (None, value)
+            return int(value)
+
+
+class AggregateCache:
+    """Per-user aggregate cache keyed by (user_id, aggregate name, arguments).
+
+    Each (user_id, name) pair has a generation counter that is part of every
+    key; invalidating bumps the counter, which orphans all cached argument
+    variants of that aggregate at once. Orphans age out via LRU/TTL.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or LocalBackend()
+        self.enabled = True
+        self.hits = Counter()
+        self.misses = Counter()
+
+    def init_app(self, app):
+        kind = app.config.get('AGGREGATE_CACHE_BACKEND', 'local')
+        ttl = app.config.get('AGGREGATE_CACHE_TTL', 300)
+        self.enabled = kind != 'none'
+        if kind == 'shared':
+            client = app.config.get('AGGREGATE_CACHE_CLIENT')
+            if client is None:
+                import redis  # optional dependency, only needed for the shared backend
+                client = redis.Redis.from_url(app.config['AGGREGATE_CACHE_URL'])
+            self.backend = SharedBackend(client, ttl=ttl)
+        else:
+            self.backend = LocalBackend(app.config.get('AGGREGATE_CACHE_SIZE', 10000), ttl)
+        app.extensions['aggregate_cache'] = self
+
+    def get_or_compute(self, user_id, name, args, compute):
+        if not self.enabled:
+            return compute()
+        generation = self.backend.counter(f"gen:{user_id}:{name}")
+        key = f"{user_id}:{name}:{generation}:{args!r}"
+        value = self.backend.get(key)
+        if value is not _MISSING:
+            self.hits[name] += 1
+            return value
+        self.misses[name] += 1
+        value = compute()
+        self.backend.set(key, value)
+        return value
+
+    def invalidate(self, user_id, names):
+        for name in set(names):
+            self.backend.incr(f"gen:{user_id}:{name}")
+
+    def memoize(self, name, daily=False):
+        """Cache a function whose first argument is a user id.
+
+        With `daily=True` the current (Nepal) date is part of the key, for
+        aggregates whose result depends on today.
+        """
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(user_id, *args, **kwargs):
+                key_args = (args, sorted(kwargs.items()))
+                if daily:
+                    key_args += ((datetime.utcnow() + timedelta(hours=5, minutes=45)).date(),)
+                return self.get_or_compute(user_id, name, key_args,
+                                           lambda: fn(user_id, *args, **kwargs))
+            wrapper.uncached = fn
+            return wrapper
+        return decorator
+
+    def stats(self):
+        names = sorted(set(self.hits) | set(self.misses))
+        return {name: {"hits": self.hits[name], "misses": self.misses[name]} for name in names}
+
+
+aggregate_cache = AggregateCache()
@@ -0,0 +1,124 @@
+# services/export.py
+import csv
+import io
+import zlib
+
+from sqlalchemy import and_, or_, select, union_all
+
+from extensions import db
+from models import ArchivedTransaction, Category, Transaction
+from services.transactions import filter_transactions
+
+CSV_HEADER = ["ID", "Date", "Type", "Amount", "Currency", "Category", "Note"]
+
+
+def export_queries(user_id, filter_by='all', start_date=None, end_date=None, t_type=None):
+    """The hot and archived transactions of one export, with the page's filters applied.
+
+    Raises ValueError when a custom range has a malformed date.
+    """
+    queries = []
+    for model in (Transaction, ArchivedTransaction):
+        query = filter_transactions(model.query.filter_by(user_id=user_id),
+                                    filter_by, start_date, end_date, model=model)
+        if t_type in ('income', 'expense'):
+            query = query.filter(model.type == t_type)
+        queries.append(query)
+    return queries
+
+
+def _narrow(query, model):
+    return (
+        query
+        .outerjoin(Category, Category.id == model.category_id)
+        .with_entities(model.id, model.date, model.type, model.amount, model.currency,
+                       Category.name.label("category"), model.note)
+    )
+
+
+def export_rows(query, archived=None, batch_size=1000):
+    """Narrow the export query to plain columns, category name joined in.
+
+    `archived`, the same filters on ArchivedTransaction, adds the archived
+    rows: both sides are merged by one UNION ALL in the same newest-first
+    order. Rows are streamed from a server-side cursor `batch_size` at a
+    time, so neither ORM objects nor a lazy category load per row are
+    involved.
+    """
+    if archived is None:
+        return (
+            _narrow(query, Transaction)
+            .order_by(Transaction.date.desc(), Transaction.id.desc())
+            .yield_per(batch_size)
+        )
+    rows = union_all(_narrow(query, Transaction).statement,
+                     _narrow(archived, ArchivedTransaction).statement).subquery()
+    return db.session.execute(
+        select(rows).order_by(rows.c.date.desc(), rows.c.id.desc()),
+        execution_options={"yield_per": batch_size},
+    )
+
+
+def export_batches(query, archived=None, batch_size=5000):
+    """The rows of export_rows, as lists of up to `batch_size` rows in the same order.
+
+    Each batch is its own keyset query on (date, id) instead of a page of one
+    open cursor, so the caller may commit between batches (a background job
+    reporting progress does).
+    """
+    sides = [(query, Transaction)]
+    if archived is not None:
+        sides.append((archived, ArchivedTransaction))
+    after = None
+    while True:
+        parts = []
+        for side, model in sides:
+            if after:
+                side = side.filter(or_(model.date < after[0],
+                                       and_(model.date == after[0], model.id < after[1])))
+            parts.append(_narrow(side, model).order_by(model.date.desc(), model.id.desc())
+                         .limit(batch_size).subquery())
+        # Each side's next batch_size rows hold the merged next batch_size rows
+        rows = parts[0] if len(parts) == 1 else union_all(*map(select, parts)).subquery()
+        batch = db.session.execute(
+            select(rows).order_by(rows.c.date.desc(), rows.c.id.desc()).limit(batch_size)).all()
+        if not batch:
+            return
+        yield batch
+        if len(batch) < batch_size:
+            return
+        after = batch[-1].date, batch[-1].id
+
+
+def iter_csv(rows, chunk_rows=500):
+    """Yield the CSV as text chunks of roughly `chunk_rows` rows each."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+
+    for i, (t_id, date, t_type, amount, currency, category, note) in enumerate(rows, 1):
+        writer.writerow([
+            t_id,
+            date.strftime("%Y-%m-%d %H:%M"),
+            t_type.capitalize(),
+            amount,
+            currency,
+            category or "N/A",
+            note or "",
+        ])
+        if i % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def gzip_chunks(chunks):
+    """Gzip a stream of text chunks on the fly."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
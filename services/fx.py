@@ -0,0 +1,203 @@
+# services/fx.py
+"""Exchange rates and conversion into a user's base currency.
+
+`fx_rate` holds the NPR value of one unit of each currency per day, loaded in
+bulk by `flask load-fx-rates`. RateCache keeps the whole table in memory as a
+sorted (days, rates) array pair per currency, so converting any number of
+amounts costs one `searchsorted` per distinct currency plus array arithmetic,
+never a query per row.
+
+A rate applies from its date until the next one; days before a currency's
+first rate use that first rate, and NPR is always 1. Every currency is kept
+in hundredths, like the rupee (see money.py).
+"""
+import csv
+import threading
+import time
+from calendar import monthrange
+from collections import defaultdict
+from datetime import date
+
+import numpy as np
+
+from extensions import db
+from models import ArchivedTransaction, Budget, FxRate, Investment, Transaction, User
+from money import DEFAULT_CURRENCY, ZERO, from_minor, to_currency, to_minor
+from services.cache import aggregate_cache, BUDGET_AGGREGATES, TRANSACTION_AGGREGATES
+from services.identity import identity_cache
+
+
+class RateCache:
+    """In-process copy of the fx_rate table, reloaded every FX_CACHE_TTL seconds."""
+
+    def __init__(self, ttl=3600):
+        self.ttl = ttl
+        self._tables = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get('FX_CACHE_TTL', 3600)
+        self.invalidate()
+        app.extensions['fx_rates'] = self
+
+    def invalidate(self):
+        self._tables = None
+
+    def tables(self):
+        """{currency: (datetime64[D] days, float64 rates)}, both sorted by day."""
+        tables = self._tables
+        if tables is None or time.monotonic() - self._loaded_at > self.ttl:
+            with self._lock:
+                days, rates = defaultdict(list), defaultdict(list)
+                rows = (db.session.query(FxRate.currency, FxRate.date, FxRate.rate)
+                        .order_by(FxRate.currency, FxRate.date))
+                for currency, day, rate in rows:
+                    days[currency].append(day)
+                    rates[currency].append(rate)
+                tables = {currency: (np.array(days[currency], dtype='datetime64[D]'),
+                                     np.array(rates[currency], dtype=np.float64))
+                          for currency in days}
+                self._tables, self._loaded_at = tables, time.monotonic()
+        return tables
+
+    def currencies(self):
+        """Every currency amounts can be entered in: the default one and those with rates."""
+        return sorted({DEFAULT_CURRENCY, *self.tables()})
+
+    def rates(self, currencies, days):
+        """NPR per unit of each currency on each day. Raises LookupError for a currency with no rates."""
+        currencies = np.asarray(currencies, dtype=object)
+        days = np.asarray(days, dtype='datetime64[D]')
+        result = np.ones(len(currencies), dtype=np.float64)
+        for code in set(currencies.tolist()) - {DEFAULT_CURRENCY}:
+            table = self.tables().get(code)
+            if table is None:
+                raise LookupError(f"No exchange rate for {code}")
+            rate_days, rates = table
+            rows = currencies == code
+            index = np.searchsorted(rate_days, days[rows], side='right') - 1
+            result[rows] = rates[np.maximum(index, 0)]
+        return result
+
+    def convert(self, amounts, currencies, days, to):
+        """Convert integer hundredths, row by row, into `to` (a code or one code per row).
+
+        Returns int64 hundredths of the target currency, rounded half to even.
+        """
+        amounts = np.asarray(amounts, dtype=np.int64)
+        currencies = np.asarray(currencies, dtype=object)
+        targets = (np.full(len(amounts), to, dtype=object) if isinstance(to, str)
+                   else np.asarray(to, dtype=object))
+        if (currencies == targets).all():
+            return amounts
+        factor = self.rates(currencies, days) / self.rates(targets, days)
+        return np.rint(amounts * factor).astype(np.int64)
+
+
+fx_rates = RateCache()
+
+
+def month_end(year, month):
+    """Day whose rate converts a whole month's totals."""
+    return date(year, month, monthrange(year, month)[1])
+
+
+def convert_sums(rows, to):
+    """Sum (key, currency, day, amount) rows per key, converted into `to`.
+
+    `to` is a currency code, or a {key: code} dict when keys are shown in
+    different currencies. Amounts already in the target currency are added
+    as they are; the rest are converted together in one vectorized pass.
+    Returns {key: Decimal}.
+    """
+    totals = defaultdict(lambda: ZERO)
+    foreign = []
+    for key, currency, day, amount in rows:
+        if amount is None:
+            continue
+        target = to if isinstance(to, str) else to[key]
+        if currency == target:
+            totals[key] += amount
+        else:
+            foreign.append((key, currency, day, to_minor(amount), target))
+    if foreign:
+        keys, currencies, days, amounts, targets = zip(*foreign)
+        converted = fx_rates.convert(amounts, currencies, days, targets)
+        for key, minor in zip(keys, converted.tolist()):
+            totals[key] += from_minor(minor)
+    return dict(totals)
+
+
+def known_currency(code):
+    """Normalize a currency code that amounts can be entered in. Raises ValueError otherwise."""
+    code = to_currency(code)
+    if code not in fx_rates.currencies():
+        raise ValueError(f"No exchange rates for {code}")
+    return code
+
+
+def base_currency(user_id):
+    """The currency a user's totals, balances and charts are shown in."""
+    identity = identity_cache.get(user_id)
+    return identity.base_currency if identity else DEFAULT_CURRENCY
+
+
+def multi_currency_users():
+    """Ids of users whose figures depend on exchange rates."""
+    foreign = lambda model: db.session.query(model.user_id).filter(
+        model.currency != DEFAULT_CURRENCY)
+    rows = (db.session.query(User.id).filter(User.base_currency != DEFAULT_CURRENCY)
+            .union(foreign(Transaction), foreign(ArchivedTransaction), foreign(Budget),
+                   foreign(Investment)))
+    return [user_id for (user_id,) in rows]
+
+
+def load_rates(stream):
+    """Upsert rates from a CSV with `currency,date,rate` columns (ISO dates, NPR per unit).
+
+    Existing (currency, date) rows are updated and new ones inserted, each as
+    one bulk statement; rows for NPR itself are ignored. Refreshes the rate
+    cache and the cached aggregates of every user holding foreign amounts.
+    Returns the number of rates written.
+    """
+    rates = {}
+    for line, row in enumerate(csv.DictReader(stream), 2):
+        try:
+            currency = to_currency(row['currency'])
+            day = date.fromisoformat(row['date'].strip())
+            rate = float(row['rate'])
+        except (KeyError, AttributeError, ValueError) as exc:
+            raise ValueError(f"line {line}: {exc}") from None
+        if rate <= 0:
+            raise ValueError(f"line {line}: rate must be positive")
+        if currency != DEFAULT_CURRENCY:
+            # A later row for the same currency and day replaces an earlier one
+            rates[(currency, day)] = rate
+    if not rates:
+        return 0
+
+    days = [day for _, day in rates]
+    existing = {
+        (currency, day): rate_id
+        for rate_id, currency, day in db.session.query(FxRate.id, FxRate.currency, FxRate.date)
+        .filter(FxRate.currency.in_({currency for currency, _ in rates}),
+                FxRate.date.between(min(days), max(days)))
+    }
+    updates, inserts = [], []
+    for (currency, day), rate in rates.items():
+        if (currency, day) in existing:
+            updates.append({"id": existing[(currency, day)], "rate": rate})
+        else:
+            inserts.append({"currency": currency, "date": day, "rate": rate})
+
+    if updates:
+        db.session.bulk_update_mappings(FxRate, updates)
+    if inserts:
+        db.session.bulk_insert_mappings(FxRate, inserts)
+    db.session.commit()
+
+    fx_rates.invalidate()
+    for user_id in multi_currency_users():
+        aggregate_cache.invalidate(user_id, TRANSACTION_AGGREGATES + BUDGET_AGGREGATES)
+    return len(rates)
@@ -0,0 +1,73 @@
+# services/identity.py
+"""Who is logged in, without a `user` query on every request.
+
+Flask-Login's user loader reads (id, username, role, base_currency) from a
+per-process LRU cache whose entries live IDENTITY_CACHE_TTL seconds. Role,
+currency and account changes drop the entry in the worker that made them;
+other workers see the change once their copy expires, like the local
+aggregate cache.
+"""
+from flask_login import UserMixin
+
+from extensions import db, login_manager
+from models import User
+from money import DEFAULT_CURRENCY
+from services.cache import _MISSING, LocalBackend
+
+
+class Identity(UserMixin):
+    """The logged-in user as views and decorators see it: plain values, no ORM row."""
+
+    def __init__(self, id, username, role, base_currency):
+        self.id = id
+        self.username = username
+        self.role = role
+        self.base_currency = base_currency or DEFAULT_CURRENCY
+
+    @property
+    def is_admin(self):
+        return self.role == "admin"
+
+    def __repr__(self):
+        return f"<Identity {self.id} {self.username} {self.role}>"
+
+
+class IdentityCache:
+    """user id -> Identity, loaded with one narrow query on a miss."""
+
+    def __init__(self, maxsize=10000, ttl=60):
+        self.backend = LocalBackend(maxsize, ttl)
+
+    def init_app(self, app):
+        self.backend = LocalBackend(app.config.get('IDENTITY_CACHE_SIZE', 10000),
+                                    app.config.get('IDENTITY_CACHE_TTL', 60))
+        app.extensions['identity_cache'] = self
+
+    def get(self, user_id):
+        """The user's Identity, or None if there is no such user (which is not cached)."""
+        identity = self.backend.get(user_id)
+        if identity is _MISSING:
+            row = (db.session.query(User.id, User.username, User.role, User.base_currency)
+                   .filter(User.id == user_id).first())
+            if row is None:
+                return None
+            identity = Identity(*row)
+            self.backend.set(user_id, identity)
+        return identity
+
+    def remember(self, user):
+        """Cache a User row just read (e.g. at login) and return its Identity."""
+        identity = Identity(user.id, user.username, user.role, user.base_currency)
+        self.backend.set(user.id, identity)
+        return identity
+
+    def invalidate(self, user_id):
+        self.backend.delete(user_id)
+
+
+identity_cache = IdentityCache()
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    return identity_cache.get(int(user_id))
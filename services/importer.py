@@ -0,0 +1,296 @@
+# services/importer.py
+import csv
+import hashlib
+import re
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from extensions import db
+from models import Category, Transaction
+from money import to_currency, to_money
+from services.alerts import record_expenses
+from services.archive import with_archive
+from services.cache import aggregate_cache, TRANSACTION_AGGREGATES
+from services.fx import base_currency, fx_rates
+from services.ledger import apply_to_ledger
+from services.rollup import apply_to_rollup
+from services.search import index_inserted, last_transaction_id
+
+CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+DEFAULT_CATEGORY = "Other"
+
+DATE_FORMATS = ("%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d",
+                "%d/%m/%Y", "%m/%d/%Y", "%Y%m%d%H%M%S", "%Y%m%d")
+# QIF files come from US software: month first
+QIF_DATE_FORMATS = ("%m/%d/%Y", "%m/%d/%y", "%d/%m/%Y", "%Y-%m-%d")
+
+
+class ImportReport:
+    """Running totals for one import, handed to the progress callback."""
+
+    def __init__(self):
+        self.rows_read = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.categories_created = 0
+        self.errors = []  # [(line, message)], capped at MAX_REPORTED_ERRORS
+        self.error_count = 0
+
+    def error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+    def summary(self):
+        return (f"{self.inserted} imported, {self.duplicates} duplicate(s) skipped, "
+                f"{self.error_count} error(s), {self.categories_created} new categor(y/ies)")
+
+
+def parse_date(value, formats=DATE_FORMATS):
+    value = value.strip().replace("'", "/")
+    if value[4:5] == "-":
+        # ISO dates (our own export) parse far faster than strptime
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    # OFX dates may carry fractional seconds and a [tz] suffix
+    value = re.sub(r"(\.\d+)?(\[.*\])?$", "", value) if value[:8].isdigit() else value
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"unrecognised date {value!r}")
+
+
+def _record(line, date, amount, t_type=None, category=None, note=None, currency=None,
+            date_formats=DATE_FORMATS):
+    """Normalise one parsed row. The amount's sign decides the type if none is given.
+
+    Rows without a currency are left at None and take the user's base currency.
+    """
+    amount = to_money(amount)
+    t_type = (t_type or "").strip().lower() or ("expense" if amount < 0 else "income")
+    if t_type not in ("income", "expense"):
+        raise ValueError(f"unknown type {t_type!r}")
+    return {
+        "line": line,
+        "date": parse_date(date, date_formats),
+        "amount": abs(amount),
+        "currency": to_currency(currency) if currency and currency.strip() else None,
+        "type": t_type,
+        "category": (category or "").strip() or None,
+        "note": (note or "").strip() or None,
+    }
+
+
+def read_csv(stream, report):
+    """CSV with a header row; accepts the columns written by the CSV export."""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        row = {(k or "").strip().lower(): v for k, v in row.items()}
+        try:
+            yield _record(reader.line_num, row.get("date", ""), row.get("amount", ""),
+                          row.get("type"), row.get("category"), row.get("note"),
+                          row.get("currency"))
+        except (ValueError, AttributeError) as exc:
+            report.error(reader.line_num, str(exc))
+
+
+def read_ofx(stream, report):
+    """OFX 1.x (SGML) or 2.x (XML) bank statements: one row per <STMTTRN>."""
+    fields, start = None, 0
+    for line_no, line in enumerate(stream, 1):
+        for tag, value in re.findall(r"<(/?\w+)>([^<\r\n]*)", line):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                fields, start = {}, line_no
+            elif tag == "/STMTTRN" and fields is not None:
+                try:
+                    yield _record(start, fields.get("DTPOSTED", ""), fields.get("TRNAMT", ""),
+                                  note=fields.get("MEMO") or fields.get("NAME"))
+                except ValueError as exc:
+                    report.error(start, str(exc))
+                fields = None
+            elif fields is not None and not tag.startswith("/"):
+                fields[tag] = value.strip()
+
+
+def read_qif(stream, report):
+    """QIF bank registers: D(ate), T(amount), P(ayee), M(emo), L(category), ^ ends a record."""
+    fields, start = {}, 1
+    for line_no, line in enumerate(stream, 1):
+        line = line.rstrip("\r\n")
+        if not line or line.startswith("!"):
+            continue
+        if line.startswith("^"):
+            if fields:
+                try:
+                    yield _record(start, fields.get("D", ""), fields.get("T", fields.get("U", "")),
+                                  category=fields.get("L"),
+                                  note=fields.get("M") or fields.get("P"),
+                                  date_formats=QIF_DATE_FORMATS)
+                except ValueError as exc:
+                    report.error(start, str(exc))
+            fields, start = {}, line_no + 1
+        else:
+            fields[line[0]] = line[1:]
+
+
+READERS = {"csv": read_csv, "ofx": read_ofx, "qfx": read_ofx, "qif": read_qif}
+
+
+def _hash(date, amount, currency, note):
+    key = f"{date:%Y-%m-%d}|{to_money(amount)}|{currency}|{note or ''}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+class _Deduper:
+    """Multiset of existing (day, amount, currency, note) hashes, loaded a date range at a time.
+
+    Each existing row cancels out one identical imported row, so re-importing
+    the same file is a no-op but two genuine same-day, same-amount rows in a
+    new file are both kept.
+    """
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.existing = Counter()
+        self.loaded_days = set()
+
+    def load(self, records):
+        days = {r["date"].date() for r in records} - self.loaded_days
+        if not days:
+            return
+        start = datetime.combine(min(days), datetime.min.time())
+        end = datetime.combine(max(days), datetime.min.time()) + timedelta(days=1)
+        # Statements reaching back into archived years are checked against those too
+        rows = with_archive(lambda model: (
+            select(model.date, model.amount, model.currency, model.note)
+            .where(model.user_id == self.user_id, model.date >= start, model.date < end)
+        ))
+        for date, amount, currency, note in db.session.execute(select(rows)):
+            if date.date() not in self.loaded_days:
+                self.existing[_hash(date, amount, currency, note)] += 1
+
+        day = start.date()
+        while day < end.date():
+            self.loaded_days.add(day)
+            day += timedelta(days=1)
+
+    def is_duplicate(self, record):
+        h = _hash(record["date"], record["amount"], record["currency"], record["note"])
+        if self.existing[h] > 0:
+            self.existing[h] -= 1
+            return True
+        return False
+
+
+class _CategoryResolver:
+    """Case-insensitive category name -> id, creating the user's missing ones."""
+
+    def __init__(self, user_id, report):
+        self.user_id = user_id
+        self.report = report
+        self.ids = {}
+        categories = Category.query.filter(
+            (Category.user_id == None) | (Category.user_id == user_id)
+        ).order_by(Category.user_id.is_(None))  # user's own categories win over globals
+        for c in categories:
+            self.ids.setdefault(c.name.lower(), c.id)
+
+    def resolve(self, name, t_type):
+        name = name or DEFAULT_CATEGORY
+        category_id = self.ids.get(name.lower())
+        if category_id is None:
+            category = Category(name=name, type=t_type, user_id=self.user_id)
+            db.session.add(category)
+            db.session.flush()
+            category_id = self.ids[name.lower()] = category.id
+            self.report.categories_created += 1
+        return category_id
+
+
+def _flush(chunk, user_id, deduper, categories, report):
+    """Insert one chunk and commit it together with everything derived from it.
+
+    The ledger is brought up to date in the same transaction: a retry skips
+    the rows of an import that failed partway as duplicates, so nothing after
+    this commit would fold them into the running balance.
+    """
+    deduper.load(chunk)
+    mappings = []
+    for r in chunk:
+        if deduper.is_duplicate(r):
+            report.duplicates += 1
+            continue
+        mappings.append({
+            "amount": r["amount"],
+            "currency": r["currency"],
+            "type": r["type"],
+            "note": r["note"],
+            "date": r["date"],
+            "user_id": user_id,
+            "category_id": categories.resolve(r["category"], r["type"]),
+            "is_recurring": False,
+        })
+    if mappings:
+        # Core executemany: no ORM unit-of-work bookkeeping per row
+        after_id = last_transaction_id()
+        db.session.execute(Transaction.__table__.insert(), mappings)
+        index_inserted(after_id, [user_id])
+        apply_to_rollup(mappings)
+        # Back-dated rows repair the ledger from this chunk's earliest day
+        apply_to_ledger(mappings)
+        record_expenses(mappings)
+    db.session.commit()
+    report.inserted += len(mappings)
+    if mappings:
+        aggregate_cache.invalidate(user_id, TRANSACTION_AGGREGATES)
+
+
+def import_transactions(stream, user_id, fmt="csv", progress=None, chunk_size=CHUNK_SIZE):
+    """Stream-parse a statement file and bulk insert its transactions for `user_id`.
+
+    `stream` is a text stream; `fmt` is one of csv, ofx, qfx or qif. Rows are
+    inserted and committed `chunk_size` at a time, and `progress(report)` is
+    called after each chunk. Rows in a currency without exchange rates are
+    reported as errors. Returns the ImportReport.
+    """
+    reader = READERS.get(fmt.lower())
+    if reader is None:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+    report = ImportReport()
+    deduper = _Deduper(user_id)
+    categories = _CategoryResolver(user_id, report)
+    default_currency = base_currency(user_id)
+    known_currencies = set(fx_rates.currencies())
+
+    chunk = []
+    for record in reader(stream, report):
+        report.rows_read += 1
+        record["currency"] = record["currency"] or default_currency
+        if record["currency"] not in known_currencies:
+            report.error(record["line"], f"no exchange rates for {record['currency']}")
+            continue
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            _flush(chunk, user_id, deduper, categories, report)
+            chunk = []
+            if progress:
+                progress(report)
+
+    _flush(chunk, user_id, deduper, categories, report)
+    if progress:
+        progress(report)
+    return report
+
+
+def open_statement(path):
+    """Open a saved statement file as a text stream, tolerating a UTF-8 BOM."""
+    return open(path, encoding="utf-8-sig", errors="replace", newline="")
@@ -0,0 +1,171 @@
+# services/investments.py
+"""Portfolio valuation.
+
+One query loads the holdings together with the latest local price of each
+ticker; values are then computed over NumPy arrays:
+
+- fixed deposits accrue compound interest from `interest_rate` between the
+  purchase date and today (or the maturity date, once reached);
+- funds and shares are worth units x latest price from the price table, and
+  fall back to the manually entered `current_value` when no price is known.
+
+Holdings are valued in their own currency; totals and snapshots are
+converted into the owner's base currency at the valuation day's rates.
+"""
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import and_, func
+
+from extensions import db
+from models import Investment, PortfolioSnapshot, Price, User
+from money import MINOR_UNITS
+from services.fx import base_currency, fx_rates
+
+INVESTMENT_TYPES = ('fixed_deposit', 'mutual_fund', 'share')
+# Nepali banks credit fixed deposit interest quarterly
+FD_COMPOUNDING_PER_YEAR = 4
+
+Holding = namedtuple('Holding', 'investment value matured price price_date')
+
+
+def _today():
+    return (datetime.utcnow() + timedelta(hours=5, minutes=45)).date()
+
+
+def _portfolio_query(as_of, user_id=None):
+    """Investments joined to the latest price on or before `as_of` for their ticker."""
+    latest = db.session.query(Price.ticker, func.max(Price.date).label('date')).filter(
+        Price.date <= as_of)
+    if user_id is not None:
+        latest = latest.filter(Price.ticker.in_(
+            db.session.query(Investment.ticker_or_isin).filter(Investment.user_id == user_id)))
+    latest = latest.group_by(Price.ticker).subquery()
+
+    query = (
+        db.session.query(Investment, Price.close, Price.date)
+        .outerjoin(latest, latest.c.ticker == Investment.ticker_or_isin)
+        .outerjoin(Price, and_(Price.ticker == latest.c.ticker, Price.date == latest.c.date))
+    )
+    if user_id is not None:
+        query = query.filter(Investment.user_id == user_id)
+    return query.order_by(Investment.id)
+
+
+def value_holdings(rows, as_of):
+    """Value (Investment, close, price_date) rows on `as_of`.
+
+    Returns (values, matured) arrays aligned with `rows`.
+    """
+    investments = [row[0] for row in rows]
+    kind = np.array([i.investment_type for i in investments])
+    principal = np.array([i.amount or 0 for i in investments], dtype=np.float64)
+    rate = np.array([i.interest_rate or 0 for i in investments], dtype=np.float64)
+    start = np.array([i.purchase_date or (i.created_at.date() if i.created_at else as_of)
+                      for i in investments], dtype='datetime64[D]')
+    maturity = np.array([i.maturity_date for i in investments], dtype='datetime64[D]')
+    units = np.array([i.units if i.units is not None else np.nan for i in investments],
+                     dtype=np.float64)
+    manual = np.array([i.current_value if i.current_value is not None else (i.amount or 0)
+                       for i in investments], dtype=np.float64)
+    close = np.array([row[1] if row[1] is not None else np.nan for row in rows], dtype=np.float64)
+
+    today = np.datetime64(as_of, 'D')
+    matured = ~np.isnat(maturity) & (maturity <= today)
+    accrue_until = np.where(matured, maturity, today)
+    years = np.clip((accrue_until - start).astype(np.float64) / 365.0, 0, None)
+    periods = FD_COMPOUNDING_PER_YEAR * years
+    fd_value = principal * (1 + rate / 100 / FD_COMPOUNDING_PER_YEAR) ** periods
+
+    priced = ~np.isnan(close) & ~np.isnan(units)
+    market_value = np.where(priced, units * np.nan_to_num(close), manual)
+
+    values = np.round(np.where(kind == 'fixed_deposit', fd_value, market_value), 2)
+    return values, matured & (kind == 'fixed_deposit')
+
+
+def _to_base(rows, values, as_of, to):
+    """Holding values converted from their investments' currencies into `to` (a code or one per row)."""
+    currencies = [row[0].currency for row in rows]
+    days = np.full(len(rows), np.datetime64(as_of, 'D'))
+    minor = np.rint(values * MINOR_UNITS).astype(np.int64)
+    return fx_rates.convert(minor, currencies, days, to) / MINOR_UNITS
+
+
+def portfolio_valuation(user_id, as_of=None):
+    """A user's valued holdings grouped by type, and the total of each type.
+
+    Returns ({type: [Holding]}, {type: total}); holding values are in the
+    investment's currency and totals in the user's base currency.
+    """
+    as_of = as_of or _today()
+    rows = _portfolio_query(as_of, user_id).all()
+    holdings = {kind: [] for kind in INVESTMENT_TYPES}
+    totals = dict.fromkeys(INVESTMENT_TYPES, 0.0)
+    if not rows:
+        return holdings, totals
+
+    values, matured = value_holdings(rows, as_of)
+    converted = _to_base(rows, values, as_of, base_currency(user_id))
+    for (investment, close, price_date), value, base_value, is_matured in zip(
+            rows, values.tolist(), converted.tolist(), matured.tolist()):
+        kind = investment.investment_type
+        holdings.setdefault(kind, []).append(
+            Holding(investment, value, is_matured, close, price_date))
+        totals[kind] = totals.get(kind, 0.0) + base_value
+    return holdings, {kind: round(total, 2) for kind, total in totals.items()}
+
+
+def record_snapshots(as_of=None):
+    """Value every user's portfolio and store one PortfolioSnapshot per user for the day.
+
+    Snapshots are in each user's base currency at the time. Re-running for the
+    same day overwrites that day's snapshots. Returns the number of users
+    snapshotted.
+    """
+    as_of = as_of or _today()
+    rows = _portfolio_query(as_of).all()
+    if not rows:
+        return 0
+
+    values, _ = value_holdings(rows, as_of)
+    user_ids, owner = np.unique(np.array([row[0].user_id for row in rows]), return_inverse=True)
+    bases = dict(db.session.query(User.id, User.base_currency)
+                 .filter(User.id.in_(user_ids.tolist())))
+    values = _to_base(rows, values, as_of, [bases[row[0].user_id] for row in rows])
+    kinds = np.array([row[0].investment_type for row in rows])
+    by_type = {kind: np.bincount(owner, weights=np.where(kinds == kind, values, 0),
+                                 minlength=len(user_ids))
+               for kind in INVESTMENT_TYPES}
+
+    existing = dict(db.session.query(PortfolioSnapshot.user_id, PortfolioSnapshot.id)
+                    .filter(PortfolioSnapshot.date == as_of))
+    updates, inserts = [], []
+    for index, user_id in enumerate(user_ids.tolist()):
+        snapshot = {kind: round(float(by_type[kind][index]), 2) for kind in INVESTMENT_TYPES}
+        snapshot["total"] = round(sum(snapshot.values()), 2)
+        if user_id in existing:
+            updates.append({"id": existing[user_id], **snapshot})
+        else:
+            inserts.append({"user_id": user_id, "date": as_of, **snapshot})
+
+    if updates:
+        db.session.bulk_update_mappings(PortfolioSnapshot, updates)
+    if inserts:
+        db.session.bulk_insert_mappings(PortfolioSnapshot, inserts)
+    db.session.commit()
+    return len(user_ids)
+
+
+def snapshot_history(user_id, days=365, as_of=None):
+    """Recorded daily portfolio values for the last `days` days, oldest first."""
+    as_of = as_of or _today()
+    return (
+        PortfolioSnapshot.query
+        .filter(PortfolioSnapshot.user_id == user_id,
+                PortfolioSnapshot.date > as_of - timedelta(days=days),
+                PortfolioSnapshot.date <= as_of)
+        .order_by(PortfolioSnapshot.date)
+        .all()
+    )
@@ -0,0 +1,320 @@
+# services/jobs.py
+"""Background jobs, queued in the `job` table and run by `flask run-worker`.
+
+The table is the whole queue: no broker. A worker claims due jobs, most
+urgent first, with `SELECT ... FOR UPDATE SKIP LOCKED` where the backend has
+it (MySQL), so concurrent workers never wait on each other's rows; on SQLite
+the lock clause is dropped and a conditional UPDATE per job decides which
+poller got it. Claimed jobs run in a thread pool, each thread with its own
+app context and session.
+
+A job that raises is queued again after JOB_RETRY_DELAY seconds, doubled
+for each further attempt, until it has run `max_attempts` times. A job
+whose worker died (no heartbeat for JOB_TIMEOUT seconds) is queued again
+too. Handlers report progress between their own commits and return a JSON
+result; a handler must be safe to re-run after a partial attempt.
+
+Files in JOB_SPOOL_DIR (uploads, finished exports) are removed by the
+workers once they are JOB_FILE_RETENTION seconds old.
+"""
+import os
+import socket
+import time
+import traceback
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+
+from extensions import db
+from models import Job
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+# Seconds between a worker's sweeps of JOB_SPOOL_DIR for expired files
+PRUNE_INTERVAL = 3600
+
+HANDLERS = {}
+
+
+def handler(kind, priority=0):
+    """Register a `fn(context, **payload)` as the handler of `kind` jobs."""
+    def register(fn):
+        HANDLERS[kind] = (fn, priority)
+        return fn
+    return register
+
+
+def enqueue(kind, payload=None, user_id=None, priority=None, max_attempts=None, delay=0):
+    """Queue a job and commit. Returns the Job.
+
+    `priority` defaults to the handler's; higher runs first.
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    if not isinstance(payload or {}, dict):
+        raise ValueError("Job payload must be an object")
+    job = Job(kind=kind, payload=payload or {}, user_id=user_id,
+              priority=HANDLERS[kind][1] if priority is None else priority,
+              max_attempts=max_attempts or current_app.config.get('JOB_MAX_ATTEMPTS', 3),
+              run_after=datetime.utcnow() + timedelta(seconds=delay))
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def _spool_dir():
+    directory = os.path.join(current_app.root_path, current_app.config.get('JOB_SPOOL_DIR', 'job_files'))
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def spool_path(name):
+    """Path of a file jobs share with the web process, under JOB_SPOOL_DIR.
+
+    A relative JOB_SPOOL_DIR is taken from the app's root, so web and worker
+    processes agree on it whatever their working directory.
+    """
+    return os.path.join(_spool_dir(), name)
+
+
+def spool_name(prefix, suffix=""):
+    return f"{prefix}-{uuid.uuid4().hex}{suffix}"
+
+
+def prune_spool(max_age):
+    """Delete spool files older than `max_age` seconds. Returns how many.
+
+    That is exports nobody downloaded and part files of failed attempts;
+    uploads a queued or running import still needs are kept.
+    """
+    pending = {
+        os.path.abspath(job.payload['path']) for job in
+        Job.query.filter(Job.kind == 'import_transactions', Job.status.in_((QUEUED, RUNNING)))
+        if (job.payload or {}).get('path')
+    }
+    cutoff = time.time() - max_age
+    removed = 0
+    with os.scandir(_spool_dir()) as entries:
+        for entry in entries:
+            if (entry.is_file() and entry.stat().st_mtime < cutoff
+                    and os.path.abspath(entry.path) not in pending):
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass  # another worker pruned it first
+    return removed
+
+
+class JobContext:
+    """What a handler sees of its job: ids, attempt number and progress reporting."""
+
+    def __init__(self, job):
+        self.id = job.id
+        self.user_id = job.user_id
+        self.attempt = job.attempts
+
+    def progress(self, done, total=None, message=None):
+        """Record progress and refresh the heartbeat. Commits the session, so
+        call it between the handler's own units of work."""
+        Job.query.filter(Job.id == self.id).update({
+            "done": done, "total": total, "message": message and message[:255],
+            "heartbeat_at": datetime.utcnow(),
+        }, synchronize_session=False)
+        db.session.commit()
+
+
+def requeue_stale(timeout):
+    """Queue again the running jobs whose worker has been silent `timeout` seconds.
+
+    Their attempt counts; one that has used them all fails instead.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=timeout)
+    stale = Job.query.filter(Job.status == RUNNING, Job.heartbeat_at < cutoff)
+    stale.filter(Job.attempts < Job.max_attempts).update(
+        {"status": QUEUED, "worker": None, "run_after": datetime.utcnow()},
+        synchronize_session=False)
+    stale.update({"status": FAILED, "error": "Worker stopped responding",
+                  "finished_at": datetime.utcnow()}, synchronize_session=False)
+    db.session.commit()
+
+
+def claim(worker, limit, kinds=None):
+    """Mark up to `limit` due jobs as running for `worker`. Returns their ids."""
+    now = datetime.utcnow()
+    query = (db.session.query(Job.id)
+             .filter(Job.status == QUEUED, Job.run_after <= now)
+             .order_by(Job.priority.desc(), Job.id))
+    if kinds:
+        query = query.filter(Job.kind.in_(kinds))
+    # Rendered only by backends that support it; SQLite falls back to the
+    # conditional UPDATE below
+    candidates = [job_id for (job_id,) in
+                  query.limit(limit).with_for_update(skip_locked=True)]
+
+    claimed = []
+    for job_id in candidates:
+        taken = (Job.query.filter(Job.id == job_id, Job.status == QUEUED)
+                 .update({"status": RUNNING, "worker": worker, "attempts": Job.attempts + 1,
+                          "started_at": now, "heartbeat_at": now},
+                         synchronize_session=False))
+        if taken:
+            claimed.append(job_id)
+    db.session.commit()
+    return claimed
+
+
+def run_job(job_id):
+    """Run one claimed job to completion, failure or its next retry."""
+    job = db.session.get(Job, job_id)
+    fn, _ = HANDLERS.get(job.kind, (None, None))
+    try:
+        if fn is None:
+            raise LookupError(f"No handler for {job.kind} jobs")
+        result = fn(JobContext(job), **(job.payload or {}))
+    except Exception as exc:
+        db.session.rollback()
+        job = db.session.get(Job, job_id)
+        current_app.logger.warning("Job %s (%s) failed: %s", job.id, job.kind, exc)
+        job.error = "".join(traceback.format_exception_only(type(exc), exc)).strip()
+        if job.attempts < job.max_attempts:
+            delay = current_app.config.get('JOB_RETRY_DELAY', 30) * 2 ** (job.attempts - 1)
+            job.status, job.worker = QUEUED, None
+            job.run_after = datetime.utcnow() + timedelta(seconds=delay)
+        else:
+            job.status, job.finished_at = FAILED, datetime.utcnow()
+            _cleanup(job)
+    else:
+        job = db.session.get(Job, job_id)
+        job.status, job.result, job.error = DONE, result, None
+        job.finished_at = datetime.utcnow()
+    db.session.commit()
+
+
+def _cleanup(job):
+    # An import that gave up no longer needs its uploaded file
+    path = (job.payload or {}).get('path')
+    if job.kind == 'import_transactions' and path and os.path.exists(path):
+        os.remove(path)
+
+
+def run_worker(app, concurrency=4, poll_interval=1.0, burst=False, kinds=None, echo=None):
+    """Claim and run jobs on `concurrency` threads until interrupted.
+
+    With `burst`, return once no job is due and none is running. Returns the
+    number of jobs run.
+    """
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    timeout = app.config.get('JOB_TIMEOUT', 3600)
+    retention = app.config.get('JOB_FILE_RETENTION', 7 * 24 * 3600)
+    next_prune = 0
+    ran = 0
+
+    def execute(job_id):
+        with app.app_context():
+            run_job(job_id)
+
+    with ThreadPoolExecutor(concurrency, thread_name_prefix="job") as pool:
+        running = set()
+        while True:
+            claimed = []
+            with app.app_context():
+                requeue_stale(timeout)
+                if time.monotonic() >= next_prune:
+                    prune_spool(retention)
+                    next_prune = time.monotonic() + PRUNE_INTERVAL
+                if len(running) < concurrency:
+                    claimed = claim(worker, concurrency - len(running), kinds)
+            for job_id in claimed:
+                if echo:
+                    echo(f"Running job {job_id}")
+                running.add(pool.submit(execute, job_id))
+            ran += len(claimed)
+
+            if burst and not running and not claimed:
+                return ran
+            if running:
+                finished, running = wait(running, timeout=poll_interval,
+                                         return_when=FIRST_COMPLETED)
+                for future in finished:
+                    if future.exception():
+                        # The job stays running and is retried once its heartbeat goes stale
+                        app.logger.error("Worker thread crashed", exc_info=future.exception())
+            elif not claimed:
+                time.sleep(poll_interval)
+
+
+# -- Handlers. Their services are imported on first use, as in cli.py. --
+
+@handler('import_transactions', priority=10)
+def import_job(context, path, user_id, fmt='csv'):
+    """Import an uploaded statement saved under JOB_SPOOL_DIR, then remove it.
+
+    Each chunk commits with its ledger, rollup and budget rows, and a retry
+    skips the rows already imported as duplicates.
+    """
+    from services.importer import import_transactions, open_statement
+
+    def progress(report):
+        context.progress(report.rows_read, message=f"{report.inserted} imported")
+
+    with open_statement(path) as stream:
+        report = import_transactions(stream, user_id, fmt, progress=progress)
+    os.remove(path)
+    return {"summary": report.summary(), "rows_read": report.rows_read,
+            "inserted": report.inserted, "errors": report.errors}
+
+
+@handler('export_transactions', priority=10)
+def export_job(context, user_id, filter_by='all', start_date=None, end_date=None, t_type=None):
+    """Write a gzipped CSV export under JOB_SPOOL_DIR for the jobs file endpoint.
+
+    Rows are read in batches with progress reported after each, which keeps
+    the heartbeat fresh through long exports. Each attempt writes its own
+    part file, renamed into place once complete.
+    """
+    from services.export import export_batches, export_queries, gzip_chunks, iter_csv
+
+    name = f"export-{context.id}.csv.gz"
+    part = spool_path(f"{name}.{context.attempt}.part")
+    rows = 0
+
+    def reported(batches):
+        nonlocal rows
+        for batch in batches:
+            yield from batch
+            rows += len(batch)
+            context.progress(rows, message=f"{rows} rows written")
+
+    queries = export_queries(user_id, filter_by, start_date, end_date, t_type)
+    with open(part, "wb") as out:
+        for data in gzip_chunks(iter_csv(reported(export_batches(*queries)))):
+            out.write(data)
+    os.replace(part, spool_path(name))
+    return {"file": name, "rows": rows}
+
+
+@handler('rebuild_rollups')
+def rebuild_rollups_job(context, user_id=None):
+    from services.rollup import rebuild_rollups
+
+    rebuild_rollups(user_id)
+    return {"user_id": user_id}
+
+
+@handler('refresh_prices')
+def refresh_prices_job(context, as_of=None):
+    from services.prices import price_source, refresh_prices
+
+    written = refresh_prices(price_source(current_app.config),
+                             date.fromisoformat(as_of) if as_of else None)
+    return {"written": written}
+
+
+@handler('post_recurring')
+def post_recurring_job(context):
+    from services.recurring import post_due_recurring
+
+    return {"posted": len(post_due_recurring())}
@@ -0,0 +1,261 @@
+# services/ledger.py
+"""Running balance per user and currency, materialized per day in `daily_balance`.
+
+Transactions stay the append-only source of truth; the ledger holds each
+day's income, expense and closing balance in the transactions' own currency.
+Writes dated on or after the last ledger day of their currency are folded in
+place. Anything earlier (a back-dated insert or a delete) repairs that
+currency's ledger from the earliest changed day onwards, with one grouped
+query over the transactions (hot and archived) since then.
+
+Reads use the (user_id, currency, day) index: the balance as of any date is
+the closing balance of each currency's last ledger day on or before it,
+converted into the user's base currency at that date's rates.
+"""
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, bindparam, case, func, select
+
+from extensions import db, upsert
+from money import DEFAULT_CURRENCY, ZERO, to_money
+from models import DailyBalance
+from services.archive import with_archive
+from services.fx import base_currency, convert_sums
+
+
+def _get(row, name):
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+def _currency(row):
+    # Rows that don't name a currency are written with the column default
+    currency = row.get('currency') if isinstance(row, dict) else row.currency
+    return currency or DEFAULT_CURRENCY
+
+
+def _day(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def apply_to_ledger(rows, sign=1):
+    """Fold written transaction rows into their users' ledgers.
+
+    `rows` may be Transaction objects or mappings; pass `sign=-1` for rows
+    that were deleted. Call after the rows are written (a back-dated change
+    re-reads the transaction table). Runs inside the caller's transaction;
+    the caller commits.
+    """
+    # (user, currency) -> day -> [in, out]
+    deltas = defaultdict(lambda: defaultdict(lambda: [ZERO, ZERO]))
+    for row in rows:
+        amount = sign * to_money(_get(row, 'amount') or 0)
+        totals = deltas[_get(row, 'user_id'), _currency(row)][_day(_get(row, 'date'))]
+        totals[0 if _get(row, 'type') == 'income' else 1] += amount
+    if not deltas:
+        return
+
+    last = _last_days({user_id for user_id, _ in deltas})
+    writes = []
+    for (user_id, currency), days in deltas.items():
+        last_day, _ = last.get((user_id, currency), (None, ZERO))
+        if last_day is not None and min(days) < last_day:
+            repair_ledger(user_id, min(days), currency)
+            continue
+        writes.extend({"user_id": user_id, "currency": currency, "day": day,
+                       "income": income, "expense": expense}
+                      for day, (income, expense) in sorted(days.items()))
+    _add_days(writes)
+
+
+def _add_days(rows):
+    """Add each day's income and expense to its ledger row, inserting missing days.
+
+    Balances are carried in SQL, not from values read earlier: days later than
+    a row (another writer's, added meanwhile) take its net amount, and a new
+    day opens at the closing balance of the day before it, read by the INSERT
+    itself. Rows must be in day order per user and currency.
+    """
+    if not rows:
+        return
+    table = DailyBalance.__table__
+    # Later days first, so that the rows inserted below aren't counted twice
+    db.session.execute(
+        table.update()
+        .where(table.c.user_id == bindparam("b_user_id"),
+               table.c.currency == bindparam("b_currency"),
+               table.c.day > bindparam("b_day"))
+        .values(balance=table.c.balance + bindparam("b_income", type_=table.c.income.type)
+                - bindparam("b_expense", type_=table.c.expense.type)),
+        [{f"b_{k}": v for k, v in row.items()} for row in rows],
+    )
+
+    previous = table.alias("previous")
+    opening = (
+        select(previous.c.balance)
+        .where(previous.c.user_id == bindparam("user_id"),
+               previous.c.currency == bindparam("currency"),
+               previous.c.day < bindparam("day"))
+        .order_by(previous.c.day.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    values = {name: bindparam(name, type_=table.c[name].type)
+              for name in ("user_id", "currency", "day", "income", "expense")}
+    source = select(*(value.label(name) for name, value in values.items()),
+                    (func.coalesce(opening, 0) + values["income"] - values["expense"])
+                    .label("balance"))
+    upsert(table, ("user_id", "currency", "day"), rows,
+           lambda incoming: [("income", table.c.income + incoming["income"]),
+                             ("expense", table.c.expense + incoming["expense"]),
+                             ("balance", table.c.balance + incoming["income"]
+                              - incoming["expense"])],
+           source=source)
+
+
+def _last_days(user_ids):
+    """{(user_id, currency): (last ledger day, closing balance)} in one query."""
+    latest = (
+        db.session.query(DailyBalance.user_id, DailyBalance.currency,
+                         func.max(DailyBalance.day).label('day'))
+        .filter(DailyBalance.user_id.in_(list(user_ids)))
+        .group_by(DailyBalance.user_id, DailyBalance.currency)
+        .subquery()
+    )
+    rows = (
+        db.session.query(DailyBalance.user_id, DailyBalance.currency, DailyBalance.day,
+                         DailyBalance.balance)
+        .join(latest, and_(DailyBalance.user_id == latest.c.user_id,
+                           DailyBalance.currency == latest.c.currency,
+                           DailyBalance.day == latest.c.day))
+    )
+    return {(user_id, currency): (day, balance) for user_id, currency, day, balance in rows}
+
+
+def _closing_balances(user_id, day):
+    """{currency: closing balance} of each of a user's currencies at the end of `day`."""
+    latest = (
+        db.session.query(DailyBalance.currency, func.max(DailyBalance.day).label('day'))
+        .filter(DailyBalance.user_id == user_id, DailyBalance.day <= _day(day))
+        .group_by(DailyBalance.currency)
+        .subquery()
+    )
+    rows = (
+        db.session.query(DailyBalance.currency, DailyBalance.balance)
+        .join(latest, and_(DailyBalance.currency == latest.c.currency,
+                           DailyBalance.day == latest.c.day))
+        .filter(DailyBalance.user_id == user_id)
+    )
+    return dict(rows.all())
+
+
+def _daily_totals(user_id=None, since=None, currency=None):
+    """(user_id, currency, day, income, expense) of hot and archived rows, in ledger order."""
+    def rows(model):
+        conditions = []
+        if user_id is not None:
+            conditions.append(model.user_id == user_id)
+        if currency is not None:
+            conditions.append(model.currency == currency)
+        if since is not None:
+            conditions.append(model.date >= datetime.combine(since, datetime.min.time()))
+        return select(model.user_id, model.currency, model.date, model.type,
+                      model.amount).where(*conditions)
+
+    rows = with_archive(rows)
+    day = func.date(rows.c.date, type_=db.Date)
+    query = db.session.query(
+        rows.c.user_id, rows.c.currency, day,
+        func.sum(case((rows.c.type == 'income', rows.c.amount), else_=0)),
+        func.sum(case((rows.c.type != 'income', rows.c.amount), else_=0)),
+    )
+    keys = (rows.c.user_id, rows.c.currency, day)
+    return query.group_by(*keys).order_by(*keys)
+
+
+def _write(rows, openings=None):
+    """Insert ledger rows for grouped daily totals, carrying each balance forward.
+
+    `openings` maps (user_id, currency) to the balance before the first row.
+    """
+    openings = openings or {}
+    mappings, running, current = [], ZERO, None
+    for user_id, currency, day, income, expense in rows:
+        if (user_id, currency) != current:
+            current = (user_id, currency)
+            running = openings.get(current, ZERO)
+        income, expense = income or ZERO, expense or ZERO
+        running += income - expense
+        mappings.append({"user_id": user_id, "currency": currency, "day": _day(day),
+                         "income": income, "expense": expense, "balance": running})
+    if mappings:
+        db.session.execute(DailyBalance.__table__.insert(), mappings)
+    return len(mappings)
+
+
+def repair_ledger(user_id, since, currency=None):
+    """Re-derive a user's ledger from `since` (a date) onwards. The caller commits.
+
+    Only `currency` is repaired when given, otherwise all of them.
+    """
+    since = _day(since)
+    openings = _closing_balances(user_id, since - timedelta(days=1))
+    stale = DailyBalance.query.filter(DailyBalance.user_id == user_id, DailyBalance.day >= since)
+    if currency is not None:
+        stale = stale.filter(DailyBalance.currency == currency)
+    stale.delete(synchronize_session=False)
+    _write(_daily_totals(user_id, since, currency),
+           {(user_id, code): balance for code, balance in openings.items()})
+
+
+def rebuild_ledger(user_id=None):
+    """Recompute the ledger from scratch, for one user or everyone. Commits."""
+    query = DailyBalance.query
+    if user_id is not None:
+        query = query.filter(DailyBalance.user_id == user_id)
+    query.delete(synchronize_session=False)
+    written = _write(_daily_totals(user_id))
+    db.session.commit()
+    return written
+
+
+def balance_as_of(user_id, day, currency=None):
+    """Account balance at the end of `day`, in `currency` (default: the user's base)."""
+    day = _day(day)
+    balances = _closing_balances(user_id, day)
+    to = currency or base_currency(user_id)
+    rows = ((None, code, day, balance) for code, balance in balances.items())
+    return convert_sums(rows, to).get(None, ZERO)
+
+
+def balances_at(user_id, days, currency=None):
+    """Balance at the end of each of `days` (ascending dates), in `currency` (default: base).
+
+    One range read plus one opening lookup, then a single conversion pass.
+    """
+    if not days:
+        return []
+    days = [_day(d) for d in days]
+    rows = (
+        db.session.query(DailyBalance.currency, DailyBalance.day, DailyBalance.balance)
+        .filter(DailyBalance.user_id == user_id,
+                DailyBalance.day.between(days[0], days[-1]))
+        .order_by(DailyBalance.currency, DailyBalance.day)
+        .all()
+    )
+    ledgers = defaultdict(lambda: ([], []))  # currency -> (days, balances)
+    for code, day, balance in rows:
+        ledgers[code][0].append(day)
+        ledgers[code][1].append(balance)
+    openings = _closing_balances(user_id, days[0] - timedelta(days=1))
+
+    points = []
+    for code in set(ledgers) | set(openings):
+        ledger_days, balances = ledgers[code]
+        opening = openings.get(code, ZERO)
+        for position, day in enumerate(days):
+            index = bisect_right(ledger_days, day)
+            points.append((position, code, day, balances[index - 1] if index else opening))
+    totals = convert_sums(points, currency or base_currency(user_id))
+    return [totals.get(position, ZERO) for position in range(len(days))]
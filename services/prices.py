@@ -0,0 +1,92 @@
+# services/prices.py
+"""Price sources and the batch job that refreshes the local price table.
+
+A price source is any class with a `from_config(config)` classmethod and a
+`fetch(tickers, as_of)` method yielding (ticker, date, close) tuples. The app
+picks one with PRICE_SOURCE ('module:Class'); FilePriceSource reads a CSV and
+stands in for a market data feed in development and tests.
+"""
+import csv
+from datetime import date, datetime, timedelta
+from importlib import import_module
+
+from extensions import db
+from models import Investment, Price
+
+PRICED_TYPES = ('mutual_fund', 'share')
+
+
+class FilePriceSource:
+    """Quotes from a CSV file with `ticker,date,close` columns (ISO dates)."""
+
+    def __init__(self, path):
+        self.path = path
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config['PRICE_FILE'])
+
+    def fetch(self, tickers, as_of):
+        wanted = set(tickers)
+        with open(self.path, newline='', encoding='utf-8-sig') as stream:
+            for row in csv.DictReader(stream):
+                ticker = row['ticker'].strip()
+                if ticker not in wanted:
+                    continue
+                day = date.fromisoformat(row['date'].strip())
+                if day <= as_of:
+                    yield ticker, day, float(row['close'])
+
+
+def price_source(config):
+    """Build the price source named by PRICE_SOURCE."""
+    module, _, name = config['PRICE_SOURCE'].partition(':')
+    return getattr(import_module(module), name).from_config(config)
+
+
+def held_tickers():
+    """Every ticker/ISIN that some fund or share holding refers to."""
+    return [ticker for (ticker,) in (
+        db.session.query(Investment.ticker_or_isin)
+        .filter(Investment.investment_type.in_(PRICED_TYPES),
+                Investment.ticker_or_isin.isnot(None))
+        .distinct()
+    )]
+
+
+def refresh_prices(source, as_of=None):
+    """Fetch quotes for all held tickers and upsert them into the price table.
+
+    Existing (ticker, date) rows are updated and new ones inserted, each as
+    one bulk statement. Returns the number of quotes written.
+    """
+    if as_of is None:
+        as_of = (datetime.utcnow() + timedelta(hours=5, minutes=45)).date()
+    tickers = held_tickers()
+    if not tickers:
+        return 0
+
+    # A later quote for the same ticker and day replaces an earlier one
+    quotes = {(ticker, day): close for ticker, day, close in source.fetch(tickers, as_of)}
+    if not quotes:
+        return 0
+
+    days = [day for _, day in quotes]
+    existing = {
+        (ticker, day): price_id
+        for price_id, ticker, day in db.session.query(Price.id, Price.ticker, Price.date)
+        .filter(Price.ticker.in_(tickers), Price.date.between(min(days), max(days)))
+    }
+    updates, inserts = [], []
+    for (ticker, day), close in quotes.items():
+        if (ticker, day) in existing:
+            updates.append({"id": existing[(ticker, day)], "close": close})
+        else:
+            inserts.append({"ticker": ticker, "date": day, "close": close})
+
+    if updates:
+        db.session.bulk_update_mappings(Price, updates)
+    if inserts:
+        db.session.bulk_insert_mappings(Price, inserts)
+    db.session.commit()
+    return len(quotes)
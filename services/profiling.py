@@ -0,0 +1,151 @@
+# services/profiling.py
+import logging
+import os
+import threading
+import time
+import traceback
+from collections import defaultdict, deque
+
+from flask import before_render_template, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("moneymuse.sql")
+
+
+class EndpointStats:
+    """Rolling timings for one endpoint (the last `window` requests)."""
+
+    def __init__(self, window=500):
+        self.count = 0
+        self.durations = deque(maxlen=window)
+        self.db_times = deque(maxlen=window)
+        self.query_counts = deque(maxlen=window)
+        self.slow_queries = 0
+
+    def add(self, duration, db_time, queries, slow):
+        self.count += 1
+        self.durations.append(duration)
+        self.db_times.append(db_time)
+        self.query_counts.append(queries)
+        self.slow_queries += slow
+
+    def summary(self):
+        ordered = sorted(self.durations)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        n = len(ordered)
+        return {
+            "count": self.count,
+            "avg_ms": sum(ordered) / n,
+            "p95_ms": p95,
+            "max_ms": ordered[-1],
+            "avg_db_ms": sum(self.db_times) / n,
+            "avg_queries": sum(self.query_counts) / n,
+            "max_queries": max(self.query_counts),
+            "slow_queries": self.slow_queries,
+        }
+
+
+class QueryProfiler:
+    """Opt-in per-request SQL and render timing (SQL_PROFILING=1).
+
+    Counts queries and database time per request from SQLAlchemy engine
+    events, times template rendering from Flask signals, logs queries slower
+    than SQL_SLOW_QUERY_MS with the application frame that issued them, and
+    reports the numbers in a Server-Timing header and per-endpoint stats.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.slow_ms = 100
+        self.root_path = None
+        self.endpoints = defaultdict(EndpointStats)
+        self.recent_slow = deque(maxlen=50)
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config.get('SQL_PROFILING', False)
+        if not self.enabled:
+            return
+        self.slow_ms = app.config.get('SQL_SLOW_QUERY_MS', 100)
+        self.root_path = app.root_path
+
+        event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.extensions['query_profiler'] = self
+
+    # -- SQLAlchemy events --------------------------------------------------
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = (time.perf_counter() - conn.info['query_start'].pop()) * 1000
+        if not has_request_context() or 'profile' not in g:
+            return
+        g.profile['queries'] += 1
+        g.profile['db_ms'] += elapsed
+        if elapsed >= self.slow_ms:
+            g.profile['slow'] += 1
+            site = self._call_site()
+            logger.warning("Slow query (%.1f ms) at %s: %s", elapsed, site, " ".join(statement.split()))
+            self.recent_slow.append({
+                "endpoint": request.endpoint,
+                "ms": elapsed,
+                "site": site,
+                "statement": " ".join(statement.split())[:500],
+            })
+
+    def _call_site(self):
+        """The innermost stack frame that belongs to the application."""
+        here = os.path.abspath(__file__)
+        for frame in reversed(traceback.extract_stack()):
+            filename = os.path.abspath(frame.filename)
+            if (filename.startswith(self.root_path) and filename != here
+                    and 'site-packages' not in filename):
+                return f"{os.path.relpath(filename, self.root_path)}:{frame.lineno} in {frame.name}"
+        return "unknown"
+
+    # -- Flask hooks --------------------------------------------------------
+
+    def _start_request(self):
+        g.profile = {"start": time.perf_counter(), "queries": 0, "db_ms": 0.0,
+                     "slow": 0, "render_ms": 0.0, "render_start": None}
+
+    def _before_render(self, sender, template, context, **extra):
+        if 'profile' in g:
+            g.profile['render_start'] = time.perf_counter()
+
+    def _after_render(self, sender, template, context, **extra):
+        if 'profile' in g and g.profile['render_start'] is not None:
+            g.profile['render_ms'] += (time.perf_counter() - g.profile['render_start']) * 1000
+            g.profile['render_start'] = None
+
+    def _finish_request(self, response):
+        profile = g.pop('profile', None)
+        if profile is None:
+            return response
+        total_ms = (time.perf_counter() - profile['start']) * 1000
+        response.headers.add('Server-Timing', ", ".join([
+            f'db;dur={profile["db_ms"]:.1f};desc="{profile["queries"]} queries"',
+            f'render;dur={profile["render_ms"]:.1f}',
+            f'total;dur={total_ms:.1f}',
+        ]))
+        if request.endpoint and request.endpoint != 'static':
+            with self._lock:
+                self.endpoints[request.endpoint].add(
+                    total_ms, profile['db_ms'], profile['queries'], profile['slow'])
+        return response
+
+    def worst_endpoints(self, limit=20):
+        """Endpoint summaries, slowest p95 first."""
+        with self._lock:
+            rows = [dict(endpoint=name, **stats.summary()) for name, stats in self.endpoints.items()]
+        return sorted(rows, key=lambda r: r['p95_ms'], reverse=True)[:limit]
+
+
+query_profiler = QueryProfiler()
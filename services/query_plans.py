@@ -0,0 +1,107 @@
+# services/query_plans.py
+import re
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import event
+
+from extensions import db
+from models import Budget, Transaction
+from services.budgets import budget_progress
+from services.cache import aggregate_cache
+from services.investments import portfolio_valuation
+from services.ledger import balance_as_of, balances_at
+from services.recurring import due_templates
+from services.rollup import totals_by_type, monthly_series, expenses_by_category
+from services.search import search_transactions
+from services.transactions import filter_transactions, keyset_page, totals_for
+
+
+def _transactions(user_id, filter_by, **dates):
+    query = filter_transactions(Transaction.query.filter_by(user_id=user_id), filter_by, **dates)
+    keyset_page(query)
+    keyset_page(query, cursor=f"{datetime.utcnow().isoformat()}_1")
+    totals_for(query)
+
+
+def _search(user_id, text):
+    query = search_transactions(Transaction.query.filter_by(user_id=user_id), user_id, text)
+    keyset_page(query)
+
+
+# name -> callable(user_id) that runs the queries of one hot path
+HOT_PATHS = {
+    "transactions: all": lambda uid: _transactions(uid, 'all'),
+    "transactions: today": lambda uid: _transactions(uid, 'today'),
+    "transactions: month": lambda uid: _transactions(uid, 'month'),
+    "transactions: custom range": lambda uid: _transactions(
+        uid, 'custom', start_date='2024-01-01', end_date='2024-12-31'),
+    "dashboard: totals": totals_by_type,
+    "dashboard: monthly series": monthly_series,
+    "dashboard: expenses by category": expenses_by_category,
+    "budgets: spent per budget": lambda uid: budget_progress(
+        uid, Budget.query.filter_by(user_id=uid).all()),
+    "recurring: due templates": lambda uid: due_templates(datetime.utcnow()).all(),
+    "investments: portfolio valuation": portfolio_valuation,
+    "ledger: balance as of": lambda uid: balance_as_of(uid, datetime.utcnow()),
+    "transactions: search": lambda uid: _search(uid, 'food coffee'),
+    "transactions: search typo": lambda uid: _search(uid, 'cofee'),
+    "ledger: balance history": lambda uid: balances_at(
+        uid, [datetime(2024, month, 1) for month in range(1, 13)]),
+}
+
+
+@contextmanager
+def capture_statements():
+    """Collect (statement, parameters) for every SELECT run inside the block."""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def explain(statement, parameters):
+    """Return (full_scans, plan_lines) for one statement on the current backend."""
+    with db.engine.connect() as conn:
+        if conn.dialect.name == 'sqlite':
+            rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+            plan = [row[-1] for row in rows]
+            # "SCAN <table>" without an index is a full table scan; scans of
+            # derived tables (e.g. budget windows) are not
+            scans = [re.match(r"SCAN (\w+)( AS \w+)?$", line) for line in plan]
+            full_scans = [m.string for m in scans if m and m.group(1) in db.metadata.tables]
+        else:
+            result = conn.exec_driver_sql("EXPLAIN " + statement, parameters)
+            rows = [dict(row._mapping) for row in result]
+            plan = [f"{r.get('table')}: type={r.get('type')} key={r.get('key')}" for r in rows]
+            full_scans = [line for line, r in zip(plan, rows)
+                          if r.get('type') == 'ALL' and r.get('table')
+                          and not str(r['table']).startswith('<')]
+    return full_scans, plan
+
+
+def check_hot_queries(user_id=1):
+    """EXPLAIN every query of every hot path.
+
+    Returns a list of (path name, statement, full_scans, plan); a path passes
+    when every one of its statements has no full scans.
+    """
+    enabled, aggregate_cache.enabled = aggregate_cache.enabled, False
+    report = []
+    try:
+        for name, run in HOT_PATHS.items():
+            with capture_statements() as captured:
+                run(user_id)  # every path must reach the database
+            for statement, parameters in captured:
+                full_scans, plan = explain(statement, parameters)
+                report.append((name, statement, full_scans, plan))
+    finally:
+        aggregate_cache.enabled = enabled
+    return report
@@ -0,0 +1,89 @@
+# services/recurring.py
+from datetime import datetime, timedelta
+
+from extensions import db
+from models import Transaction
+from services.alerts import record_expenses
+from services.cache import aggregate_cache, TRANSACTION_AGGREGATES
+from services.ledger import apply_to_ledger
+from services.rollup import apply_to_rollup
+from services.search import index_inserted, last_transaction_id
+
+
+FREQUENCY_STEPS = {
+    "daily": timedelta(days=1),
+    "weekly": timedelta(weeks=1),
+    "monthly": timedelta(days=30),
+}
+
+
+def next_occurrence(when, frequency):
+    """Return the date after `when` for a recurring `frequency`, or None."""
+    step = FREQUENCY_STEPS.get(frequency)
+    return when + step if step else None
+
+
+def due_templates(cutoff):
+    """Query for recurring templates scheduled before `cutoff`, across all users."""
+    return Transaction.query.filter(
+        Transaction.is_recurring == True,
+        Transaction.next_date != None,
+        Transaction.next_date < cutoff,
+    )
+
+
+def post_due_recurring(now=None):
+    """Post every recurring transaction that has come due, for all users.
+
+    Due templates are found with a single query on `next_date`, the generated
+    rows are inserted in bulk and the templates' `next_date` values are
+    advanced in bulk, all in one commit. Missed periods (e.g. the scheduler was
+    down for a few days) are caught up, each posting dated at its own
+    occurrence. Returns the list of inserted row mappings.
+    """
+    if now is None:
+        now = datetime.utcnow() + timedelta(hours=5, minutes=45)
+
+    # Anything scheduled for today or earlier is due
+    cutoff = datetime.combine(now.date(), datetime.min.time()) + timedelta(days=1)
+
+    templates = due_templates(cutoff).with_for_update(skip_locked=True).all()
+
+    new_rows = []
+    advanced = []
+    for t in templates:
+        occurrence = t.next_date
+        if t.frequency not in FREQUENCY_STEPS:
+            continue
+
+        while occurrence < cutoff:
+            new_rows.append({
+                "amount": t.amount,
+                "currency": t.currency,
+                "type": t.type,
+                "note": f"(Recurring) {t.note or ''}",
+                "date": occurrence,
+                "user_id": t.user_id,
+                "category_id": t.category_id,
+                "is_recurring": False,
+                "frequency": None,
+                "next_date": None,
+            })
+            occurrence = next_occurrence(occurrence, t.frequency)
+
+        advanced.append({"id": t.id, "next_date": occurrence})
+
+    if new_rows:
+        after_id = last_transaction_id()
+        db.session.bulk_insert_mappings(Transaction, new_rows)
+        index_inserted(after_id, {row["user_id"] for row in new_rows})
+        apply_to_rollup(new_rows)
+        apply_to_ledger(new_rows)
+        record_expenses(new_rows)
+    if advanced:
+        db.session.bulk_update_mappings(Transaction, advanced)
+    db.session.commit()
+
+    for user_id in {row["user_id"] for row in new_rows}:
+        aggregate_cache.invalidate(user_id, TRANSACTION_AGGREGATES)
+    return new_rows
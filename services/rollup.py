@@ -0,0 +1,178 @@
+# services/rollup.py
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import extract, func, insert, select
+
+from extensions import db, upsert
+from money import DEFAULT_CURRENCY, ZERO, to_money
+from models import Category, MonthlyRollup
+from services.archive import with_archive
+from services.cache import aggregate_cache, TRANSACTION_AGGREGATES
+from services.fx import base_currency, convert_sums, month_end
+from services.ledger import balances_at
+
+KEY_COLUMNS = ("user_id", "year", "month", "category_id", "type", "currency")
+
+
+def _get(row, name):
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+def _currency(row):
+    # Rows that don't name a currency are written with the column default
+    currency = row.get('currency') if isinstance(row, dict) else row.currency
+    return currency or DEFAULT_CURRENCY
+
+
+def apply_to_rollup(rows, sign=1):
+    """Fold transaction rows into the monthly rollup table.
+
+    `rows` may be Transaction objects or plain mappings (as produced by the
+    bulk insert paths). Use `sign=-1` to take rows back out, e.g. before a
+    delete. Runs inside the caller's transaction; the caller commits.
+    """
+    deltas = defaultdict(lambda: [0, 0])
+    for row in rows:
+        when = _get(row, 'date')
+        key = (_get(row, 'user_id'), when.year, when.month,
+               _get(row, 'category_id'), _get(row, 'type'), _currency(row))
+        deltas[key][0] += sign * to_money(_get(row, 'amount') or 0)
+        deltas[key][1] += sign
+
+    if not deltas:
+        return
+
+    # One upsert for every key touched: the database adds to the rows that
+    # exist and inserts the rest, so concurrent first writes of a key can't clash
+    table = MonthlyRollup.__table__
+    upsert(table, KEY_COLUMNS,
+           [dict(zip(KEY_COLUMNS, key), total=total, count=count)
+            for key, (total, count) in deltas.items()],
+           lambda incoming: [("total", table.c.total + incoming["total"]),
+                             ("count", table.c.count + incoming["count"])])
+
+
+def rebuild_rollups(user_id=None):
+    """Recompute the rollup table from hot and archived transactions, for one user or everyone."""
+    stale = MonthlyRollup.query
+    if user_id is not None:
+        stale = stale.filter_by(user_id=user_id)
+    stale.delete(synchronize_session=False)
+
+    def rows(model):
+        columns = select(model.id, model.user_id, model.date, model.category_id, model.type,
+                         model.currency, model.amount)
+        return columns if user_id is None else columns.where(model.user_id == user_id)
+
+    rows = with_archive(rows)
+    year = extract('year', rows.c.date)
+    month = extract('month', rows.c.date)
+    keys = (rows.c.user_id, year, month, rows.c.category_id, rows.c.type, rows.c.currency)
+    grouped = (
+        db.session.query(*keys, func.sum(rows.c.amount), func.count(rows.c.id))
+        .group_by(*keys)
+    )
+    db.session.execute(
+        insert(MonthlyRollup).from_select(
+            [*KEY_COLUMNS, 'total', 'count'],
+            grouped.statement,
+        )
+    )
+    db.session.commit()
+
+    if user_id is not None:
+        aggregate_cache.invalidate(user_id, TRANSACTION_AGGREGATES)
+    else:
+        for (uid,) in db.session.query(MonthlyRollup.user_id).distinct():
+            aggregate_cache.invalidate(uid, TRANSACTION_AGGREGATES)
+
+
+def currencies_in_use(user_id):
+    """The currencies a user has transactions in, read from the rollup table."""
+    rows = (db.session.query(MonthlyRollup.currency)
+            .filter(MonthlyRollup.user_id == user_id).distinct())
+    return {currency for (currency,) in rows}
+
+
+@aggregate_cache.memoize('totals_by_type')
+def totals_by_type(user_id):
+    """Return (total_income, total_expense) for a user, in their base currency.
+
+    Foreign-currency months are converted at their month-end rates.
+    """
+    rows = (
+        db.session.query(MonthlyRollup.type, MonthlyRollup.currency, MonthlyRollup.year,
+                         MonthlyRollup.month, func.sum(MonthlyRollup.total))
+        .filter(MonthlyRollup.user_id == user_id)
+        .group_by(MonthlyRollup.type, MonthlyRollup.currency, MonthlyRollup.year,
+                  MonthlyRollup.month)
+        .all()
+    )
+    totals = convert_sums(((t_type, currency, month_end(y, m), total)
+                           for t_type, currency, y, m, total in rows), base_currency(user_id))
+    return totals.get('income', ZERO), totals.get('expense', ZERO)
+
+
+@aggregate_cache.memoize('monthly_series', daily=True)
+def monthly_series(user_id, months=12, today=None):
+    """Income, expense and running balance for the last `months` calendar months.
+
+    Returns (labels, income, expense, balance) lists, oldest month first. The
+    balance is the account balance at the end of each month, so it carries
+    over across months and years instead of resetting. Amounts are in the
+    user's base currency, converted at month-end rates.
+    """
+    if today is None:
+        today = (datetime.utcnow() + timedelta(hours=5, minutes=45)).date()
+    keys = []
+    y, m = today.year, today.month
+    for _ in range(months):
+        keys.append((y, m))
+        y, m = (y, m - 1) if m > 1 else (y - 1, 12)
+    keys.reverse()
+    first_year, first_month = keys[0]
+    period = MonthlyRollup.year * 100 + MonthlyRollup.month
+
+    rows = (
+        db.session.query(MonthlyRollup.year, MonthlyRollup.month, MonthlyRollup.type,
+                         MonthlyRollup.currency, func.sum(MonthlyRollup.total))
+        .filter(MonthlyRollup.user_id == user_id,
+                MonthlyRollup.year >= first_year,
+                period >= first_year * 100 + first_month)
+        .group_by(MonthlyRollup.year, MonthlyRollup.month, MonthlyRollup.type,
+                  MonthlyRollup.currency)
+        .all()
+    )
+    base = base_currency(user_id)
+    sums = convert_sums((((y, m, t_type), currency, month_end(y, m), total)
+                         for y, m, t_type, currency, total in rows), base)
+
+    # Month-end balances are point lookups in the daily ledger
+    month_ends = [month_end(y, m) for y, m in keys]
+    balance_data = balances_at(user_id, month_ends, base)
+
+    labels, income_data, expense_data = [], [], []
+    for y, m in keys:
+        labels.append(date(y, m, 1).strftime('%b %Y'))
+        income_data.append(sums.get((y, m, 'income'), ZERO))
+        expense_data.append(sums.get((y, m, 'expense'), ZERO))
+
+    return labels, income_data, expense_data, balance_data
+
+
+@aggregate_cache.memoize('expenses_by_category')
+def expenses_by_category(user_id):
+    """Return [(category name, total)] of a user's expenses, in their base currency."""
+    rows = (
+        db.session.query(Category.name, MonthlyRollup.currency, MonthlyRollup.year,
+                         MonthlyRollup.month, func.sum(MonthlyRollup.total))
+        .join(MonthlyRollup, MonthlyRollup.category_id == Category.id)
+        .filter(MonthlyRollup.type == "expense", MonthlyRollup.user_id == user_id)
+        .group_by(Category.name, MonthlyRollup.currency, MonthlyRollup.year, MonthlyRollup.month)
+        .order_by(Category.name)
+        .all()
+    )
+    totals = convert_sums(((name, currency, month_end(y, m), total)
+                           for name, currency, y, m, total in rows), base_currency(user_id))
+    return list(totals.items())
@@ -0,0 +1,158 @@
+# services/search.py
+"""Full-text search over transaction notes and category names.
+
+The words of each transaction's note and category name are stored lowercased
+in `search_term`, one row per (transaction, word), indexed on (user_id, term).
+Each word of a query matches the terms it is a prefix of, an index range scan;
+a word with no such term falls back to fuzzy matching against the user's
+vocabulary, so small typos still find something. A transaction matches when
+every query word does.
+
+`search_transactions` only narrows a Transaction query, so the page's date
+filters and keyset pagination apply to results unchanged.
+"""
+import re
+from difflib import get_close_matches
+
+from sqlalchemy import and_, false, func, select, true
+
+from extensions import db
+from models import Category, SearchTerm, Transaction
+from services.cache import aggregate_cache
+
+WORD = re.compile(r'\w+')
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 64
+MAX_QUERY_WORDS = 8
+# difflib similarity ratio a vocabulary term needs to count as a typo match
+FUZZY_CUTOFF = 0.75
+FUZZY_MATCHES = 5
+# A word with at most this many postings drives the query instead of filtering it
+DRIVE_LIMIT = 5000
+
+
+def terms(text):
+    """The distinct searchable words of `text`, lowercased."""
+    return {word[:MAX_TERM_LENGTH] for word in WORD.findall((text or '').lower())
+            if len(word) >= MIN_TERM_LENGTH}
+
+
+def _index(condition):
+    """Write postings for the transactions matching `condition`."""
+    rows = (
+        db.session.query(Transaction.id, Transaction.user_id, Transaction.note, Category.name)
+        .join(Category, Transaction.category_id == Category.id)
+        .filter(condition)
+    )
+    postings = [{"transaction_id": t_id, "user_id": user_id, "term": term}
+                for t_id, user_id, note, category in rows
+                for term in terms(note) | terms(category)]
+    if postings:
+        db.session.execute(SearchTerm.__table__.insert(), postings)
+    return len(postings)
+
+
+def index_transactions(transaction_ids):
+    """Index newly written (flushed) transactions. The caller commits."""
+    return _index(Transaction.id.in_(list(transaction_ids))) if transaction_ids else 0
+
+
+def last_transaction_id():
+    """Highest transaction id so far; take it before a bulk insert, then call index_inserted."""
+    return db.session.query(func.max(Transaction.id)).scalar() or 0
+
+
+def index_inserted(after_id, user_ids):
+    """Index the rows a bulk insert just wrote, for inserts that don't hand back their ids.
+
+    `after_id` is last_transaction_id() taken before the insert and `user_ids`
+    the owners of the inserted rows. Only their rows above it that have no
+    postings yet are indexed: a concurrent writer indexes its rows in the same
+    transaction that inserts them, so its rows are either not visible here or
+    already indexed. The caller commits.
+    """
+    indexed = select(SearchTerm.id).where(SearchTerm.transaction_id == Transaction.id)
+    return _index(and_(Transaction.id > after_id, Transaction.user_id.in_(list(user_ids)),
+                       ~indexed.exists()))
+
+
+def unindex_transactions(transaction_ids):
+    """Drop the postings of deleted (or about to be re-indexed) transactions."""
+    if transaction_ids:
+        SearchTerm.query.filter(SearchTerm.transaction_id.in_(list(transaction_ids))).delete(
+            synchronize_session=False)
+
+
+def rebuild_search_index(user_id=None):
+    """Recompute the postings from the transaction table. Commits."""
+    query = SearchTerm.query
+    if user_id is not None:
+        query = query.filter(SearchTerm.user_id == user_id)
+    query.delete(synchronize_session=False)
+    written = _index(true() if user_id is None else Transaction.user_id == user_id)
+    db.session.commit()
+    return written
+
+
+@aggregate_cache.memoize('search_vocabulary')
+def search_vocabulary(user_id):
+    """Every distinct term in a user's notes (for typo matching)."""
+    return [term for (term,) in db.session.query(SearchTerm.term)
+            .filter(SearchTerm.user_id == user_id).distinct()]
+
+
+def _prefix_range(token):
+    # Terms starting with `token` sort between it and its last character + 1
+    return SearchTerm.term >= token, SearchTerm.term < token[:-1] + chr(ord(token[-1]) + 1)
+
+
+def _postings_count(criteria, limit):
+    """Number of postings matching `criteria`, counting no further than `limit`."""
+    matching = select(SearchTerm.id).where(*criteria).limit(limit).subquery()
+    return db.session.query(func.count()).select_from(matching).scalar()
+
+
+def _match(user_id, token):
+    """(criteria on SearchTerm, postings count up to DRIVE_LIMIT + 1) for one query word.
+
+    Criteria are None when neither a prefix nor a typo match exists.
+    """
+    criteria = (SearchTerm.user_id == user_id, *_prefix_range(token))
+    count = _postings_count(criteria, DRIVE_LIMIT + 1)
+    if count:
+        return criteria, count
+
+    close = get_close_matches(token, search_vocabulary(user_id), FUZZY_MATCHES, FUZZY_CUTOFF)
+    if not close:
+        return None, 0
+    criteria = (SearchTerm.user_id == user_id, SearchTerm.term.in_(close))
+    return criteria, _postings_count(criteria, DRIVE_LIMIT + 1)
+
+
+def search_transactions(query, user_id, text):
+    """Narrow a Transaction query to the rows matching every word of `text`.
+
+    Text with no searchable word (see `terms`) matches nothing.
+
+    When the rarest word has few postings, its matches drive the query (a
+    primary key lookup each, then a sort); otherwise the rows are walked in the
+    query's own index order and checked against each word's postings.
+    """
+    matches = []
+    for token in sorted(terms(text), key=len, reverse=True)[:MAX_QUERY_WORDS]:
+        criteria, count = _match(user_id, token)
+        if criteria is None:
+            return query.filter(false())
+        matches.append((count, criteria))
+    if not matches:
+        return query.filter(false())
+
+    matches.sort(key=lambda match: match[0])
+    count, criteria = matches[0]
+    if count <= DRIVE_LIMIT:
+        rarest = select(SearchTerm.transaction_id).where(*criteria).distinct().subquery()
+        query = query.join(rarest, rarest.c.transaction_id == Transaction.id)
+        matches = matches[1:]
+    for _, criteria in matches:
+        query = query.filter(Transaction.id.in_(select(SearchTerm.transaction_id).where(*criteria)))
+    return query
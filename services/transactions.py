@@ -0,0 +1,145 @@
+# services/transactions.py
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, extract, func, or_
+
+from models import Category, Transaction
+from money import DEFAULT_CURRENCY, ZERO
+from services.archive import archived_totals
+from services.cache import aggregate_cache
+from services.fx import base_currency, convert_sums, month_end
+from services.rollup import currencies_in_use
+from services.search import search_transactions
+
+CategoryChoice = namedtuple('CategoryChoice', 'id name')
+
+
+def filter_transactions(query, filter_by, start_date=None, end_date=None, model=Transaction):
+    """Apply the `filter_by` date filters used on the transactions page.
+
+    `model` is the queried table, Transaction or ArchivedTransaction. Raises
+    ValueError when a custom range has a malformed date.
+    """
+    now = datetime.utcnow() + timedelta(hours=5, minutes=45)
+
+    # Half-open ranges on the bare column so (user_id, date) can serve them
+    if filter_by == 'today':
+        start = datetime.combine(now.date(), datetime.min.time())
+        query = query.filter(model.date >= start,
+                             model.date < start + timedelta(days=1))
+
+    elif filter_by == 'month':
+        start = datetime(now.year, now.month, 1)
+        end = datetime(now.year + 1, 1, 1) if now.month == 12 else datetime(now.year, now.month + 1, 1)
+        query = query.filter(model.date >= start, model.date < end)
+
+    elif filter_by == 'custom' and start_date and end_date:
+        start = datetime.strptime(start_date, '%Y-%m-%d')
+        end = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
+        query = query.filter(model.date >= start, model.date < end)
+
+    return query
+
+
+def encode_cursor(transaction):
+    return f"{transaction.date.isoformat()}_{transaction.id}"
+
+
+def decode_cursor(cursor):
+    """Turn a cursor back into (date, id). Raises ValueError if malformed."""
+    when, _, t_id = cursor.rpartition('_')
+    return datetime.fromisoformat(when), int(t_id)
+
+
+def keyset_page(query, cursor=None, page_size=50):
+    """Return one page of `query`, newest first, and the cursor for the next.
+
+    Pages are keyed on (date, id) rather than OFFSET, so fetching page N
+    costs the same as fetching page 1.
+    """
+    if cursor:
+        when, t_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            Transaction.date < when,
+            and_(Transaction.date == when, Transaction.id < t_id),
+        ))
+
+    rows = (
+        query.order_by(Transaction.date.desc(), Transaction.id.desc())
+        .limit(page_size + 1)
+        .all()
+    )
+    next_cursor = encode_cursor(rows[page_size - 1]) if len(rows) > page_size else None
+    return rows[:page_size], next_cursor
+
+
+def totals_for(query, currency=DEFAULT_CURRENCY, mixed=True):
+    """Return (total_income, total_expense) for a filtered transaction query, in `currency`.
+
+    One grouped scan also reports which currencies occur. Only when some are
+    foreign does a second query regroup those rows by month, to convert them
+    at month-end rates; they are taken back out of the first scan's sums,
+    which leaves the amounts already in `currency`. Pass `mixed=False` when
+    every row is known to be in `currency` to skip the check.
+    """
+    columns = [Transaction.type, func.sum(Transaction.amount)]
+    if mixed:
+        columns += [func.min(Transaction.currency), func.max(Transaction.currency)]
+    rows = query.with_entities(*columns).group_by(Transaction.type).all()
+    sums = {row[0]: row[1] for row in rows}
+    if mixed and any(row[2] != currency or row[3] != currency for row in rows):
+        year, month = extract('year', Transaction.date), extract('month', Transaction.date)
+        foreign = (
+            query.filter(Transaction.currency != currency)
+            .with_entities(Transaction.type, Transaction.currency, year, month,
+                           func.sum(Transaction.amount))
+            .group_by(Transaction.type, Transaction.currency, year, month)
+            .all()
+        )
+        converted = []
+        for t_type, code, y, m, total in foreign:
+            sums[t_type] -= total
+            converted.append((t_type, code, month_end(int(y), int(m)), total))
+        sums = convert_sums([*((t_type, currency, None, total) for t_type, total in sums.items()),
+                             *converted], currency)
+    return sums.get('income') or ZERO, sums.get('expense') or ZERO
+
+
+@aggregate_cache.memoize('transaction_totals', daily=True)
+def filtered_totals(user_id, filter_by, start_date=None, end_date=None, q=None, t_type=None):
+    """Cached (total_income, total_expense) for one of the page's filters, in the base currency.
+
+    With a search `q`, only the transactions it matches count, as in the list;
+    with `t_type` ('income' or 'expense') the other total is zero.
+    """
+    query = filter_transactions(Transaction.query.filter_by(user_id=user_id),
+                                filter_by, start_date, end_date)
+    if t_type:
+        query = query.filter(Transaction.type == t_type)
+    if q:
+        query = search_transactions(query, user_id, q)
+    base = base_currency(user_id)
+    income, expense = totals_for(query, base, mixed=bool(currencies_in_use(user_id) - {base}))
+    dated = filter_by in ('today', 'month') or (filter_by == 'custom' and start_date and end_date)
+    if not dated and not q:
+        # All-time totals include the archived years, read from their summary rows
+        # (archived transactions are not searchable, so searches leave them out)
+        archived_income, archived_expense = archived_totals(user_id, base)
+        if t_type != 'expense':
+            income += archived_income
+        if t_type != 'income':
+            expense += archived_expense
+    return income, expense
+
+
+@aggregate_cache.memoize('category_choices')
+def category_choices(user_id):
+    """The global and the user's own categories, as (id, name) pairs."""
+    rows = (
+        Category.query
+        .filter((Category.user_id == None) | (Category.user_id == user_id))
+        .with_entities(Category.id, Category.name)
+        .all()
+    )
+    return [CategoryChoice(c_id, name) for c_id, name in rows]
@@ -0,0 +1,98 @@
+# tests/conftest.py
+# Each test gets a fresh app on an in-memory SQLite database:
+#
+#   python -m pytest -q
+import csv
+import io
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from app import create_app
+from config import engine_options
+from extensions import db
+
+TEST_DATABASE_URL = 'sqlite://'
+
+
+def make_app(**overrides):
+    settings = {
+        'TESTING': True,
+        'SECRET_KEY': 'test',
+        'SQLALCHEMY_DATABASE_URI': TEST_DATABASE_URL,
+        'SQLALCHEMY_ENGINE_OPTIONS': engine_options(TEST_DATABASE_URL, {}),
+        'SQLALCHEMY_BINDS': {},
+        'AGGREGATE_CACHE_BACKEND': 'local',
+        'SQL_PROFILING': False,
+    }
+    settings.update(overrides)
+    app = create_app(settings)
+    with app.app_context():
+        from migrations import init_db
+        init_db()
+    return app
+
+
+@pytest.fixture
+def app():
+    app = make_app()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()  # an in-memory database goes with its connection
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def create_user(username='asha', role='user'):
+    """Add a user and return its id. Needs an app context."""
+    from models import User
+
+    user = User(username=username, email=f"{username}@gmail.com",
+                password=generate_password_hash('secret'), role=role)
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+def login(client, user_id):
+    """Log `client` in as `user_id` the way the login view does, without the password form."""
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+        session['user_id'] = user_id
+
+
+@pytest.fixture
+def user_id(app):
+    with app.app_context():
+        return create_user()
+
+
+def import_rows(user_id, rows):
+    """Write transactions through the statement importer, which keeps every derived
+    table up to date. `rows` are dicts with date, amount, type, category and note
+    (and optionally currency). Needs an app context; returns the ImportReport.
+    """
+    from services.importer import import_transactions
+
+    out = io.StringIO()
+    writer = csv.DictWriter(out, ['date', 'amount', 'type', 'category', 'note', 'currency'])
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(dict(row, date=f"{row['date']:%Y-%m-%d %H:%M}"))
+    out.seek(0)
+    return import_transactions(out, user_id)
+
+
+def ledger_rows(user_id):
+    """The user's daily_balance rows as (currency, day, income, expense, balance), in order."""
+    from models import DailyBalance
+
+    return [(r.currency, r.day, r.income, r.expense, r.balance) for r in
+            DailyBalance.query.filter_by(user_id=user_id)
+            .order_by(DailyBalance.currency, DailyBalance.day)]
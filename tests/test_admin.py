@@ -0,0 +1,80 @@
+# tests/test_admin.py
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from extensions import db
+from models import ContactMessage, FxRate
+from services.admin import messages_page, site_counters, users_page
+from services.fx import fx_rates
+from tests.conftest import create_user, import_rows, login
+
+
+@pytest.fixture
+def users(app, user_id):
+    with app.app_context():
+        db.session.add_all([FxRate(currency='USD', date=date(2025, 1, 1), rate=130),
+                            FxRate(currency='USD', date=date(2025, 3, 1), rate=135)])
+        db.session.commit()
+        fx_rates.invalidate()
+        bina, cara = create_user('bina'), create_user('cara_100%', role='admin')
+        import_rows(user_id, [
+            {'date': datetime(2025, 1, 5), 'amount': '100', 'type': 'income',
+             'category': 'Salary', 'note': 'pay'},
+            {'date': datetime(2025, 2, 5), 'amount': '50', 'type': 'expense',
+             'category': 'Food', 'note': 'food'},
+            {'date': datetime(2025, 2, 9), 'amount': '10', 'type': 'expense',
+             'category': 'Travel', 'note': 'taxi', 'currency': 'USD'},
+        ])
+        import_rows(bina, [{'date': datetime(2025, 3, 1), 'amount': '20', 'type': 'expense',
+                            'category': 'Food', 'note': 'tea'}])
+        return {'asha': user_id, 'bina': bina, 'cara_100%': cara}
+
+
+def _rows(page):
+    return [(user.username, count, volume, last) for user, count, volume, last in page.items]
+
+
+def test_users_page_stats_from_the_rollup(app, users):
+    with app.app_context():
+        page = users_page(per_page=10)
+        assert page.total == 3
+        # Volume counts foreign amounts at their latest rate
+        assert _rows(page) == [('asha', 3, Decimal('1500'), datetime(2025, 2, 9)),
+                               ('bina', 1, Decimal('20'), datetime(2025, 3, 1)),
+                               ('cara_100%', 0, Decimal('0'), None)]
+        assert site_counters() == (3, 1, 0)
+
+
+def test_users_page_sorts_searches_and_pages(app, users):
+    with app.app_context():
+        by_volume = users_page(sort='volume', direction='desc', per_page=2)
+        assert [row[0] for row in _rows(by_volume)] == ['asha', 'bina']
+        assert (by_volume.total, by_volume.pages) == (3, 2)
+        second = users_page(sort='transactions', direction='desc', page=2, per_page=2)
+        assert [row[0] for row in _rows(second)] == ['cara_100%']
+
+        # Stats are the same whichever way the page was sorted
+        assert _rows(users_page(sort='username', direction='desc', per_page=1)) == [
+            ('cara_100%', 0, Decimal('0'), None)]
+        assert [row[0] for row in _rows(users_page(q='_100%'))] == ['cara_100%']
+        assert users_page(q='a%a').total == 0  # wildcards are matched literally
+        assert [row[0] for row in _rows(users_page(sort='nonsense'))] == ['asha', 'bina',
+                                                                          'cara_100%']
+
+
+def test_admin_tables_render_for_admins_only(app, client, users):
+    with app.app_context():
+        db.session.add(ContactMessage(name='Ram', email='ram@gmail.com', message='hello there',
+                                      date_sent=datetime(2025, 3, 3)))
+        db.session.commit()
+        assert [m.name for m in messages_page(q='HELLO').items] == ['Ram']
+
+    login(client, users['asha'])
+    assert client.get('/admin/users').status_code == 302
+    login(client, users['cara_100%'])
+    for url in ('/admin', '/admin/users?sort=volume&direction=desc&q=a', '/admin/messages?q=ram'):
+        response = client.get(url)
+        assert response.status_code == 200, url
+    assert b'bina' in client.get('/admin/users?sort=transactions').data
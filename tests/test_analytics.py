@@ -0,0 +1,65 @@
+# tests/test_analytics.py
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+
+from services.analytics import (bucket, forecast, period_over_period, rolling_mean,
+                                spending_analytics)
+from tests.conftest import import_rows, login
+
+TODAY = date(2025, 4, 15)
+
+
+@pytest.fixture
+def history(app, user_id):
+    rows = [('2025-01-05', 'income', 'Salary', '1000'), ('2025-01-20', 'expense', 'Food', '200'),
+            ('2025-01-21', 'expense', 'Travel', '50'), ('2025-03-02', 'income', 'Salary', '1000'),
+            ('2025-03-09', 'expense', 'Food', '300.50'), ('2025-04-01', 'expense', 'Food', '100'),
+            ('2025-05-01', 'expense', 'Food', '999')]  # after today: left out
+    with app.app_context():
+        import_rows(user_id, [{'date': datetime.fromisoformat(day), 'amount': amount,
+                               'type': t_type, 'category': category, 'note': f'{day} {category}'}
+                              for day, t_type, category, amount in rows])
+
+
+def test_array_helpers_match_their_loops():
+    days = np.array(['2025-04-13', '2025-04-14', '2025-04-20'], dtype='datetime64[D]')
+    assert bucket(days, 'week').tolist() == [date(2025, 4, 7), date(2025, 4, 14), date(2025, 4, 14)]
+    assert bucket(days, 'month').astype('datetime64[D]').tolist() == [date(2025, 4, 1)] * 3
+
+    values = np.array([4.0, 8.0, 0.0, 2.0])
+    assert rolling_mean(values, 2).tolist() == [4.0, 6.0, 4.0, 1.0]
+    delta, pct = period_over_period(values)
+    assert np.isnan(delta[0]) and delta[1:].tolist() == [4.0, -8.0, 2.0]
+    assert pct[1:3].tolist() == [100.0, -100.0] and np.isnan(pct[3])  # nothing to compare with 0
+
+    assert forecast(np.array([1.0, 2.0, 3.0]), 2).tolist() == pytest.approx([4.0, 5.0])
+    level = values[0]
+    for value in values[1:]:
+        level = 0.5 * value + 0.5 * level
+    assert forecast(values, 2, 'smoothing').tolist() == [level, level]
+
+
+def test_monthly_trends_cover_every_month_through_today(app, user_id, history):
+    with app.app_context():
+        trends = spending_analytics(user_id, today=TODAY)
+
+    assert trends['transactions'] == 7
+    assert trends['labels'] == ['2025-01-01', '2025-02-01', '2025-03-01', '2025-04-01']
+    assert trends['income'] == [1000.0, 0.0, 1000.0, 0.0]
+    assert trends['expense'] == [250.0, 0.0, 300.5, 100.0]
+    assert trends['balance'] == [750.0, 750.0, 1449.5, 1349.5]
+    assert trends['expense_rolling_avg'] == [250.0, 125.0, 183.5, 133.5]
+    assert trends['top_categories'] == [{'name': 'Food', 'total': 600.5, 'share': 92.3},
+                                        {'name': 'Travel', 'total': 50.0, 'share': 7.7}]
+    # Fitted on January to March, projected from April on
+    assert trends['forecast']['labels'] == ['2025-04-01', '2025-05-01', '2025-06-01']
+
+
+def test_trends_endpoint_rejects_bad_arguments(app, client, user_id, history):
+    login(client, user_id)
+    response = client.get('/api/v1/summary/trends?freq=week&periods=4')
+    assert response.status_code == 200 and len(response.json['labels']) == 4
+    assert client.get('/api/v1/summary/trends?freq=hour').status_code == 400
+    assert client.get('/api/v1/summary/trends?horizon=99').status_code == 400
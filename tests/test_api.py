@@ -0,0 +1,58 @@
+# tests/test_api.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.archive import archive_transactions
+from tests.conftest import import_rows, login
+
+
+@pytest.fixture
+def history(app, user_id):
+    now = datetime.utcnow() + timedelta(hours=5, minutes=45)
+    old = now - timedelta(days=5 * 366)
+    with app.app_context():
+        import_rows(user_id, [
+            {'date': now, 'amount': '1000', 'type': 'income', 'category': 'Salary', 'note': 'pay'},
+            {'date': now, 'amount': '40', 'type': 'expense', 'category': 'Food', 'note': 'lunch'},
+            {'date': old, 'amount': '700', 'type': 'income', 'category': 'Salary', 'note': 'old pay'},
+            {'date': old, 'amount': '60', 'type': 'expense', 'category': 'Food', 'note': 'old lunch'},
+        ])
+        assert archive_transactions(keep_years=2) == 2
+
+
+def test_transaction_totals_follow_the_type_filter(client, user_id, history):
+    login(client, user_id)
+
+    def totals(query=''):
+        body = client.get(f'/api/v1/transactions{query}').json
+        return [t['type'] for t in body['transactions']], body['totals']
+
+    types, all_time = totals()
+    assert sorted(types) == ['expense', 'income']
+    assert (all_time['income'], all_time['expense']) == (1700, 100)
+
+    types, income = totals('?type=income')
+    assert types == ['income']
+    assert (income['income'], income['expense']) == (1700, 0)
+
+    types, expense = totals('?type=expense&filter_by=month')
+    assert types == ['expense']
+    assert (expense['income'], expense['expense']) == (0, 40)
+
+    # Unknown types are ignored, for the rows and the totals alike
+    assert totals('?type=refund')[1] == all_time
+
+
+def test_responses_carry_an_etag_and_revalidate(client, user_id, history):
+    login(client, user_id)
+    for url in ('/api/v1/summary', '/api/v1/transactions?type=income', '/api/v1/budgets'):
+        first = client.get(url)
+        assert first.status_code == 200 and first.headers['ETag']
+        again = client.get(url, headers={'If-None-Match': first.headers['ETag']})
+        assert again.status_code == 304 and again.data == b''
+
+
+def test_api_needs_a_login(client):
+    response = client.get('/api/v1/summary')
+    assert response.status_code == 401
@@ -0,0 +1,138 @@
+# tests/test_budgets.py
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from extensions import db
+from models import Budget, BudgetSpend, Category, Notification
+from services.archive import archive_transactions
+from services.budgets import budget_progress, current_window, spent_in_windows
+from tests.conftest import create_user, import_rows, login
+
+
+def _today():
+    return (datetime.utcnow() + timedelta(hours=5, minutes=45)).date()
+
+
+def _food(app):
+    with app.app_context():
+        return Category.query.filter_by(name='Food', user_id=None).one().id
+
+
+def test_weekly_budget_with_start_and_end_dates(app, client, user_id):
+    login(client, user_id)
+    food = _food(app)
+    today = _today()
+    start, end = today - timedelta(days=10), today + timedelta(days=30)
+
+    response = client.post('/add_transaction', data={
+        'amount': '500', 'type': 'expense', 'category_id': food, 'note': 'groceries'})
+    assert response.status_code == 302
+
+    response = client.post('/add_budget', data={
+        'name': 'Groceries', 'amount': '1000', 'period': 'Weekly', 'category': 'Food',
+        'start_date': start.isoformat(), 'end_date': end.isoformat()})
+    assert response.status_code == 302
+
+    with app.app_context():
+        budget = Budget.query.filter_by(user_id=user_id).one()
+        assert budget.start_date == start
+        assert budget.end_date == end
+        spend = BudgetSpend.query.filter_by(budget_id=budget.id).one()
+        # The budget rolls weekly from its start date: the current week began 7 days in
+        assert spend.window_start == start + timedelta(weeks=1)
+        assert spend.spent == Decimal('500')
+        assert [n.threshold for n in Notification.query.filter_by(budget_id=budget.id)] == [50]
+
+    assert client.get('/budgets').status_code == 200
+
+
+def test_budget_window_stops_at_end_date(app, client, user_id):
+    login(client, user_id)
+    today = _today()
+
+    response = client.post('/add_budget', data={
+        'name': 'Trip', 'amount': '200', 'period': 'Monthly', 'category': 'Travel',
+        'start_date': (today - timedelta(days=3)).isoformat(), 'end_date': today.isoformat()})
+    assert response.status_code == 302
+
+    with app.app_context():
+        budget = Budget.query.filter_by(user_id=user_id).one()
+        assert current_window(budget, today) == (today - timedelta(days=3), today + timedelta(days=1))
+
+
+def test_budget_spend_adds_up_and_resets_each_period(app, user_id):
+    from extensions import db
+    from services.alerts import record_expenses
+
+    food = _food(app)
+    with app.app_context():
+        budget = Budget(name='Food', amount=Decimal('1000'), period='Monthly',
+                        start_date=datetime(2026, 1, 1).date(), user_id=user_id,
+                        category_id=food)
+        db.session.add(budget)
+        db.session.commit()
+
+        def spend(day, amount):
+            record_expenses([{'type': 'expense', 'user_id': user_id, 'category_id': food,
+                              'date': day, 'amount': Decimal(amount)}], today=day.date())
+            db.session.commit()
+            return [(row.window_start, row.spent)
+                    for row in BudgetSpend.query.filter_by(budget_id=budget.id)]
+
+        # The first write of a period inserts the row, later ones add to it
+        assert spend(datetime(2026, 3, 5), '100') == [(datetime(2026, 3, 1).date(), Decimal('100'))]
+        assert spend(datetime(2026, 3, 9), '50') == [(datetime(2026, 3, 1).date(), Decimal('150'))]
+        # The first write of the next period starts the row over
+        assert spend(datetime(2026, 4, 2), '30') == [(datetime(2026, 4, 1).date(), Decimal('30'))]
+
+
+def test_spent_in_windows_counts_each_budgets_own_expenses(app, user_id):
+    with app.app_context():
+        other = create_user('bina')
+        rows = [('Food', 'expense', datetime(2025, 5, 3), '100'),
+                ('Food', 'expense', datetime(2025, 5, 31, 23, 59), '50'),
+                ('Food', 'expense', datetime(2025, 6, 1), '7'),      # next period
+                ('Food', 'income', datetime(2025, 5, 4), '9'),       # not an expense
+                ('Travel', 'expense', datetime(2019, 3, 2), '75'),   # archived below
+                ('Travel', 'expense', datetime(2019, 3, 9), '8')]    # after the window
+        import_rows(user_id, [{'date': day, 'amount': amount, 'type': t_type,
+                               'category': category, 'note': f'{category} {amount}'}
+                              for category, t_type, day, amount in rows])
+        import_rows(other, [{'date': datetime(2025, 5, 3), 'amount': '1000', 'type': 'expense',
+                             'category': 'Food', 'note': 'not mine'}])
+        assert archive_transactions(keep_years=2) == 2
+
+        ids = {c.name: c.id for c in Category.query.filter_by(user_id=None)}
+        food, travel, rent = (Budget(name=name, amount=Decimal('500'), period=period,
+                                     user_id=user_id, category_id=ids[category])
+                              for name, period, category in (('Food', 'Monthly', 'Food'),
+                                                             ('Trip', None, 'Travel'),
+                                                             ('Rent', 'Monthly', 'Other')))
+        db.session.add_all([food, travel, rent])
+        db.session.commit()
+
+        windows = {food.id: (date(2025, 5, 1), date(2025, 6, 1)),
+                   travel.id: (date(2019, 3, 1), date(2019, 3, 8)),
+                   rent.id: (date(2025, 5, 1), date(2025, 6, 1))}
+        assert sorted(spent_in_windows(user_id, [food, travel, rent], windows)) == sorted([
+            (food.id, 'NPR', Decimal('150')), (travel.id, 'NPR', Decimal('75'))])
+
+
+def test_budget_progress_reads_the_running_totals(app, client, user_id):
+    login(client, user_id)
+    today = _today()
+    with app.app_context():
+        import_rows(user_id, [{'date': datetime.combine(today, datetime.min.time()),
+                               'amount': amount, 'type': 'expense', 'category': category,
+                               'note': category} for category, amount in (('Food', '300'),
+                                                                          ('Travel', '80'))])
+    for name, category in (('Groceries', 'Food'), ('Trips', 'Travel'), ('Rent', 'Other')):
+        client.post('/add_budget', data={'name': name, 'amount': '200', 'period': 'Monthly',
+                                         'category': category})
+
+    with app.app_context():
+        budgets = Budget.query.filter_by(user_id=user_id).order_by(Budget.id).all()
+        progress = budget_progress(user_id, budgets, today)
+        assert [(p['spent'], p['progress'], p['exceeded']) for p in progress] == [
+            (Decimal('300'), 150, True), (Decimal('80'), 40, False), (Decimal('0'), 0, False)]
+    assert client.get('/budgets').status_code == 200
@@ -0,0 +1,103 @@
+# tests/test_bulk.py
+from datetime import datetime
+
+import pytest
+
+from extensions import db
+from models import Category, MonthlyRollup, Transaction
+from services.ledger import rebuild_ledger
+from services.rollup import rebuild_rollups
+from tests.conftest import create_user, import_rows, ledger_rows, login
+
+BULK_UPDATE, BULK_DELETE = '/api/v1/transactions/bulk-update', '/api/v1/transactions/bulk-delete'
+
+
+@pytest.fixture
+def owners(app, user_id):
+    with app.app_context():
+        other = create_user('bina')
+        for owner in (user_id, other):
+            import_rows(owner, [
+                {'date': datetime(2025, month, 3), 'amount': f'{month}0', 'type': t_type,
+                 'category': category, 'note': f'{note} {month}'}
+                for month in (1, 2, 3)
+                for t_type, category, note in (('expense', 'Food', 'lunch'),
+                                               ('income', 'Salary', 'pay'))
+            ])
+        private = Category(name='Secret', type='expense', user_id=other)
+        db.session.add(private)
+        db.session.commit()
+        ids = lambda owner: [t.id for t in Transaction.query.filter_by(user_id=owner)
+                             .order_by(Transaction.date, Transaction.id)]
+        return {'mine': ids(user_id), 'theirs': ids(other), 'other': other,
+                'private_category': private.id}
+
+
+def _snapshot(owner):
+    rollup = sorted((r.year, r.month, r.category_id, r.type, r.total, r.count)
+                    for r in MonthlyRollup.query.filter_by(user_id=owner))
+    notes = sorted((t.id, t.type, t.category_id, t.note)
+                   for t in Transaction.query.filter_by(user_id=owner))
+    return rollup, ledger_rows(owner), notes
+
+
+def _matches_rebuild(app, owner):
+    with app.app_context():
+        rollup, ledger, _ = _snapshot(owner)
+        rebuild_rollups(owner)
+        rebuild_ledger(owner)
+        assert (rollup, ledger) == _snapshot(owner)[:2]
+
+
+def test_bulk_endpoints_skip_another_users_rows(app, client, user_id, owners):
+    login(client, user_id)
+    with app.app_context():
+        theirs = _snapshot(owners['other'])
+    mixed = owners['mine'][:2] + owners['theirs']
+
+    response = client.post(BULK_UPDATE, json={'ids': mixed, 'set': {'note': 'mine now'}})
+    assert response.json == {'updated': 2}
+    response = client.post(BULK_UPDATE, json={'ids': owners['mine'][:1],
+                                              'set': {'category_id': owners['private_category']}})
+    assert response.status_code == 400 and response.json == {'error': 'Unknown category'}
+    assert client.post(BULK_DELETE, json={'ids': owners['theirs']}).json == {'deleted': 0}
+
+    with app.app_context():
+        assert _snapshot(owners['other']) == theirs
+
+
+def test_bulk_changes_keep_rollup_and_ledger_in_step(app, client, user_id, owners):
+    login(client, user_id)
+    with app.app_context():
+        travel = Category.query.filter_by(name='Travel', user_id=None).one().id
+
+    # Reassign January-February lunches, turn March's pay into an expense
+    response = client.post(BULK_UPDATE, json={
+        'filter': {'note': 'lunch', 'end_date': '2025-02-28'}, 'set': {'category_id': travel}})
+    assert response.json == {'updated': 2}
+    _matches_rebuild(app, user_id)
+    response = client.post(BULK_UPDATE, json={
+        'filter': {'type': 'income', 'start_date': '2025-03-01'}, 'set': {'type': 'expense'}})
+    assert response.json == {'updated': 1}
+    _matches_rebuild(app, user_id)
+
+    response = client.post(BULK_DELETE, json={'filter': {'start_date': '2025-02-01',
+                                                         'end_date': '2025-02-28'}})
+    assert response.json == {'deleted': 2}
+    _matches_rebuild(app, user_id)
+    with app.app_context():
+        assert [row[-1] for row in ledger_rows(user_id)] == [0, -60]
+
+
+def test_bulk_requests_are_validated(app, client, user_id, owners):
+    login(client, user_id)
+    for url, body in ((BULK_DELETE, {}), (BULK_DELETE, {'filter': {}}),
+                      (BULK_DELETE, {'filter': {'owner': 1}}), (BULK_DELETE, {'ids': []}),
+                      (BULK_DELETE, {'filter': {'start_date': '03/01/2025'}}),
+                      (BULK_UPDATE, {'ids': owners['mine'], 'set': {}}),
+                      (BULK_UPDATE, {'ids': owners['mine'], 'set': {'amount': 1}}),
+                      (BULK_UPDATE, {'ids': owners['mine'], 'set': {'type': 'gift'}})):
+        response = client.post(url, json=body)
+        assert response.status_code == 400, body
+    with app.app_context():
+        assert Transaction.query.filter_by(user_id=user_id).count() == 6
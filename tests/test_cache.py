@@ -0,0 +1,148 @@
+# tests/test_cache.py
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from extensions import db
+from models import Budget, Category
+from services.cache import AggregateCache, DictClient, LocalBackend, SharedBackend, _MISSING
+from tests.conftest import login, make_app
+
+
+@contextmanager
+def count_queries(app):
+    with app.app_context():
+        engine = db.engine
+    counted = []
+
+    def count(conn, cursor, statement, *args):
+        counted.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        yield counted
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+
+def test_local_backend_evicts_least_recently_used():
+    backend = LocalBackend(maxsize=2, ttl=60)
+    backend.set('a', 1)
+    backend.set('b', 2)
+    assert backend.get('a') == 1  # 'b' is now the oldest
+    backend.set('c', 3)
+    assert backend.get('b') is _MISSING
+    assert backend.get('a') == 1 and backend.get('c') == 3
+
+
+def test_local_backend_expires_entries(monkeypatch):
+    backend = LocalBackend(ttl=10)
+    backend.set('a', 1)
+    backend.incr('gen')
+    now = time.monotonic()
+    monkeypatch.setattr(time, 'monotonic', lambda: now + 11)
+    assert backend.get('a') is _MISSING
+    assert backend.counter('gen') == 1  # generation counters don't expire
+
+
+def test_invalidation_is_per_user_and_aggregate():
+    cache = AggregateCache(LocalBackend())
+    calls = []
+
+    @cache.memoize('totals')
+    def totals(user_id, scale=1):
+        calls.append(user_id)
+        return user_id * scale
+
+    assert [totals(1), totals(1), totals(2), totals(1, scale=3), totals(1, scale=3)] == [1, 1, 2, 3, 3]
+    assert calls == [1, 2, 1]
+    assert cache.stats() == {'totals': {'hits': 2, 'misses': 3}}
+
+    cache.invalidate(1, ['totals'])
+    totals(1), totals(1, scale=3), totals(2)
+    assert calls == [1, 2, 1, 1, 1]
+
+    cache.invalidate(1, ['something else'])
+    totals(1)
+    assert calls == [1, 2, 1, 1, 1]
+
+
+def test_generation_counters_survive_eviction():
+    cache = AggregateCache(LocalBackend(maxsize=3, ttl=60))
+    values = {1: 'old', 2: 'two', 3: 'three'}
+
+    @cache.memoize('totals')
+    def totals(user_id):
+        return values[user_id]
+
+    cache.invalidate(1, ['totals'])
+    totals(1), totals(2), totals(1), totals(3)  # the cache is full; user 1 read recently
+
+    values[1] = 'new'
+    cache.invalidate(1, ['totals'])
+    # A counter evicted back to 0 would come round to the 'old' entry again
+    assert totals(1) == 'new'
+
+
+def test_shared_backend_invalidates_across_processes():
+    client = DictClient()
+    web, worker = AggregateCache(SharedBackend(client)), AggregateCache(SharedBackend(client))
+    value = {'n': 1}
+    compute = lambda: dict(value)
+
+    assert web.get_or_compute(7, 'totals', (), compute) == {'n': 1}
+    value['n'] = 2
+    assert worker.get_or_compute(7, 'totals', (), compute) == {'n': 1}  # served from the shared copy
+    worker.invalidate(7, ['totals'])
+    assert web.get_or_compute(7, 'totals', (), compute) == {'n': 2}
+    assert (web.hits['totals'], web.misses['totals']) == (0, 2)
+
+
+def test_shared_backend_is_configured_from_settings():
+    client = DictClient()
+    app = make_app(AGGREGATE_CACHE_BACKEND='shared', AGGREGATE_CACHE_CLIENT=client)
+    cache = app.extensions['aggregate_cache']
+    assert isinstance(cache.backend, SharedBackend) and cache.backend.client is client
+    assert make_app(AGGREGATE_CACHE_BACKEND='none').extensions['aggregate_cache'].enabled is False
+
+
+def test_repeat_views_skip_sql_until_a_write(app, client, user_id):
+    login(client, user_id)
+    with app.app_context():
+        food = Category.query.filter_by(name='Food', user_id=None).one().id
+    client.post('/add_transaction', data={'amount': '40', 'type': 'expense', 'category_id': food})
+
+    assert client.get('/api/v1/summary/categories').json['categories'] == [
+        {'name': 'Food', 'amount': 40.0}]
+    with count_queries(app) as queries:
+        client.get('/api/v1/summary/categories')
+    assert queries == []
+
+    # add_transaction invalidates the aggregates it changed
+    client.post('/add_transaction', data={'amount': '2.50', 'type': 'expense', 'category_id': food})
+    assert client.get('/api/v1/summary/categories').json['categories'] == [
+        {'name': 'Food', 'amount': 42.5}]
+
+
+def test_category_and_budget_writes_invalidate(app, client, user_id):
+    login(client, user_id)
+    client.get('/transactions')
+    client.post('/add_category', data={'name': 'Pets', 'type': 'expense'})
+    assert b'Pets' in client.get('/transactions').data
+
+    client.post('/add_budget', data={'name': 'Food', 'amount': '100', 'period': 'Monthly',
+                                     'category': 'Food'})
+    with app.app_context():
+        food = Category.query.filter_by(name='Food', user_id=None).one().id
+        budget_id = Budget.query.filter_by(user_id=user_id).one().id
+
+    def budget():
+        [item] = client.get('/api/v1/budgets').json['budgets']
+        return item['amount'], item['spent'], item['progress']
+
+    assert budget() == (100.0, 0.0, 0)
+    client.post('/add_transaction', data={'amount': '30', 'type': 'expense', 'category_id': food})
+    assert budget() == (100.0, 30.0, 30)
+    client.post(f'/edit_budget/{budget_id}', data={'name': 'Food', 'amount': '60', 'period': 'Monthly'})
+    assert budget() == (60.0, 30.0, 50)
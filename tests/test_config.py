@@ -0,0 +1,34 @@
+# tests/test_config.py
+from config import database_url, engine_options, settings_from_env
+
+
+def test_database_url_prefers_database_url():
+    assert database_url({'DATABASE_URL': 'sqlite:///x.db', 'DB_NAME': 'ignored'}) == 'sqlite:///x.db'
+    assert database_url({'DB_USER': 'u', 'DB_PASSWORD': 'p', 'DB_HOST': 'db', 'DB_NAME': 'money'}) == (
+        'mysql+pymysql://u:p@db/money')
+
+
+def test_pool_settings_come_from_the_environment():
+    options = engine_options('mysql+pymysql://u:p@db/money', {
+        'DB_POOL_SIZE': '20', 'DB_MAX_OVERFLOW': '5', 'DB_POOL_TIMEOUT': '3',
+        'DB_POOL_RECYCLE': '600', 'DB_POOL_PRE_PING': '0', 'DB_STATEMENT_TIMEOUT_MS': '2500'})
+    assert options == {
+        'pool_size': 20, 'max_overflow': 5, 'pool_timeout': 3, 'pool_recycle': 600,
+        'pool_pre_ping': False,
+        'connect_args': {'init_command': 'SET SESSION max_execution_time=2500'},
+    }
+
+
+def test_sqlite_gets_a_busy_timeout_and_memory_databases_no_pool():
+    assert engine_options('sqlite://', {}) == {'connect_args': {'timeout': 5.0}}
+    options = engine_options('sqlite:///money.db', {'DB_STATEMENT_TIMEOUT_MS': '250'})
+    assert options['connect_args'] == {'timeout': 0.25}
+    assert options['pool_size'] == 5 and options['pool_pre_ping'] is True
+
+
+def test_replica_bind_is_configured_only_when_given():
+    assert settings_from_env({'DATABASE_URL': 'sqlite:///a.db'})['SQLALCHEMY_BINDS'] == {}
+    settings = settings_from_env({'DATABASE_URL': 'sqlite:///a.db',
+                                  'DATABASE_REPLICA_URL': 'sqlite:///b.db', 'DB_POOL_SIZE': '2'})
+    replica = settings['SQLALCHEMY_BINDS']['replica']
+    assert replica['url'] == 'sqlite:///b.db' and replica['pool_size'] == 2
@@ -0,0 +1,59 @@
+# tests/test_export.py
+import csv
+import gzip
+import io
+from datetime import datetime
+
+import pytest
+
+from services.archive import archive_transactions
+from services.importer import import_transactions
+from tests.conftest import create_user, import_rows, login
+
+
+@pytest.fixture
+def history(app, user_id):
+    with app.app_context():
+        import_rows(user_id, [
+            {'date': datetime(2025, 5, 2, 9), 'amount': '120.50', 'type': 'expense',
+             'category': 'Food', 'note': 'groceries'},
+            {'date': datetime(2025, 5, 1, 9), 'amount': '5000', 'type': 'income',
+             'category': 'Salary', 'note': 'may pay'},
+            {'date': datetime(2019, 3, 4, 9), 'amount': '75', 'type': 'expense',
+             'category': 'Travel', 'note': 'old bus pass'},
+            {'date': datetime(2019, 3, 1, 9), 'amount': '4000', 'type': 'income',
+             'category': 'Salary', 'note': 'old pay'},
+        ])
+        assert archive_transactions(keep_years=2) == 2
+
+
+def _rows(data):
+    return [row[1:] for row in csv.reader(io.StringIO(data))]  # IDs differ between tables
+
+
+def test_export_includes_archived_rows_newest_first(app, client, user_id, history):
+    login(client, user_id)
+    response = client.get('/export_transactions')
+    assert response.status_code == 200 and 'Content-Encoding' not in response.headers
+    assert _rows(response.get_data(as_text=True)) == [
+        ['Date', 'Type', 'Amount', 'Currency', 'Category', 'Note'],
+        ['2025-05-02 09:00', 'Expense', '120.50', 'NPR', 'Food', 'groceries'],
+        ['2025-05-01 09:00', 'Income', '5000.00', 'NPR', 'Salary', 'may pay'],
+        ['2019-03-04 09:00', 'Expense', '75.00', 'NPR', 'Travel', 'old bus pass'],
+        ['2019-03-01 09:00', 'Income', '4000.00', 'NPR', 'Salary', 'old pay'],
+    ]
+
+    income = client.get('/export_transactions?type=income').get_data(as_text=True)
+    assert [row[-1] for row in _rows(income)[1:]] == ['may pay', 'old pay']
+
+
+def test_gzipped_export_imports_back(app, client, user_id, history):
+    login(client, user_id)
+    response = client.get('/export_transactions', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    data = gzip.decompress(response.get_data()).decode('utf-8')
+    assert len(_rows(data)) == 5
+
+    with app.app_context():
+        report = import_transactions(io.StringIO(data), create_user('bina'))
+    assert (report.inserted, report.error_count) == (4, 0)
@@ -0,0 +1,65 @@
+# tests/test_fx.py
+import io
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from services.fx import convert_sums, fx_rates, load_rates
+from tests.conftest import import_rows, login
+
+RATES = """currency,date,rate
+USD,2025-01-01,130
+usd,2025-02-01,135
+EUR,2025-01-15,140
+NPR,2025-01-01,2
+"""
+
+
+@pytest.fixture
+def rates(app):
+    with app.app_context():
+        assert load_rates(io.StringIO(RATES)) == 3  # NPR is always 1
+
+
+def test_a_rate_applies_until_the_next_one(app, rates):
+    days = ['2024-12-01', '2025-01-01', '2025-01-20', '2025-01-31', '2025-02-01', '2026-06-01']
+    with app.app_context():
+        assert fx_rates.currencies() == ['EUR', 'NPR', 'USD']
+        # Before the first rate that rate is used; between two the earlier one
+        assert fx_rates.rates(['USD'] * 6, days).tolist() == [130, 130, 130, 130, 135, 135]
+        assert fx_rates.rates(['NPR', 'EUR'], ['2025-01-20', '2025-01-01']).tolist() == [1, 140]
+        with pytest.raises(LookupError):
+            fx_rates.rates(['GBP'], ['2025-01-20'])
+
+
+def test_conversion_between_currencies_and_dates(app, rates):
+    with app.app_context():
+        # 10.00 USD in NPR on Jan 20th (130) and Feb 2nd (135); 1.00 EUR in USD on Jan 20th
+        assert fx_rates.convert([1000, 1000, 100], ['USD', 'USD', 'EUR'],
+                                ['2025-01-20', '2025-02-02', '2025-01-20'],
+                                ['NPR', 'NPR', 'USD']).tolist() == [130000, 135000, 108]
+        assert convert_sums([('a', 'USD', date(2025, 1, 20), Decimal('10')),
+                             ('a', 'NPR', date(2025, 1, 20), Decimal('5.50')),
+                             ('b', 'NPR', date(2025, 1, 20), Decimal('270'))],
+                            {'a': 'NPR', 'b': 'USD'}) == {'a': Decimal('1305.50'),
+                                                          'b': Decimal('2.08')}
+
+
+def test_reloading_rates_updates_them_and_rejects_bad_rows(app, rates):
+    with app.app_context():
+        assert fx_rates.rates(['USD'], ['2025-02-10']).tolist() == [135]
+        assert load_rates(io.StringIO("currency,date,rate\nUSD,2025-02-01,136.5\n")) == 1
+        assert fx_rates.rates(['USD'], ['2025-02-10']).tolist() == [136.5]
+        with pytest.raises(ValueError, match='line 3'):
+            load_rates(io.StringIO("currency,date,rate\nUSD,2025-03-01,1\nUSD,2025-03-02,0\n"))
+
+
+def test_balance_converts_at_the_days_rate(app, client, user_id, rates):
+    login(client, user_id)
+    with app.app_context():
+        import_rows(user_id, [{'date': datetime(2025, 1, 10), 'amount': '10', 'type': 'income',
+                               'category': 'Salary', 'note': 'usd pay', 'currency': 'USD'}])
+
+    balance = lambda day: client.get(f'/api/v1/summary/balance?as_of={day}').json['balance']
+    assert (balance('2025-01-20'), balance('2025-02-20')) == (1300, 1350)
@@ -0,0 +1,45 @@
+# tests/test_importer.py
+import io
+
+import pytest
+
+from extensions import db
+from services.importer import import_transactions
+from services.ledger import rebuild_ledger
+from tests.conftest import ledger_rows
+
+STATEMENT = """date,amount,type,category,note
+2025-01-10,100,income,Salary,jan pay
+2025-02-03,40,expense,Food,groceries
+2025-03-15,60,expense,Travel,bus pass
+2025-04-01,90,expense,Food,dinner
+2025-05-20,80,expense,Food,market
+2025-06-30,90,expense,Other,repairs
+"""
+
+
+def test_failed_import_retried_keeps_the_ledger_whole(app, user_id):
+    def fail_after_first_chunk(report):
+        raise RuntimeError("worker lost")
+
+    with app.app_context():
+        with pytest.raises(RuntimeError):
+            import_transactions(io.StringIO(STATEMENT), user_id, chunk_size=3,
+                                progress=fail_after_first_chunk)
+        db.session.rollback()
+        report = import_transactions(io.StringIO(STATEMENT), user_id, chunk_size=3)
+        assert (report.inserted, report.duplicates) == (3, 3)
+
+        imported = ledger_rows(user_id)
+        rebuild_ledger(user_id)
+        assert imported == ledger_rows(user_id)
+        assert len(imported) == 6 and imported[-1][-1] == -260
+
+
+def test_reimporting_a_statement_is_a_no_op(app, user_id):
+    with app.app_context():
+        assert import_transactions(io.StringIO(STATEMENT), user_id, chunk_size=4).inserted == 6
+        before = ledger_rows(user_id)
+        report = import_transactions(io.StringIO(STATEMENT), user_id, chunk_size=4)
+        assert (report.inserted, report.duplicates) == (0, 6)
+        assert ledger_rows(user_id) == before
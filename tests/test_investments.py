@@ -0,0 +1,79 @@
+# tests/test_investments.py
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from extensions import db
+from models import Investment, PortfolioSnapshot, Price
+from services.investments import portfolio_valuation, record_snapshots
+from services.prices import FilePriceSource, refresh_prices
+
+AS_OF = date(2025, 6, 30)
+
+
+@pytest.fixture
+def holdings(app, user_id):
+    with app.app_context():
+        db.session.add_all([
+            Investment(user_id=user_id, name='Bank FD', investment_type='fixed_deposit',
+                       amount=Decimal('100000'), interest_rate=8.0,
+                       purchase_date=date(2024, 6, 30)),
+            Investment(user_id=user_id, name='Growth fund', investment_type='mutual_fund',
+                       amount=Decimal('1000'), units=10, ticker_or_isin='NIBLGF'),
+            Investment(user_id=user_id, name='Hydro', investment_type='share',
+                       amount=Decimal('5000'), units=20, ticker_or_isin='UPPER',
+                       current_value=Decimal('5200')),
+        ])
+        db.session.commit()
+
+
+def _price_file(tmp_path, rows):
+    path = tmp_path / 'prices.csv'
+    path.write_text('ticker,date,close\n' + ''.join(f'{row}\n' for row in rows))
+    return FilePriceSource(str(path))
+
+
+def test_file_source_refreshes_held_tickers_up_to_the_day(app, holdings, tmp_path):
+    source = _price_file(tmp_path, ['NIBLGF,2025-06-01,11.5', 'NIBLGF,2025-06-29,12.25',
+                                    'NIBLGF,2025-07-01,99', 'NABIL,2025-06-29,500'])
+    with app.app_context():
+        assert refresh_prices(source, AS_OF) == 2
+        # A corrected quote replaces the stored one
+        source = _price_file(tmp_path, ['NIBLGF,2025-06-29,12.5'])
+        assert refresh_prices(source, AS_OF) == 1
+        assert sorted((p.ticker, p.date, p.close) for p in Price.query) == [
+            ('NIBLGF', date(2025, 6, 1), 11.5), ('NIBLGF', date(2025, 6, 29), 12.5)]
+
+
+def test_valuation_uses_the_latest_price_on_or_before_the_day(app, user_id, holdings):
+    with app.app_context():
+        db.session.add_all([Price(ticker='NIBLGF', date=date(2025, 6, 1), close=11.0),
+                            Price(ticker='NIBLGF', date=date(2025, 7, 1), close=99.0)])
+        db.session.commit()
+        by_type, totals = portfolio_valuation(user_id, AS_OF)
+
+    fd, = by_type['fixed_deposit']
+    # A year of quarterly compounding at 8%
+    assert fd.value == pytest.approx(100000 * 1.02 ** 4, abs=0.01) and not fd.matured
+    fund, = by_type['mutual_fund']
+    assert (fund.value, fund.price, fund.price_date) == (110.0, 11.0, date(2025, 6, 1))
+    share, = by_type['share']
+    assert share.value == 5200.0 and share.price is None  # no quote: the entered value
+    assert totals == {'fixed_deposit': round(100000 * 1.02 ** 4, 2),
+                      'mutual_fund': 110.0, 'share': 5200.0}
+
+
+def test_snapshots_rerun_for_a_day_overwrite_it(app, user_id, holdings):
+    with app.app_context():
+        db.session.add(Price(ticker='NIBLGF', date=AS_OF, close=10.0))
+        db.session.commit()
+        assert record_snapshots(AS_OF) == 1
+
+        Price.query.filter_by(ticker='NIBLGF').update({'close': 20.0})
+        db.session.commit()
+        assert record_snapshots(AS_OF) == 1
+
+        snapshot, = PortfolioSnapshot.query.filter_by(user_id=user_id).all()
+        assert snapshot.date == AS_OF and snapshot.mutual_fund == Decimal('200.00')
+        assert snapshot.total == snapshot.fixed_deposit + Decimal('200.00') + Decimal('5200.00')
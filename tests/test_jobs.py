@@ -0,0 +1,148 @@
+# tests/test_jobs.py
+import gzip
+import os
+import time
+from datetime import datetime, timedelta
+from functools import partial
+
+import pytest
+
+from extensions import db
+from models import Job
+from services import export, importer
+from services.archive import archive_transactions
+from services.jobs import (DONE, QUEUED, JobContext, claim, enqueue, prune_spool, run_job,
+                           spool_path)
+from services.ledger import rebuild_ledger
+from tests.conftest import create_user, import_rows, ledger_rows, login, make_app
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = make_app(JOB_SPOOL_DIR=str(tmp_path), JOB_RETRY_DELAY=0)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def user_id(app):
+    now = datetime.utcnow() + timedelta(hours=5, minutes=45)
+    with app.app_context():
+        user_id = create_user()
+        # Same-minute rows test the (date, id) tie-break; the old ones get archived
+        import_rows(user_id, [
+            {'date': now - timedelta(days=day // 2), 'amount': str(day + 1), 'type': 'expense',
+             'category': 'Food', 'note': f'row {day}'}
+            for day in range(7)
+        ] + [
+            {'date': now - timedelta(days=5 * 366 + day), 'amount': '9', 'type': 'income',
+             'category': 'Salary', 'note': f'old {day}'}
+            for day in range(3)
+        ])
+        assert archive_transactions(keep_years=2) == 3
+    return user_id
+
+
+def test_batches_match_the_streamed_export(app, user_id):
+    with app.app_context():
+        queries = export.export_queries(user_id)
+        streamed = [tuple(row) for row in export.export_rows(*queries)]
+        for size in (1, 2, 3, 10, 100):
+            batched = [tuple(row) for batch in export.export_batches(*queries, batch_size=size)
+                       for row in batch]
+            assert batched == streamed
+        assert len(streamed) == 10
+
+
+def test_export_job_reports_progress_per_batch(app, user_id, monkeypatch):
+    monkeypatch.setattr(export, 'export_batches', partial(export.export_batches, batch_size=4))
+    reported = []
+    progress = JobContext.progress
+
+    def recorded(self, done, *args, **kwargs):
+        reported.append(done)
+        progress(self, done, *args, **kwargs)
+
+    monkeypatch.setattr(JobContext, 'progress', recorded)
+
+    with app.app_context():
+        job = enqueue('export_transactions', {'user_id': user_id}, user_id=user_id)
+        assert claim('test', 1) == [job.id]
+        run_job(job.id)
+        job = db.session.get(Job, job.id)
+
+        assert job.status == DONE and job.result == {'file': f'export-{job.id}.csv.gz', 'rows': 10}
+        assert reported == [4, 8, 10]
+        assert job.done == 10 and job.heartbeat_at >= job.started_at
+        with gzip.open(spool_path(job.result['file']), 'rt') as f:
+            assert len(f.read().splitlines()) == 11
+        assert os.listdir(os.path.dirname(spool_path('x'))) == [job.result['file']]
+
+
+def test_prune_spool_keeps_recent_files_and_pending_uploads(app, user_id):
+    with app.app_context():
+        old = time.time() - 3600
+        for name in ('export-1.csv.gz', 'export-2.csv.gz.1.part', 'upload-waiting.csv', 'recent.csv.gz'):
+            with open(spool_path(name), 'w') as f:
+                f.write('x')
+            if name != 'recent.csv.gz':
+                os.utime(spool_path(name), (old, old))
+        enqueue('import_transactions', {'path': spool_path('upload-waiting.csv'), 'user_id': user_id})
+
+        assert prune_spool(600) == 2
+        assert sorted(os.listdir(os.path.dirname(spool_path('x')))) == ['recent.csv.gz',
+                                                                        'upload-waiting.csv']
+
+
+def test_pruned_export_download_is_gone(app, client, user_id):
+    login(client, user_id)
+    response = client.post('/api/v1/exports', json={'filter_by': 'all'})
+    assert response.status_code == 202
+    job_id = response.json['id']
+    with app.app_context():
+        claim('test', 1)
+        run_job(job_id)
+
+    assert client.get(f'/api/v1/jobs/{job_id}/file').status_code == 200
+    with app.app_context():
+        assert prune_spool(-1) == 1
+    assert client.get(f'/api/v1/jobs/{job_id}/file').status_code == 410
+
+
+def test_import_job_retried_after_a_partial_attempt(app, user_id, monkeypatch):
+    monkeypatch.setattr(importer, 'import_transactions',
+                        partial(importer.import_transactions, chunk_size=2))
+    progress = JobContext.progress
+
+    def dies_once(self, *args, **kwargs):
+        if self.attempt == 1:
+            raise RuntimeError("worker lost")
+        progress(self, *args, **kwargs)
+
+    monkeypatch.setattr(JobContext, 'progress', dies_once)
+
+    with app.app_context():
+        path = spool_path('upload-statement.csv')
+        with open(path, 'w') as f:
+            f.write("date,amount,type,category,note\n" + "".join(
+                f"2025-0{month}-0{month},{month}0,expense,Food,shop {month}\n"
+                for month in range(1, 6)))
+        job = enqueue('import_transactions', {'path': path, 'user_id': user_id})
+
+        assert claim('test', 1) == [job.id]
+        run_job(job.id)
+        job = db.session.get(Job, job.id)
+        assert job.status == QUEUED and 'worker lost' in job.error
+
+        assert claim('test', 1) == [job.id]
+        run_job(job.id)
+        job = db.session.get(Job, job.id)
+        assert job.status == DONE and job.attempts == 2
+        assert job.result['inserted'] == 3  # the first attempt committed one chunk
+        assert not os.path.exists(path)
+
+        imported = ledger_rows(user_id)
+        rebuild_ledger(user_id)
+        assert imported == ledger_rows(user_id)
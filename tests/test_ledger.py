@@ -0,0 +1,88 @@
+# tests/test_ledger.py
+from datetime import date, datetime
+from decimal import Decimal
+
+from extensions import db
+from models import Category, FxRate, Transaction
+from money import ZERO
+from services import ledger
+from services.fx import fx_rates
+from services.ledger import apply_to_ledger, rebuild_ledger
+from tests.conftest import import_rows, ledger_rows, login
+
+
+def _matches_rebuild(app, user_id):
+    with app.app_context():
+        incremental = ledger_rows(user_id)
+        rebuild_ledger(user_id)
+        assert ledger_rows(user_id) == incremental
+        return incremental
+
+
+def test_incremental_ledger_matches_a_rebuild(app, client, user_id):
+    login(client, user_id)
+    with app.app_context():
+        db.session.add(FxRate(currency='USD', date=date(2024, 1, 1), rate=133.5))
+        db.session.commit()
+        fx_rates.invalidate()
+        food = Category.query.filter_by(name='Food', user_id=None).one().id
+        import_rows(user_id, [
+            {'date': datetime(2025, month, 10), 'amount': f'{month}00', 'type': 'income',
+             'category': 'Salary', 'note': f'pay {month}', 'currency': currency}
+            for month in (1, 2, 3) for currency in ('NPR', 'USD')
+        ])
+    assert len(_matches_rebuild(app, user_id)) == 6
+
+    # Today's first write opens a new day, the second adds to it
+    for amount, currency in (('40', 'NPR'), ('15', 'NPR'), ('2.50', 'USD')):
+        response = client.post('/add_transaction', data={
+            'amount': amount, 'type': 'expense', 'category_id': food, 'currency': currency})
+        assert response.status_code == 302
+    assert len(_matches_rebuild(app, user_id)) == 8
+
+    # Back-dated: repairs from February onwards
+    with app.app_context():
+        import_rows(user_id, [{'date': datetime(2025, 2, 1), 'amount': '25', 'type': 'expense',
+                               'category': 'Food', 'note': 'late receipt'}])
+        ids = [t.id for t in Transaction.query.filter_by(user_id=user_id, currency='NPR')
+               .order_by(Transaction.date)]
+    _matches_rebuild(app, user_id)
+
+    # Edit: turning income into expense moves every later balance
+    response = client.post('/api/v1/transactions/bulk-update',
+                           json={'ids': ids[:1], 'set': {'type': 'expense'}})
+    assert response.json == {'updated': 1}
+    _matches_rebuild(app, user_id)
+
+    response = client.post('/api/v1/transactions/bulk-delete', json={'ids': ids[2:4]})
+    assert response.json == {'deleted': 2}
+    rows = _matches_rebuild(app, user_id)
+    assert rows[-1][0] == 'USD' and rows[-1][-1] == Decimal('597.50')
+
+
+def test_new_days_carry_balances_written_meanwhile(app, user_id):
+    """Each write carries the balance in SQL, whatever it read of the ledger before."""
+    with app.app_context():
+        food = Category.query.filter_by(name='Food', user_id=None).one().id
+
+        def written(day, t_type, amount):
+            row = {'user_id': user_id, 'category_id': food, 'currency': 'NPR', 'type': t_type,
+                   'amount': Decimal(amount), 'date': datetime(2025, 5, day)}
+            db.session.execute(Transaction.__table__.insert(), [row])
+            return row
+
+        apply_to_ledger([written(1, 'income', '100'), written(1, 'income', '100')])
+        db.session.commit()
+
+        # Two writers that both saw May 1st as the last day: May 3rd lands first
+        ledger._add_days([{'user_id': user_id, 'currency': 'NPR', 'day': date(2025, 5, 3),
+                           'income': ZERO, 'expense': written(3, 'expense', '30')['amount']}])
+        ledger._add_days([{'user_id': user_id, 'currency': 'NPR', 'day': date(2025, 5, 2),
+                           'income': written(2, 'income', '10')['amount'], 'expense': ZERO},
+                          {'user_id': user_id, 'currency': 'NPR', 'day': date(2025, 5, 3),
+                           'income': written(3, 'income', '5')['amount'], 'expense': ZERO}])
+        db.session.commit()
+
+        assert [r[-1] for r in ledger_rows(user_id)] == [200, 210, 185]
+    rows = _matches_rebuild(app, user_id)
+    assert rows[-1][2:] == (Decimal('5'), Decimal('30'), Decimal('185'))
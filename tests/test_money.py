@@ -0,0 +1,106 @@
+# tests/test_money.py
+# Property-based checks of the rounding rules in money.py.
+from decimal import Decimal, localcontext
+
+import pytest
+
+from money import PAISA, Money, from_minor, to_minor, to_money
+
+hypothesis = pytest.importorskip("hypothesis")
+from hypothesis import given, strategies as st  # noqa: E402
+
+LIMIT = Decimal(10) ** 12
+
+# Finite decimals with any number of places, and exact paisa amounts
+decimals = st.decimals(min_value=-LIMIT, max_value=LIMIT, places=6,
+                       allow_nan=False, allow_infinity=False)
+amounts = st.decimals(min_value=-LIMIT, max_value=LIMIT, places=2,
+                      allow_nan=False, allow_infinity=False)
+paisa = st.integers(min_value=-10 ** 14, max_value=10 ** 14)
+
+
+def half_up(value):
+    """Reference rounding: to the nearest paisa, halves away from zero."""
+    with localcontext() as ctx:
+        ctx.prec = 50
+        scaled = abs(value) * 100
+        whole = int(scaled)
+        if scaled - whole >= Decimal('0.5'):
+            whole += 1
+        return (Decimal(whole) / 100 * (1 if value >= 0 else -1)).quantize(PAISA)
+
+
+@given(decimals)
+def test_rounds_half_up_to_the_paisa(value):
+    assert to_money(value) == half_up(value)
+    assert to_money(value).as_tuple().exponent == -2
+    assert abs(to_money(value) - value) <= Decimal('0.005')
+
+
+@given(st.integers(min_value=-10 ** 12, max_value=10 ** 12))
+def test_exact_halves_round_away_from_zero(cents):
+    half = Decimal(cents) / 100 + Decimal('0.005') * (1 if cents >= 0 else -1)
+    assert to_money(half) == Decimal(cents + (1 if cents >= 0 else -1)) / 100
+
+
+@given(decimals)
+def test_rounding_is_idempotent(value):
+    assert to_money(to_money(value)) == to_money(value)
+
+
+@given(amounts)
+def test_amount_round_trips_through_paisa(value):
+    assert from_minor(to_minor(value)) == value
+
+
+@given(paisa)
+def test_paisa_round_trip_through_amount(value):
+    assert to_minor(from_minor(value)) == value
+
+
+@given(decimals)
+def test_strings_round_like_decimals(value):
+    assert to_money(str(value)) == to_money(value)
+    assert to_money(f" {value:,} ") == to_money(value)
+
+
+@given(amounts.filter(lambda d: abs(d) < Decimal(10) ** 9))
+def test_floats_are_taken_at_their_shortest_repr(value):
+    # A two-place amount below 1e9 survives float conversion, so no drift
+    assert to_money(float(value)) == value
+
+
+@given(st.floats(allow_nan=False, allow_infinity=False, min_value=-1e12, max_value=1e12))
+def test_any_float_rounds_like_its_repr(value):
+    assert to_money(value) == to_money(repr(value))
+
+
+@given(decimals)
+def test_money_column_stores_the_rounded_amount(value):
+    column = Money()
+    stored = column.process_bind_param(value, None)
+    assert isinstance(stored, int)
+    assert column.process_result_value(stored, None) == to_money(value)
+
+
+@pytest.mark.parametrize("value", [
+    float('nan'), float('inf'), float('-inf'),
+    Decimal('NaN'), Decimal('sNaN'), Decimal('Infinity'), Decimal('-Infinity'),
+    'nan', 'inf', '-Infinity', '', 'abc', '1.2.3', None,
+])
+def test_rejects_non_finite_and_junk(value):
+    with pytest.raises(ValueError):
+        to_money(value)
+
+
+@given(st.text().filter(lambda s: not _parses(s)))
+def test_rejects_text_that_is_not_a_number(value):
+    with pytest.raises(ValueError):
+        to_money(value)
+
+
+def _parses(text):
+    try:
+        return Decimal(text.strip().replace(',', '')).is_finite()
+    except ArithmeticError:
+        return False
@@ -0,0 +1,58 @@
+# tests/test_profiling.py
+import logging
+import re
+
+import pytest
+
+from extensions import db
+from services.profiling import EndpointStats, query_profiler
+from tests.conftest import create_user, login, make_app
+
+
+@pytest.fixture
+def app():
+    # Every query counts as slow, so each one is logged
+    app = make_app(SQL_PROFILING=True, SQL_SLOW_QUERY_MS=0)
+    query_profiler.endpoints.clear()
+    query_profiler.recent_slow.clear()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_requests_report_queries_and_slow_call_sites(app, client, user_id, caplog):
+    login(client, user_id)
+    with caplog.at_level(logging.WARNING, logger='moneymuse.sql'):
+        response = client.get('/dashboard')
+    assert response.status_code == 200
+
+    timing = response.headers['Server-Timing']
+    queries = int(re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', timing).group(1))
+    assert queries > 0 and 'render;dur=' in timing and 'total;dur=' in timing
+
+    stats = {row['endpoint']: row for row in query_profiler.worst_endpoints()}
+    assert stats['main.dashboard']['count'] == 1
+    assert stats['main.dashboard']['slow_queries'] == queries
+
+    slow = [entry for entry in query_profiler.recent_slow if entry['endpoint'] == 'main.dashboard']
+    assert slow and all(not entry['site'].startswith(('..', 'unknown')) for entry in slow)
+    assert any(record.getMessage().startswith('Slow query') for record in caplog.records)
+
+
+def test_performance_page_lists_endpoints(app, client):
+    with app.app_context():
+        admin = create_user('root', role='admin')
+    login(client, admin)
+    client.get('/admin')
+    page = client.get('/admin/performance')
+    assert page.status_code == 200 and b'admin.admin_dashboard' in page.data
+
+
+def test_endpoint_stats_summary():
+    stats = EndpointStats(window=3)
+    for ms in (10, 40, 20, 30):
+        stats.add(ms, ms / 2, 2, 0)
+    summary = stats.summary()
+    assert summary['count'] == 4  # the window keeps the last three
+    assert (summary['avg_ms'], summary['max_ms'], summary['avg_db_ms']) == (30, 40, 15)
@@ -0,0 +1,93 @@
+# tests/test_query_plans.py
+from datetime import datetime, timedelta
+
+from sqlalchemy import inspect
+
+from extensions import db
+from migrations import ensure_indexes
+from models import Transaction
+from services.cache import aggregate_cache
+from services.query_plans import check_hot_queries
+from services.transactions import filter_transactions
+from tests.conftest import import_rows
+
+TRANSACTION_INDEXES = {
+    'ix_transaction_user_date': ['user_id', 'date'],
+    'ix_transaction_user_type_category': ['user_id', 'type', 'category_id', 'date'],
+    'ix_transaction_recurring_next_date': ['is_recurring', 'next_date'],
+}
+
+
+def _indexes(table):
+    return {ix['name']: ix['column_names'] for ix in inspect(db.engine).get_indexes(table)}
+
+
+def _now():
+    return datetime.utcnow() + timedelta(hours=5, minutes=45)
+
+
+def test_transaction_has_the_composite_indexes(app):
+    with app.app_context():
+        indexes = _indexes('transaction')
+        for name, columns in TRANSACTION_INDEXES.items():
+            assert indexes.get(name) == columns
+
+
+def test_ensure_indexes_adds_missing_and_drops_superseded(app):
+    with app.app_context():
+        db.session.execute(db.text("DROP INDEX ix_transaction_user_date"))
+        db.session.execute(db.text('CREATE INDEX ix_transaction_next_date ON "transaction" (next_date)'))
+        db.session.commit()
+
+        assert ensure_indexes() == ['ix_transaction_user_date']
+        indexes = _indexes('transaction')
+        assert 'ix_transaction_user_date' in indexes
+        assert 'ix_transaction_next_date' not in indexes
+
+
+def test_today_and_month_filters_are_sargable(app):
+    with app.app_context():
+        for filter_by in ('today', 'month'):
+            query = filter_transactions(Transaction.query.filter_by(user_id=1), filter_by)
+            sql = str(query.statement.compile(dialect=db.engine.dialect)).lower()
+            assert 'date(' not in sql and 'extract' not in sql and 'strftime' not in sql
+            assert '"transaction".date >=' in sql and '"transaction".date <' in sql
+
+
+def test_today_and_month_filters_are_half_open(app, user_id):
+    today = datetime.combine(_now().date(), datetime.min.time())
+    month = today.replace(day=1)
+    with app.app_context():
+        import_rows(user_id, [
+            {'date': today, 'amount': '1', 'type': 'expense', 'category': 'Food', 'note': 'midnight'},
+            {'date': today - timedelta(minutes=1), 'amount': '2', 'type': 'expense',
+             'category': 'Food', 'note': 'yesterday'},
+            {'date': month, 'amount': '3', 'type': 'expense', 'category': 'Food', 'note': 'month start'},
+            {'date': month - timedelta(minutes=1), 'amount': '4', 'type': 'expense',
+             'category': 'Food', 'note': 'last month'},
+        ])
+
+        def notes(filter_by):
+            query = filter_transactions(Transaction.query.filter_by(user_id=user_id), filter_by)
+            return {t.note for t in query}
+
+        assert 'midnight' in notes('today') and 'yesterday' not in notes('today')
+        assert {'midnight', 'month start'} <= notes('month')
+        assert 'last month' not in notes('month')
+
+
+def test_every_hot_query_uses_an_index(app, user_id):
+    start = _now() - timedelta(days=400)
+    with app.app_context():
+        import_rows(user_id, [
+            {'date': start + timedelta(days=day), 'amount': str(100 + day),
+             'type': 'income' if day % 7 == 0 else 'expense',
+             'category': 'Salary' if day % 7 == 0 else 'Food', 'note': f'food coffee {day}'}
+            for day in range(400)
+        ])
+
+        report = check_hot_queries(user_id)
+        assert report
+        assert aggregate_cache.enabled  # switched off for the check only
+        assert [(name, statement, plan) for name, statement, full_scans, plan in report
+                if full_scans] == []
@@ -0,0 +1,58 @@
+# tests/test_recurring.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from models import Category, Transaction
+from services.recurring import post_due_recurring
+from tests.conftest import login
+
+NOW = datetime(2025, 6, 10, 9, 0)
+
+
+@pytest.fixture
+def templates(app, user_id):
+    with app.app_context():
+        food = Category.query.filter_by(name='Food', user_id=None).one().id
+        for note, frequency, next_date in (('milk', 'daily', NOW - timedelta(days=3, hours=2)),
+                                           ('rent', 'weekly', NOW - timedelta(days=15)),
+                                           ('gym', 'monthly', NOW + timedelta(days=1))):
+            db.session.add(Transaction(user_id=user_id, category_id=food, type='expense',
+                                       amount=10, note=note, date=next_date - timedelta(days=1),
+                                       is_recurring=True, frequency=frequency,
+                                       next_date=next_date))
+        db.session.commit()
+
+
+def _posted(user_id):
+    return [(t.note, t.date) for t in Transaction.query.filter_by(user_id=user_id, is_recurring=False)
+            .order_by(Transaction.note, Transaction.date)]
+
+
+def test_catch_up_posts_each_missed_date_once(app, user_id, templates):
+    with app.app_context():
+        assert len(post_due_recurring(NOW)) == 7
+        # Running again, later the same day, finds nothing due
+        assert post_due_recurring(NOW + timedelta(hours=6)) == []
+
+        milk = NOW - timedelta(days=3, hours=2)
+        rent = NOW - timedelta(days=15)
+        assert _posted(user_id) == (
+            [('(Recurring) milk', milk + timedelta(days=day)) for day in range(4)] +
+            [('(Recurring) rent', rent + timedelta(weeks=week)) for week in range(3)])
+        next_dates = dict(db.session.query(Transaction.note, Transaction.next_date)
+                          .filter(Transaction.is_recurring == True))
+        assert next_dates == {'milk': milk + timedelta(days=4), 'rent': rent + timedelta(weeks=3),
+                              'gym': NOW + timedelta(days=1)}
+
+        # The next day posts only that day's occurrence
+        assert [row['note'] for row in post_due_recurring(NOW + timedelta(days=1))] == [
+            '(Recurring) milk', '(Recurring) gym']
+
+
+def test_page_requests_no_longer_post_recurring(app, client, user_id, templates):
+    login(client, user_id)
+    assert client.get('/dashboard').status_code == 200
+    with app.app_context():
+        assert _posted(user_id) == []
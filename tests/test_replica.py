@@ -0,0 +1,97 @@
+# tests/test_replica.py
+# The primary and the replica are two SQLite files; "replication" is a file copy.
+import shutil
+from datetime import datetime, timedelta
+
+import pytest
+from flask import g
+from sqlalchemy import select, update
+
+from config import engine_options
+from extensions import db
+from models import Category, Transaction, User
+from tests.conftest import create_user, import_rows, login, make_app
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return tmp_path / 'primary.db', tmp_path / 'replica.db'
+
+
+@pytest.fixture
+def replicated(paths):
+    """An app whose replica is a snapshot of the primary taken after one user signed up."""
+    primary, replica = (f"sqlite:///{path}" for path in paths)
+    app = make_app(SQLALCHEMY_DATABASE_URI=primary,
+                   SQLALCHEMY_ENGINE_OPTIONS=engine_options(primary, {}),
+                   SQLALCHEMY_BINDS={'replica': {'url': replica, **engine_options(replica, {})}},
+                   AGGREGATE_CACHE_BACKEND='none')
+    with app.app_context():
+        user_id = create_user()
+        db.engine.dispose()
+    shutil.copy(*paths)
+    yield app, user_id
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def _expense(amount):
+    return {'date': datetime.utcnow() + timedelta(hours=5, minutes=45), 'amount': amount,
+            'type': 'expense', 'category': 'Food', 'note': 'lunch'}
+
+
+def test_read_only_views_use_the_replica(replicated):
+    app, user_id = replicated
+    with app.app_context():
+        import_rows(user_id, [_expense('25')])  # reaches only the primary
+    client = app.test_client()
+    login(client, user_id)
+
+    assert client.get('/api/v1/summary').json['total_expense'] == 0
+    assert b'lunch' not in client.get('/transactions').data
+
+
+def test_writes_go_to_the_primary_and_the_writer_reads_them_back(replicated, paths):
+    app, user_id = replicated
+    client = app.test_client()
+    login(client, user_id)
+    with app.app_context():
+        food = Category.query.filter_by(name='Food', user_id=None).one().id
+
+    client.post('/add_transaction', data={'amount': '25', 'type': 'expense', 'category_id': food,
+                                          'note': 'lunch'})
+    with app.app_context():
+        assert Transaction.query.filter_by(user_id=user_id).count() == 1
+        replica = db.engines['replica']
+        with replica.connect() as conn:
+            assert conn.execute(select(Transaction.id)).all() == []
+
+    # Sticky for REPLICA_STICKY_SECONDS after a write, so the page shows it
+    assert client.get('/api/v1/summary').json['total_expense'] == 25
+    with client.session_transaction() as session:
+        session['primary_until'] = 0
+    assert client.get('/api/v1/summary').json['total_expense'] == 0
+
+
+def test_session_routes_only_plain_selects(replicated):
+    app, _ = replicated
+    with app.test_request_context():
+        primary, replica = db.engines[None], db.engines['replica']
+        assert db.session.get_bind(clause=select(User.id)) is primary
+
+        g.use_replica = True
+        assert db.session.get_bind(clause=select(User.id)) is replica
+        assert db.session.get_bind(clause=update(User).values(role='admin')) is primary
+        assert db.session.get_bind() is replica  # no statement: a read via the ORM
+
+        db.session.add(User(username='new', email='new@gmail.com', password='x'))
+        db.session.flush()  # a flush while reading from the replica still writes the primary
+        db.session.rollback()
+
+
+def test_without_a_replica_everything_uses_the_primary(app):
+    with app.test_request_context():
+        g.use_replica = True
+        assert db.session.get_bind(clause=select(User.id)) is db.engines[None]
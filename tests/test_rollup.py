@@ -0,0 +1,43 @@
+# tests/test_rollup.py
+from datetime import datetime
+from decimal import Decimal
+
+from extensions import db
+from models import Category, MonthlyRollup
+from services.rollup import apply_to_rollup, rebuild_rollups
+from tests.conftest import import_rows
+
+
+def _rollup(user_id):
+    return sorted((r.year, r.month, r.category_id, r.type, r.currency, r.total, r.count)
+                  for r in MonthlyRollup.query.filter_by(user_id=user_id))
+
+
+def test_incremental_rollup_matches_a_rebuild(app, user_id):
+    with app.app_context():
+        import_rows(user_id, [
+            {'date': datetime(2025, month, day), 'amount': f'{month}.{day:02d}',
+             'type': 'expense' if day % 2 else 'income',
+             'category': 'Food' if day % 2 else 'Salary', 'note': f'{month}/{day}'}
+            for month in (1, 2, 3) for day in (1, 2, 3, 15)
+        ])
+        incremental = _rollup(user_id)
+        assert len(incremental) == 6
+
+        rebuild_rollups(user_id)
+        assert _rollup(user_id) == incremental
+
+
+def test_first_writes_of_a_key_add_up(app, user_id):
+    """Several writes of a key with no rollup row yet, in one transaction and across them."""
+    with app.app_context():
+        food = Category.query.filter_by(name='Food', user_id=None).one().id
+        row = {'user_id': user_id, 'date': datetime(2025, 4, 2), 'category_id': food,
+               'type': 'expense', 'currency': 'NPR', 'amount': Decimal('1.10')}
+        apply_to_rollup([row, row])
+        apply_to_rollup([row])
+        db.session.commit()
+        apply_to_rollup([row], sign=-1)
+        db.session.commit()
+
+        assert _rollup(user_id) == [(2025, 4, food, 'expense', 'NPR', Decimal('2.20'), 2)]
@@ -0,0 +1,111 @@
+# tests/test_search.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from models import Category, SearchTerm, Transaction
+from services.recurring import post_due_recurring
+from services.search import (index_inserted, index_transactions, last_transaction_id,
+                             search_transactions)
+from services.transactions import filtered_totals
+from tests.conftest import create_user, import_rows, login
+
+
+@pytest.fixture
+def notes(app, user_id):
+    with app.app_context():
+        import_rows(user_id, [
+            {'date': datetime(2025, 3, day), 'amount': str(day), 'type': 'expense',
+             'category': category, 'note': note}
+            for day, (category, note) in enumerate([
+                ('Food', 'coffee with Sita'), ('Food', 'lunch'), ('Travel', 'bus fare'),
+                ('Food', 'Coffee beans'), ('Other', 'a b c'),
+            ], 1)
+        ])
+
+
+def _search(user_id, text):
+    query = search_transactions(Transaction.query.filter_by(user_id=user_id), user_id, text)
+    return sorted(t.note for t in query)
+
+
+def test_prefix_typo_and_category_matches(app, user_id, notes):
+    with app.app_context():
+        assert _search(user_id, 'cof') == ['Coffee beans', 'coffee with Sita']
+        assert _search(user_id, 'cofee sita') == ['coffee with Sita']
+        assert _search(user_id, 'travel') == ['bus fare']
+        assert _search(user_id, 'zzzz') == []
+
+
+@pytest.mark.parametrize('text', ['a', 'a b', '!!', 'x y z'])
+def test_text_without_searchable_words_matches_nothing(app, user_id, notes, text):
+    with app.app_context():
+        assert _search(user_id, text) == []
+
+
+def test_api_search_with_only_short_words_is_empty(client, user_id, notes):
+    login(client, user_id)
+    assert client.get('/api/v1/transactions?q=a').json['transactions'] == []
+    assert len(client.get('/api/v1/transactions').json['transactions']) == 5
+
+
+def test_totals_follow_the_search(app, client, user_id, notes):
+    login(client, user_id)
+    assert client.get('/api/v1/transactions?q=coffee').json['totals']['expense'] == 5
+    assert client.get('/api/v1/transactions?q=bus').json['totals']['expense'] == 3
+    assert client.get('/api/v1/transactions?q=a').json['totals']['expense'] == 0
+    assert client.get('/api/v1/transactions').json['totals']['expense'] == 15
+    assert b'data: [0.00, 5.00]' in client.get('/transactions?q=coffee').data
+
+    with app.app_context():
+        assert filtered_totals(user_id, 'all', q='coffee') == (0, 5)
+
+
+def _postings(user_id):
+    return sorted(db.session.query(SearchTerm.transaction_id, SearchTerm.term)
+                  .filter(SearchTerm.user_id == user_id))
+
+
+def test_bulk_insert_indexes_only_its_own_rows(app, user_id):
+    with app.app_context():
+        other = create_user('bina')
+        food = Category.query.filter_by(name='Food', user_id=None).one().id
+
+        def insert(uid, note):
+            row = Transaction(user_id=uid, category_id=food, type='expense', amount=1, note=note)
+            db.session.add(row)
+            db.session.flush()
+            return row.id
+
+        after_id = last_transaction_id()
+        # Another writer's rows land between the mark and this insert, indexed by that writer
+        index_transactions([insert(other, 'momo'), insert(user_id, 'tea')])
+        mine = [insert(user_id, 'bread'), insert(user_id, 'milk')]
+        index_inserted(after_id, [user_id])
+
+        postings = _postings(user_id) + _postings(other)
+        assert len(postings) == len(set(postings))
+        assert {term for t_id, term in postings if t_id in mine} == {'bread', 'milk', 'food'}
+
+
+def test_recurring_posting_indexes_each_row_once(app, user_id):
+    now = datetime(2025, 6, 10, 9, 0)
+    with app.app_context():
+        other = create_user('bina')
+        food = Category.query.filter_by(name='Food', user_id=None).one().id
+        for uid in (user_id, other):
+            db.session.add(Transaction(user_id=uid, category_id=food, type='expense', amount=5,
+                                       note='netflix', date=now - timedelta(days=3),
+                                       is_recurring=True, frequency='daily',
+                                       next_date=now - timedelta(days=2)))
+        db.session.commit()
+
+        posted = post_due_recurring(now)
+        assert len(posted) == 6
+        for uid in (user_id, other):
+            postings = _postings(uid)
+            assert len(postings) == len(set(postings))
+            rows = Transaction.query.filter_by(user_id=uid, is_recurring=False)
+            assert [t.note for t in search_transactions(rows, uid, 'netflix')] == [
+                '(Recurring) netflix'] * 3
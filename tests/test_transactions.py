@@ -0,0 +1,53 @@
+# tests/test_transactions.py
+from datetime import datetime
+
+import pytest
+
+from models import Transaction
+from services.transactions import keyset_page
+from tests.conftest import import_rows, login
+
+SAME_MINUTE = datetime(2025, 4, 2, 10, 30)
+
+
+@pytest.fixture
+def rows(app, user_id):
+    with app.app_context():
+        # Seven rows share one timestamp, so page boundaries fall inside the tie
+        import_rows(user_id, [
+            {'date': SAME_MINUTE, 'amount': str(n + 1), 'type': 'expense', 'category': 'Food',
+             'note': f'tie {n}'} for n in range(7)
+        ] + [
+            {'date': datetime(2025, 4, day, 8), 'amount': '5', 'type': 'income',
+             'category': 'Salary', 'note': f'day {day}'} for day in (1, 3, 4)
+        ])
+        newest_first = Transaction.query.filter_by(user_id=user_id).order_by(
+            Transaction.date.desc(), Transaction.id.desc())
+        return [t.id for t in newest_first]
+
+
+def test_keyset_pages_cover_every_row_once_across_equal_dates(app, user_id, rows):
+    with app.app_context():
+        query = Transaction.query.filter_by(user_id=user_id)
+        for size in (1, 2, 3, 4, 10):
+            seen, cursor = [], None
+            while True:
+                page, cursor = keyset_page(query, cursor, page_size=size)
+                seen += [t.id for t in page]
+                if cursor is None:
+                    break
+            assert seen == rows
+
+
+def test_feed_follows_its_cursor_and_rejects_a_bad_one(app, client, user_id, rows):
+    login(client, user_id)
+    seen, url = [], '/transactions/feed?page_size=3'
+    while url:
+        body = client.get(url).json
+        seen += [t['id'] for t in body['transactions']]
+        url = body['next_cursor'] and f"/transactions/feed?page_size=3&cursor={body['next_cursor']}"
+    assert seen == rows
+
+    assert client.get('/transactions/feed?cursor=yesterday').status_code == 400
+    page = client.get('/transactions')
+    assert page.status_code == 200 and b'tie 6' in page.data
@@ -0,0 +1,9 @@
+# views/__init__.py
+# Blueprints, registered by create_app().
+
+
+def register_blueprints(app):
+    from . import admin, api, auth, budgets, investments, main, transactions
+
+    for module in (main, auth, transactions, budgets, investments, admin, api):
+        app.register_blueprint(module.bp)
@@ -0,0 +1,115 @@
+# views/admin.py
+from flask import (Blueprint, current_app, flash, jsonify, redirect, render_template, request,
+                   session, url_for)
+
+from extensions import db, replica_reads
+from models import ContactMessage, User
+from services.admin import messages_page, site_counters, users_page
+from services.cache import aggregate_cache
+from services.identity import identity_cache
+from services.profiling import query_profiler
+from views.decorators import admin_required
+
+bp = Blueprint('admin', __name__, url_prefix='/admin')
+
+
+def table_args(default_sort, default_direction='asc'):
+    """Search, sort and page of an admin table from the query string."""
+    direction = request.args.get('direction', default_direction)
+    return {
+        'q': request.args.get('q', ''),
+        'sort': request.args.get('sort', default_sort),
+        'direction': direction if direction in ('asc', 'desc') else default_direction,
+        'page': max(1, request.args.get('page', 1, type=int)),
+        'per_page': current_app.config['ADMIN_PAGE_SIZE'],
+    }
+
+
+@bp.route('')
+@admin_required
+@replica_reads
+def admin_dashboard():
+    total_users, total_admins, total_messages = site_counters()
+    args = table_args('id')
+    return render_template(
+        'admin_dashboard.html',
+        users=users_page(**args),
+        table=args,
+        total_users=total_users,
+        total_messages=total_messages,
+        total_admins=total_admins
+    )
+
+
+@bp.route('/messages')
+@admin_required
+@replica_reads
+def admin_messages():
+    args = table_args('date_sent', 'desc')
+    return render_template('admin_messages.html', messages=messages_page(**args), table=args)
+
+@bp.route('/users')
+@admin_required
+@replica_reads
+def admin_users():
+    args = table_args('id')
+    return render_template('admin_users.html', users=users_page(**args), table=args)
+
+
+@bp.route('/user/<int:user_id>/delete', methods=['POST'])
+@admin_required
+def delete_user(user_id):
+    user = User.query.get_or_404(user_id)
+
+    # prevent admin from deleting themselves
+    if user.id == session.get("user_id"):
+        flash("You cannot delete your own account!", "danger")
+        return redirect(url_for('admin.admin_users'))
+
+    db.session.delete(user)
+    db.session.commit()
+    identity_cache.invalidate(user_id)
+    flash(f"User {user.username} deleted successfully!", "success")
+    return redirect(url_for('admin.admin_users'))
+
+
+@bp.route('/user/<int:user_id>/toggle_role', methods=['POST'])
+@admin_required
+def toggle_role(user_id):
+    user = User.query.get_or_404(user_id)
+
+    if user.role == "admin":
+        user.role = "user"
+    else:
+        user.role = "admin"
+
+    db.session.commit()
+    identity_cache.invalidate(user_id)
+    flash(f"User {user.username} role updated to {user.role}!", "success")
+    return redirect(url_for('admin.admin_users'))
+
+@bp.route('/performance')
+@admin_required
+def admin_performance():
+    return render_template(
+        'admin_performance.html',
+        enabled=query_profiler.enabled,
+        endpoints=query_profiler.worst_endpoints(),
+        slow_queries=list(reversed(query_profiler.recent_slow)),
+        slow_ms=query_profiler.slow_ms
+    )
+
+@bp.route('/cache_stats')
+@admin_required
+def admin_cache_stats():
+    """Hit/miss counters of this worker's aggregate cache."""
+    return jsonify(aggregate_cache.stats())
+
+@bp.route('/messages/delete/<int:msg_id>', methods=['POST'])
+@admin_required
+def delete_message(msg_id):
+    msg = ContactMessage.query.get_or_404(msg_id)
+    db.session.delete(msg)
+    db.session.commit()
+    flash("Message deleted successfully!", "success")
+    return redirect(url_for('admin.admin_messages'))
@@ -0,0 +1,454 @@
+# views/api.py
+"""Versioned JSON API (v1) behind the dashboard and charts.
+
+Every endpoint stands on its own so pages can fetch their datasets in
+parallel. Responses carry an ETag of their body; a client that sends it back
+in If-None-Match gets an empty 304 when nothing changed.
+
+Totals, balances and series are in the user's base currency, named by the
+`currency` field next to them; single rows carry their own `currency`.
+"""
+import os
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import Blueprint, jsonify, request, send_file, session, url_for
+from flask_login import current_user
+from sqlalchemy.orm import joinedload
+
+from extensions import db, replica_reads
+from models import Budget, Job, Notification, Transaction
+from services.budgets import budget_progress, budget_totals
+from services.bulk import bulk_delete, bulk_update
+from services.fx import base_currency
+from services.investments import portfolio_valuation, snapshot_history
+from services.ledger import balance_as_of, balances_at
+from services.rollup import expenses_by_category, monthly_series, totals_by_type
+from services.search import search_transactions
+from services.transactions import filter_transactions, filtered_totals, keyset_page
+from views.transactions import transactions_page_size
+
+bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+
+def api_login_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not current_user.is_authenticated:
+            return jsonify({"error": "Authentication required."}), 401
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+def conditional(f):
+    """Send a view's dict as JSON with an ETag, or a 304 if the client has it.
+
+    Views return (dict, status) for errors; those are sent as-is.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        result = f(*args, **kwargs)
+        if isinstance(result, tuple):
+            return jsonify(result[0]), result[1]
+        response = jsonify(result)
+        response.add_etag()
+        # Cacheable by the browser only, and always revalidated with the ETag
+        response.headers['Cache-Control'] = 'private, no-cache'
+        response.vary.add('Cookie')
+        return response.make_conditional(request)
+    return decorated_function
+
+
+def _date(value):
+    return value.isoformat() if value else None
+
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+
+def _today():
+    return (datetime.utcnow() + timedelta(hours=5, minutes=45)).date()
+
+
+@bp.route('/summary')
+@api_login_required
+@replica_reads
+@conditional
+def summary():
+    total_income, total_expense = totals_by_type(session['user_id'])
+    return {
+        "currency": base_currency(session['user_id']),
+        "total_income": total_income,
+        "total_expense": total_expense,
+        "balance": balance_as_of(session['user_id'], _today()),
+    }
+
+
+@bp.route('/summary/balance')
+@api_login_required
+@replica_reads
+@conditional
+def summary_balance():
+    """Balance at the end of ?as_of=YYYY-MM-DD (default today)."""
+    try:
+        as_of = _parse_date(request.args.get('as_of')) or _today()
+    except ValueError:
+        return {"error": "as_of must be a YYYY-MM-DD date."}, 400
+    return {"as_of": as_of.isoformat(), "currency": base_currency(session['user_id']),
+            "balance": balance_as_of(session['user_id'], as_of)}
+
+
+@bp.route('/summary/balance/history')
+@api_login_required
+@replica_reads
+@conditional
+def summary_balance_history():
+    """End-of-day balances every ?step= days (default 1) from ?start= to ?end=."""
+    try:
+        end = _parse_date(request.args.get('end')) or _today()
+        start = _parse_date(request.args.get('start')) or end - timedelta(days=89)
+    except ValueError:
+        return {"error": "start and end must be YYYY-MM-DD dates."}, 400
+    step = request.args.get('step', 1, type=int)
+    if step < 1 or start > end or (end - start).days // step >= 3660:
+        return {"error": "Invalid range or step."}, 400
+
+    days = [start + timedelta(days=n) for n in range(0, (end - start).days + 1, step)]
+    return {
+        "currency": base_currency(session['user_id']),
+        "labels": [day.isoformat() for day in days],
+        "balance": balances_at(session['user_id'], days),
+    }
+
+
+@bp.route('/summary/monthly')
+@api_login_required
+@replica_reads
+@conditional
+def summary_monthly():
+    months = request.args.get('months', 12, type=int)
+    if not 1 <= months <= 120:
+        return {"error": "months must be between 1 and 120."}, 400
+    labels, income, expense, balance = monthly_series(session['user_id'], months)
+    return {"currency": base_currency(session['user_id']), "labels": labels,
+            "income": income, "expense": expense, "balance": balance}
+
+
+@bp.route('/summary/categories')
+@api_login_required
+@replica_reads
+@conditional
+def summary_categories():
+    return {"currency": base_currency(session['user_id']),
+            "categories": [{"name": name, "amount": float(amount)}
+                           for name, amount in expenses_by_category(session['user_id'])]}
+
+
+@bp.route('/summary/trends')
+@api_login_required
+@replica_reads
+@conditional
+def summary_trends():
+    """Trend, rolling-average, category and forecast series (see services.analytics)."""
+    # NumPy only loads once someone asks for analytics
+    from services.analytics import spending_analytics
+
+    args = request.args
+    try:
+        return spending_analytics(
+            session['user_id'],
+            freq=args.get('freq', 'month'),
+            periods=args.get('periods', type=int),
+            window=args.get('window', 3, type=int),
+            top=args.get('top', 5, type=int),
+            horizon=args.get('horizon', 3, type=int),
+            method=args.get('method', 'linear'),
+        )
+    except ValueError as exc:
+        return {"error": str(exc)}, 400
+
+
+@bp.route('/transactions')
+@api_login_required
+@replica_reads
+@conditional
+def transactions():
+    """Keyset-paginated transactions; pass `next_cursor` back as ?cursor=.
+
+    ?q= searches notes and category names (see services.search). Totals cover
+    the date filter, ?type= and the search.
+    """
+    user_id = session['user_id']
+    filter_by = request.args.get('filter_by', 'all')
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+
+    query = Transaction.query.filter_by(user_id=user_id).options(joinedload(Transaction.category))
+    try:
+        query = filter_transactions(query, filter_by, start_date, end_date)
+        t_type = request.args.get('type')
+        t_type = t_type if t_type in ('income', 'expense') else None
+        if t_type:
+            query = query.filter(Transaction.type == t_type)
+        q = request.args.get('q', '').strip()
+        if q:
+            query = search_transactions(query, user_id, q)
+        rows, next_cursor = keyset_page(query, request.args.get('cursor'),
+                                        transactions_page_size())
+        total_income, total_expense = filtered_totals(user_id, filter_by, start_date, end_date,
+                                                      q=q, t_type=t_type)
+        totals = {"currency": base_currency(user_id), "income": total_income,
+                  "expense": total_expense}
+    except ValueError:
+        return {"error": "Invalid filter or cursor."}, 400
+
+    return {
+        "transactions": [{
+            "id": t.id,
+            "type": t.type,
+            "amount": t.amount,
+            "currency": t.currency,
+            "category": t.category.name if t.category else None,
+            "note": t.note,
+            "date": t.date.isoformat(),
+            "is_recurring": t.is_recurring,
+            "frequency": t.frequency,
+        } for t in rows],
+        "next_cursor": next_cursor,
+        "totals": totals,
+    }
+
+
+def _selection(body):
+    """`ids` or the `filter` object of a bulk request body."""
+    if 'ids' in body:
+        return {"ids": body['ids']}
+    selection = body.get('filter')
+    if not isinstance(selection, dict):
+        raise ValueError("Give ids or a filter")
+    return selection
+
+
+@bp.route('/transactions/bulk-update', methods=['POST'])
+@api_login_required
+def transactions_bulk_update():
+    """Set category_id, type and/or note on many transactions in one statement.
+
+    Body: {"ids": [...]} or {"filter": {start_date, end_date, category_id,
+    type, note}}, plus {"set": {category_id, type, note}}.
+    """
+    body = request.get_json(silent=True) or {}
+    try:
+        updated = bulk_update(session['user_id'], _selection(body), body.get('set') or {})
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify({"updated": updated})
+
+
+@bp.route('/transactions/bulk-delete', methods=['POST'])
+@api_login_required
+def transactions_bulk_delete():
+    """Delete many transactions in one statement; same selection as bulk-update."""
+    body = request.get_json(silent=True) or {}
+    try:
+        deleted = bulk_delete(session['user_id'], _selection(body))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify({"deleted": deleted})
+
+
+def _job(job):
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "priority": job.priority,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "done": job.done,
+        "total": job.total,
+        "message": job.message,
+        "result": job.result,
+        "error": job.error,
+        "created_at": _date(job.created_at),
+        "started_at": _date(job.started_at),
+        "finished_at": _date(job.finished_at),
+    }
+
+
+def _own_job(job_id):
+    return Job.query.filter_by(id=job_id, user_id=session['user_id']).first()
+
+
+@bp.route('/exports', methods=['POST'])
+@api_login_required
+def exports():
+    """Queue a CSV export with the transactions page's filters; poll the returned job."""
+    from services.jobs import enqueue
+
+    body = request.get_json(silent=True) or {}
+    filters = {key: body.get(key) for key in ('filter_by', 'start_date', 'end_date')}
+    try:
+        if filters['filter_by'] == 'custom':
+            for key in ('start_date', 'end_date'):
+                _parse_date(filters[key])
+    except (TypeError, ValueError):
+        return jsonify({"error": "start_date and end_date must be YYYY-MM-DD dates."}), 400
+    job = enqueue('export_transactions',
+                  {"user_id": session['user_id'], **filters, "t_type": body.get('type')},
+                  user_id=session['user_id'])
+    response = jsonify(_job(job))
+    response.headers['Location'] = url_for('api.job', job_id=job.id)
+    return response, 202
+
+
+@bp.route('/jobs')
+@api_login_required
+@conditional
+def jobs():
+    """The user's 20 most recent background jobs, newest first."""
+    recent = (Job.query.filter_by(user_id=session['user_id'])
+              .order_by(Job.id.desc()).limit(20).all())
+    return {"jobs": [_job(job) for job in recent]}
+
+
+@bp.route('/jobs/<int:job_id>')
+@api_login_required
+@conditional
+def job(job_id):
+    """Status and progress of one job (`done` of `total` items; total may be null)."""
+    found = _own_job(job_id)
+    if found is None:
+        return {"error": "No such job."}, 404
+    return _job(found)
+
+
+@bp.route('/jobs/<int:job_id>/file')
+@api_login_required
+def job_file(job_id):
+    """Download the gzipped CSV of a finished export job."""
+    from services.jobs import DONE, spool_path
+
+    found = _own_job(job_id)
+    if found is None or found.kind != 'export_transactions' or found.status != DONE:
+        return jsonify({"error": "No finished export with that id."}), 404
+    path = spool_path(found.result['file'])
+    if not os.path.exists(path):
+        # Workers delete exports after JOB_FILE_RETENTION seconds
+        return jsonify({"error": "That export has expired; request a new one."}), 410
+    return send_file(path, mimetype='application/gzip',
+                     as_attachment=True, download_name='transactions.csv.gz')
+
+
+@bp.route('/notifications')
+@api_login_required
+@conditional
+def notifications():
+    """The user's unseen notifications, oldest first; ?after=<id> returns only newer ones."""
+    query = Notification.query.filter_by(user_id=session['user_id'], seen=False)
+    after = request.args.get('after', type=int)
+    if after:
+        query = query.filter(Notification.id > after)
+    return {"notifications": [{
+        "id": n.id,
+        "kind": n.kind,
+        "message": n.message,
+        "budget_id": n.budget_id,
+        "threshold": n.threshold,
+        "window_start": _date(n.window_start),
+        "created_at": _date(n.created_at),
+    } for n in query.order_by(Notification.id).limit(50)]}
+
+
+@bp.route('/notifications/seen', methods=['POST'])
+@api_login_required
+def notifications_seen():
+    """Mark notifications as seen: body {"ids": [...]}, or every unseen one without ids."""
+    body = request.get_json(silent=True) or {}
+    query = Notification.query.filter_by(user_id=session['user_id'], seen=False)
+    if 'ids' in body:
+        ids = body['ids']
+        if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+            return jsonify({"error": "ids must be a list of integers."}), 400
+        query = query.filter(Notification.id.in_(ids))
+    updated = query.update({"seen": True}, synchronize_session=False)
+    db.session.commit()
+    return jsonify({"updated": updated})
+
+
+@bp.route('/budgets')
+@api_login_required
+@replica_reads
+@conditional
+def budgets():
+    user_id = session['user_id']
+    user_budgets = (Budget.query.filter_by(user_id=user_id)
+                    .options(joinedload(Budget.category)).all())
+    progress = budget_progress(user_id, user_budgets)
+    total_budget, total_spent = budget_totals(user_id, progress)
+    return {
+        "budgets": [{
+            "id": item["budget"].id,
+            "name": item["budget"].name,
+            "amount": item["budget"].amount,
+            "currency": item["budget"].currency,
+            "period": item["budget"].period,
+            "category": item["budget"].category.name if item["budget"].category else None,
+            "spent": item["spent"],
+            "progress": item["progress"],
+            "exceeded": item["exceeded"],
+            "window_start": _date(item["window_start"]),
+            "window_end": _date(item["window_end"]),
+        } for item in progress],
+        "currency": base_currency(user_id),
+        "total_budget": total_budget,
+        "total_spent": total_spent,
+    }
+
+
+@bp.route('/investments')
+@api_login_required
+@replica_reads
+@conditional
+def investments():
+    holdings, totals = portfolio_valuation(session['user_id'])
+    return {
+        "holdings": {kind: [{
+            "id": h.investment.id,
+            "name": h.investment.name,
+            "ticker": h.investment.ticker_or_isin,
+            "amount": h.investment.amount,
+            "currency": h.investment.currency,
+            "units": h.investment.units,
+            "purchase_price": h.investment.purchase_price,
+            "interest_rate": h.investment.interest_rate,
+            "maturity_date": _date(h.investment.maturity_date),
+            "value": h.value,
+            "matured": h.matured,
+            "price": h.price,
+            "price_date": _date(h.price_date),
+        } for h in items] for kind, items in holdings.items()},
+        "currency": base_currency(session['user_id']),
+        "totals": totals,
+    }
+
+
+@bp.route('/investments/history')
+@api_login_required
+@replica_reads
+@conditional
+def investments_history():
+    """Daily portfolio values from the recorded snapshots."""
+    days = request.args.get('days', 365, type=int)
+    if not 1 <= days <= 3660:
+        return {"error": "days must be between 1 and 3660."}, 400
+    snapshots = snapshot_history(session['user_id'], days)
+    return {
+        "currency": base_currency(session['user_id']),
+        "labels": [snap.date.isoformat() for snap in snapshots],
+        "fixed_deposit": [snap.fixed_deposit for snap in snapshots],
+        "mutual_fund": [snap.mutual_fund for snap in snapshots],
+        "share": [snap.share for snap in snapshots],
+        "total": [snap.total for snap in snapshots],
+    }
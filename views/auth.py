@@ -0,0 +1,75 @@
+# views/auth.py
+from flask import Blueprint, flash, redirect, render_template, request, session, url_for
+from flask_login import login_user, logout_user
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from extensions import db
+from models import User
+from services.identity import identity_cache
+
+bp = Blueprint('auth', __name__)
+
+
+@bp.route('/register', methods=['GET', 'POST'])
+def register():
+    if request.method == 'POST':
+        username = request.form['username']
+        email = request.form['email']
+        password = request.form['password']
+
+        if not email.endswith("@gmail.com"):
+            flash("Only @gmail.com emails are allowed!", "danger")
+            return redirect(url_for('auth.register'))
+        
+        # Check if user already exists
+        existing_user = User.query.filter_by(email=email).first()
+        if existing_user:
+            flash('Email already registered.', 'error')
+            return redirect(url_for('auth.register'))
+
+        # Hash the password
+        hashed_password = generate_password_hash(password)
+
+        # Create new user
+        new_user = User(username=username, email=email, password=hashed_password)
+        db.session.add(new_user)
+        db.session.commit()
+
+        flash('Registration successful! Please log in.', 'success')
+        return redirect(url_for('auth.login'))
+
+    return render_template('register.html')
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if request.method == 'POST':
+        email = request.form['email']
+        password = request.form['password']
+
+        user = User.query.filter_by(email=email).first()
+
+        if user and check_password_hash(user.password, password):
+            login_user(identity_cache.remember(user))
+            # Views and services key everything on the plain user id
+            session['user_id'] = user.id
+            flash('Logged in successfully!', 'success')
+
+            #  Redirect admins to admin dashboard
+            if user.role == "admin":
+                return redirect(url_for('admin.admin_dashboard'))
+            else:
+                return redirect(url_for('main.dashboard'))
+
+        else:
+            flash('Invalid email or password.', 'error')
+
+    return render_template('login.html')
+
+
+
+@bp.route('/logout')
+def logout():
+    logout_user()
+    session.pop('user_id', None)
+    flash('Logged out successfully.', 'success')
+    return redirect(url_for('main.home'))
@@ -0,0 +1,129 @@
+# views/budgets.py
+from datetime import datetime
+
+from flask import Blueprint, flash, redirect, render_template, request, session, url_for
+from flask_login import current_user
+from sqlalchemy.orm import joinedload
+
+from extensions import db
+from models import Budget, Category
+from money import to_money
+from services.alerts import forget_budget, refresh_budgets
+from services.budgets import budget_progress as budget_progress_for, budget_totals
+from services.cache import aggregate_cache, BUDGET_AGGREGATES
+from services.fx import fx_rates, known_currency
+from views.decorators import login_required
+
+bp = Blueprint('budgets', __name__)
+
+
+# ------------------ Budget Routes ------------------
+@bp.route('/budgets')
+@login_required
+def budgets():
+    user = current_user
+    budgets = (
+        Budget.query.filter_by(user_id=user.id)
+        .options(joinedload(Budget.category))
+        .all()
+    )
+    all_categories = Category.query.all()
+
+    # Spending for every budget's current period in one grouped query
+    budget_progress = budget_progress_for(user.id, budgets)
+    # Budgets may be in different currencies; the totals are in the base one
+    total_budget, total_spent = budget_totals(user.id, budget_progress)
+
+    return render_template(
+        "budgets.html",
+        user=user,
+        budgets=budgets,
+        budget_progress=budget_progress,
+        total_budget=total_budget,
+        total_spent=total_spent,
+        all_categories=all_categories,
+        currency=user.base_currency,
+        currencies=fx_rates.currencies()
+    )
+
+
+@bp.route('/add_budget', methods=['POST'])
+@login_required
+def add_budget():
+    user = current_user
+    name = request.form['name']
+    amount = to_money(request.form['amount'])
+    period = request.form['period']
+    start_date = request.form.get('start_date')
+    end_date = request.form.get('end_date')
+    category_name = request.form['category']
+    try:
+        currency = known_currency(request.form.get('currency') or user.base_currency)
+    except ValueError as exc:
+        flash(str(exc), "danger")
+        return redirect(url_for('budgets.budgets'))
+
+    # ✅ Require valid category
+    category = Category.query.filter_by(name=category_name).first()
+    if not category:
+        flash("⚠️ Invalid category. Please choose an existing category.", "danger")
+        return redirect(url_for('budgets.budgets'))
+
+    budget = Budget(
+        name=name,
+        amount=amount,
+        currency=currency,
+        period=period,
+        start_date=datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None,
+        end_date=datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None,
+        user_id=user.id,
+        category_id=category.id
+    )
+    db.session.add(budget)
+    db.session.flush()
+    # Start its running total from what is already spent this period
+    refresh_budgets(user.id, [budget])
+    db.session.commit()
+    aggregate_cache.invalidate(user.id, BUDGET_AGGREGATES)
+
+    flash("✅ Budget added successfully!", "success")
+    return redirect(url_for('budgets.budgets'))
+
+
+# ------------------ Edit Budget ------------------
+@bp.route('/edit_budget/<int:budget_id>', methods=['POST'])
+@login_required
+def edit_budget(budget_id):
+    budget = Budget.query.get_or_404(budget_id)
+
+    if budget.user_id != session['user_id']:
+        flash("Unauthorized action.", "danger")
+        return redirect(url_for('budgets.budgets'))
+
+    budget.name = request.form['name']
+    budget.amount = to_money(request.form['amount'])
+    budget.period = request.form['period']
+
+    refresh_budgets(budget.user_id, [budget])
+    db.session.commit()
+    aggregate_cache.invalidate(budget.user_id, BUDGET_AGGREGATES)
+    flash("Budget updated successfully!", "success")
+    return redirect(url_for('budgets.budgets'))
+
+
+# ------------------ Delete Budget ------------------
+@bp.route('/delete_budget/<int:budget_id>', methods=['POST'])
+@login_required
+def delete_budget(budget_id):
+    budget = Budget.query.get_or_404(budget_id)
+
+    if budget.user_id != session['user_id']:
+        flash("Unauthorized action.", "danger")
+        return redirect(url_for('budgets.budgets'))
+
+    forget_budget(budget.id)
+    db.session.delete(budget)
+    db.session.commit()
+    aggregate_cache.invalidate(budget.user_id, BUDGET_AGGREGATES)
+    flash("Budget deleted successfully!", "success")
+    return redirect(url_for('budgets.budgets'))
@@ -0,0 +1,31 @@
+# views/decorators.py
+from functools import wraps
+
+from flask import flash, redirect, url_for
+from flask_login import current_user
+
+
+def login_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not current_user.is_authenticated:
+            flash("Please log in first.", "warning")
+            return redirect(url_for('auth.login'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+def admin_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not current_user.is_authenticated:
+            flash("Please log in first.", "warning")
+            return redirect(url_for('auth.login'))
+
+        # Role comes from the identity cache, not a per-request user query
+        if not current_user.is_admin:
+            flash("Unauthorized access! Admins only.", "danger")
+            return redirect(url_for('main.dashboard'))  # or abort(403)
+
+        return f(*args, **kwargs)
+    return decorated_function
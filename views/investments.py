@@ -0,0 +1,84 @@
+# views/investments.py
+from datetime import datetime
+
+from flask import Blueprint, flash, redirect, render_template, request, session, url_for
+from flask_login import current_user
+
+from extensions import db, replica_reads
+from models import Investment
+from money import to_money
+from services.fx import fx_rates, known_currency
+from services.investments import portfolio_valuation
+from views.decorators import login_required
+
+bp = Blueprint('investments', __name__)
+
+
+@bp.route('/investments')
+@login_required
+@replica_reads
+def investments():
+    holdings, totals = portfolio_valuation(session['user_id'])
+
+    return render_template(
+        "investments.html",
+        fixed_deposits=holdings['fixed_deposit'],
+        mutual_funds=holdings['mutual_fund'],
+        shares=holdings['share'],
+        total_fd=totals['fixed_deposit'],
+        total_mutual=totals['mutual_fund'],
+        total_shares=totals['share'],
+        currency=current_user.base_currency,
+        currencies=fx_rates.currencies()
+    )
+
+@bp.route('/add_investment', methods=['POST'])
+@login_required
+def add_investment():
+    user_id = session['user_id']
+    inv_type = request.form['investment_type']
+    name = request.form['name']
+    notes = request.form.get('notes')
+    try:
+        currency = known_currency(request.form.get('currency') or
+                                  current_user.base_currency)
+    except ValueError as exc:
+        flash(str(exc), "danger")
+        return redirect(url_for('investments.investments'))
+
+    investment = Investment(
+        user_id=user_id,
+        investment_type=inv_type,
+        name=name,
+        currency=currency,
+        notes=notes,
+        # Funds and shares with a ticker/ISIN are valued from the price table
+        ticker_or_isin=(request.form.get('ticker') or '').strip().upper() or None
+    )
+    if request.form.get('purchase_date'):
+        investment.purchase_date = datetime.strptime(request.form['purchase_date'], "%Y-%m-%d").date()
+
+    # Handle fields depending on type
+    if inv_type == "fixed_deposit":
+        investment.amount = to_money(request.form['amount'])
+        investment.interest_rate = float(request.form.get('rate', 0))
+        if request.form.get('maturity_date'):
+            investment.maturity_date = datetime.strptime(request.form['maturity_date'], "%Y-%m-%d")
+
+    elif inv_type == "mutual_fund":
+        investment.units = float(request.form.get('units', 0))
+        investment.purchase_price = float(request.form.get('nav', 0))
+        investment.current_value = to_money(request.form.get('current_value', 0))
+        investment.amount = investment.current_value  # for summary totals
+
+    elif inv_type == "share":
+        investment.units = float(request.form.get('quantity', 0))
+        investment.purchase_price = float(request.form.get('price', 0))
+        investment.current_value = to_money(request.form.get('total_value', 0))
+        investment.amount = investment.current_value  # for summary totals
+
+    db.session.add(investment)
+    db.session.commit()
+
+    flash(f"{inv_type.replace('_',' ').title()} added successfully!", "success")
+    return redirect(url_for('investments.investments'))
@@ -0,0 +1,77 @@
+# views/main.py
+from datetime import datetime, timedelta
+
+from flask import Blueprint, flash, redirect, render_template, request, session, url_for
+from flask_login import current_user
+
+from extensions import db
+from models import ContactMessage, User
+from services.cache import aggregate_cache, BUDGET_AGGREGATES, TRANSACTION_AGGREGATES
+from services.fx import fx_rates, known_currency
+from services.identity import identity_cache
+from views.decorators import login_required
+
+bp = Blueprint('main', __name__)
+
+
+@bp.route('/')
+def home():
+    return render_template('home.html')
+
+
+# Dashboard Page (Profile + Summary + Charts)
+# Renders only the shell; the cards and charts fetch their data from /api/v1
+# in parallel, so the first byte does not wait for the slowest aggregate.
+@bp.route('/dashboard')
+@login_required
+def dashboard():
+    return render_template('dashboard.html', user=current_user, currencies=fx_rates.currencies())
+
+
+@bp.route('/settings/currency', methods=['POST'])
+@login_required
+def set_base_currency():
+    """Change the currency a user's totals, balances and charts are converted into."""
+    user = db.session.get(User, session['user_id'])
+    try:
+        user.base_currency = known_currency(request.form.get('currency'))
+    except ValueError as exc:
+        flash(str(exc), "danger")
+        return redirect(url_for('main.dashboard'))
+    db.session.commit()
+    identity_cache.invalidate(user.id)
+    aggregate_cache.invalidate(user.id, TRANSACTION_AGGREGATES + BUDGET_AGGREGATES)
+
+    flash(f"Amounts are now shown in {user.base_currency}.", "success")
+    return redirect(url_for('main.dashboard'))
+
+
+# About Page Route
+@bp.route('/about')
+def about():
+    return render_template('about.html')
+
+# Contact Page Route
+@bp.route('/contact', methods=['GET', 'POST'])
+def contact():
+    if request.method == 'POST':
+        name = request.form['name']
+        email = request.form['email']
+        message = request.form['message']
+
+        # Convert to Nepal time (UTC + 5:45)
+        nepal_time = datetime.utcnow() + timedelta(hours=5, minutes=45)
+
+        new_message = ContactMessage(
+            name=name,
+            email=email,
+            message=message,
+            date_sent=nepal_time
+        )
+        db.session.add(new_message)
+        db.session.commit()
+
+        flash("Your message has been sent successfully!", "success")
+        return redirect(url_for('main.contact'))
+
+    return render_template('contact.html')
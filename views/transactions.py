@@ -0,0 +1,225 @@
+# views/transactions.py
+from datetime import datetime, timedelta
+
+from flask import (Blueprint, Response, current_app, flash, jsonify, redirect,
+                   render_template, request, session, stream_with_context, url_for)
+from flask_login import current_user
+
+from extensions import db, replica_reads
+from models import Category, Transaction
+from money import to_money
+from services.alerts import record_expenses
+from services.cache import aggregate_cache, TRANSACTION_AGGREGATES, CATEGORY_AGGREGATES
+from services.fx import fx_rates, known_currency
+from services.ledger import apply_to_ledger
+from services.recurring import next_occurrence
+from services.rollup import apply_to_rollup, expenses_by_category
+from services.search import index_transactions, search_transactions
+from services.transactions import (filter_transactions, keyset_page, filtered_totals,
+                                   category_choices)
+from views.decorators import login_required
+
+bp = Blueprint('transactions', __name__)
+
+
+@bp.route('/transactions')
+@login_required
+@replica_reads
+def transactions_page():
+    user = current_user
+
+    filter_by = request.args.get('filter_by', 'all')
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+
+    q = request.args.get('q', '').strip()
+
+    query = Transaction.query.filter_by(user_id=user.id)
+    try:
+        query = filter_transactions(query, filter_by, start_date, end_date)
+    except ValueError:
+        flash('Invalid date format.', 'error')
+        filter_by = 'all'
+    if q:
+        query = search_transactions(query, user.id, q)
+
+    # Only the first page is rendered; the rest is fetched from transactions_feed
+    transactions, next_cursor = keyset_page(query, page_size=transactions_page_size())
+
+    # Totals for the whole filter and search come from SQL, not from the rendered page
+    total_income, total_expense = filtered_totals(user.id, filter_by, start_date, end_date, q=q)
+
+    category_totals = expenses_by_category(user.id)
+
+    categories = [c[0] for c in category_totals]
+    amounts = [float(c[1]) for c in category_totals]
+
+    all_categories = category_choices(user.id)
+
+    return render_template(
+        'transactions.html',
+        user=user,
+        transactions=transactions,
+        next_cursor=next_cursor,
+        filter_by=filter_by,
+        start_date=start_date,
+        end_date=end_date,
+        q=q,
+        categories=categories,
+        amounts=amounts,
+        total_income=total_income,
+        total_expense=total_expense,
+        all_categories=all_categories,
+        currency=user.base_currency,
+        currencies=fx_rates.currencies()
+    )
+
+@bp.route('/transactions/feed')
+@login_required
+@replica_reads
+def transactions_feed():
+    """JSON pages of the transactions list, for infinite scrolling."""
+    query = Transaction.query.filter_by(user_id=session['user_id'])
+    try:
+        query = filter_transactions(query, request.args.get('filter_by', 'all'),
+                                    request.args.get('start_date'),
+                                    request.args.get('end_date'))
+        q = request.args.get('q', '').strip()
+        if q:
+            query = search_transactions(query, session['user_id'], q)
+        transactions, next_cursor = keyset_page(query, request.args.get('cursor'),
+                                                transactions_page_size())
+    except ValueError:
+        return jsonify({"error": "Invalid filter or cursor."}), 400
+
+    return jsonify({
+        "transactions": [{
+            "id": t.id,
+            "type": t.type,
+            "amount": t.amount,
+            "currency": t.currency,
+            "note": t.note,
+            "date": t.date.strftime('%Y-%m-%d %I:%M %p'),
+        } for t in transactions],
+        "next_cursor": next_cursor,
+    })
+
+
+def transactions_page_size():
+    """Page size from ?page_size=, bounded by the configured maximum."""
+    size = request.args.get('page_size', current_app.config['TRANSACTIONS_PAGE_SIZE'], type=int)
+    return max(1, min(size, current_app.config['TRANSACTIONS_MAX_PAGE_SIZE']))
+
+@bp.route('/add_transaction', methods=['POST'])
+@login_required
+def add_transaction():
+    amount = to_money(request.form['amount'])
+    try:
+        currency = known_currency(request.form.get('currency') or
+                                  current_user.base_currency)
+    except ValueError as exc:
+        flash(str(exc), "danger")
+        return redirect(url_for('transactions.transactions_page'))
+    t_type = request.form['type']
+    note = request.form.get('note')
+    category_id = int(request.form['category_id'])
+    nepal_time = datetime.utcnow() + timedelta(hours=5, minutes=45)
+
+    is_recurring = request.form.get('is_recurring') == "yes"
+    frequency = request.form.get('frequency') if is_recurring else None
+
+    transaction = Transaction(
+        amount=amount,
+        currency=currency,
+        type=t_type,
+        note=note,
+        date=nepal_time,
+        user_id=session['user_id'],
+        category_id=category_id,
+        is_recurring=is_recurring,
+        frequency=frequency,
+        next_date=next_occurrence(nepal_time, frequency)
+    )
+
+    db.session.add(transaction)
+    db.session.flush()  # the search index needs the id
+    apply_to_rollup([transaction])
+    index_transactions([transaction.id])
+    apply_to_ledger([transaction])
+    record_expenses([transaction])
+    db.session.commit()
+    aggregate_cache.invalidate(session['user_id'], TRANSACTION_AGGREGATES)
+
+    flash("Transaction added successfully!", "success")
+    return redirect(url_for('transactions.transactions_page'))
+
+@bp.route('/add_category', methods=['POST'])
+@login_required
+def add_category():
+    name = request.form['name']
+    c_type = request.form['type']
+
+    # check if category already exists
+    existing = Category.query.filter_by(name=name, type=c_type, user_id=session['user_id']).first()
+    if existing:
+        flash("Category already exists!", "warning")
+        return redirect(url_for('transactions.transactions_page'))
+
+    # create new category
+    new_category = Category(name=name, type=c_type, user_id=session['user_id'])
+    db.session.add(new_category)
+    db.session.commit()
+    aggregate_cache.invalidate(session['user_id'], CATEGORY_AGGREGATES)
+
+    flash("New category added!", "success")
+    return redirect(url_for('transactions.transactions_page'))
+
+@bp.route('/export_transactions')
+@login_required
+@replica_reads
+def export_transactions():
+    # csv/gzip helpers are only needed here, so they load on first export
+    from services.export import export_queries, export_rows, iter_csv, gzip_chunks
+
+    try:
+        queries = export_queries(session['user_id'], request.args.get('filter_by', 'all'),
+                                 request.args.get('start_date'), request.args.get('end_date'),
+                                 request.args.get('type'))
+    except ValueError:
+        flash('Invalid date format.', 'error')
+        return redirect(url_for('transactions.transactions_page'))
+
+    # Stream the CSV in chunks instead of building it in memory
+    chunks = iter_csv(export_rows(*queries))
+    headers = {"Content-Disposition": "attachment; filename=transactions.csv",
+               "Vary": "Accept-Encoding"}
+    if 'gzip' in request.headers.get('Accept-Encoding', ''):
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+
+    return Response(stream_with_context(chunks), mimetype="text/csv", headers=headers)
+
+@bp.route('/import_transactions', methods=['POST'])
+@login_required
+def import_transactions_upload():
+    from services.importer import READERS
+    from services.jobs import enqueue, spool_name, spool_path
+
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        flash("Please choose a file to import.", "warning")
+        return redirect(url_for('transactions.transactions_page'))
+
+    fmt = (request.form.get('format') or upload.filename.rsplit('.', 1)[-1]).lower()
+    if fmt not in READERS:
+        flash(f"Unsupported import format: {fmt}", "danger")
+        return redirect(url_for('transactions.transactions_page'))
+
+    # The worker parses the file; the request only stores it and queues the job
+    path = spool_path(spool_name("import", f".{fmt}"))
+    upload.save(path)
+    job = enqueue('import_transactions', {"path": path, "user_id": session['user_id'], "fmt": fmt},
+                  user_id=session['user_id'])
+    flash(f"Import queued as job #{job.id}; the transactions appear here once it finishes.",
+          "info")
+    return redirect(url_for('transactions.transactions_page'))